@@ -20,6 +20,7 @@
 
 #Boa:Frame:MainFrame
 
+import bisect
 import const
 import exceptions
 import locale
@@ -29,6 +30,7 @@ import traceback
 import wx
 
 import code_manager
+import events
 import proxy
 
 #Avoid limit of wx.ListCtrl in 512 symbols
@@ -136,16 +138,68 @@ class Frame1(wx.Frame):
         self._init_windows_tree()
         self.textCtrl_Editor.SetForegroundColour(wx.LIGHT_GREY)
         self.textCtrl_Editor.AppendText('#Perform an action - right click on item in the object browser.')
+        self.editor_hint = True  # the editor shows the hint, not the code
+        code_manager.CodeManager().set_optimizations(
+            const.CODE_OPTIMIZATIONS)
+        code_manager.CodeManager().subscribe(self.CodeChanged)
         self.prop_updater = prop_viewer_updater(self.listCtrl_Properties)
         self.tree_updater = tree_updater(self.treeCtrl_ObjectsBrowser)
+        self.root_update_pending = False
+        if const.WINDOW_EVENTS:
+            self.window_events = proxy.Win32EventSource()
+            proxy.watch_events(self.window_events)
+            self.window_events.subscribe(self.WindowEvent)
+            self.window_events.start()
+
+    def WindowEvent(self, event, handle):
+
+        """
+        Update the shown top level windows if one of them has changed.
+        Events are collected for WINDOW_EVENTS_DELAY before the update.
+        """
+
+        tree_item = self.treeCtrl_ObjectsBrowser.GetRootItem()
+        if not self.treeCtrl_ObjectsBrowser.ItemHasChildren(tree_item):
+            return  # nothing shown yet
+        root_obj = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item).GetData()
+        if event == events.EVENT_OBJECT_CREATE:
+            changed = proxy.is_top_level(handle)
+        else:
+            changed = root_obj.is_listed(handle)
+
+        if changed and not self.root_update_pending:
+            self.root_update_pending = True
+            wx.CallLater(const.WINDOW_EVENTS_DELAY, self._update_root)
+
+    def CodeChanged(self, delta):
+
+        """
+        Apply the code change to the editor.
+        """
+
+        editor = self.textCtrl_Editor
+        if self.editor_hint:
+            editor.SetValue('')
+            editor.SetForegroundColour(wx.BLACK)
+            self.editor_hint = False
+        (start_line, start_column), (end_line, end_column) = delta.start, \
+            delta.end
+        editor.Replace(editor.XYToPosition(start_column, start_line),
+                       editor.XYToPosition(end_column, end_line),
+                       delta.text)
+
+    def _update_root(self):
+        self.root_update_pending = False
+        tree_item = self.treeCtrl_ObjectsBrowser.GetRootItem()
+        obj = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item).GetData()
+        self.tree_updater.tree_update(tree_item, obj)
         
     def ObjectsBrowserSelChanged(self, event):
         tree_item = event.GetItem()
-        obj = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item).GetData()
+        obj = self._get_tree_obj(tree_item)
         if not obj._check_existence():
-          self._init_windows_tree()
-          tree_item = self.treeCtrl_ObjectsBrowser.GetRootItem()
-          obj = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item).GetData()
+          # refresh the subtree of the nearest ancestor still exists
+          tree_item, obj = self._get_existing_ancestor(tree_item)
         self.prop_updater.props_update(obj)
         self.tree_updater.tree_update(tree_item, obj)
         obj.Highlight_control()
@@ -154,7 +208,7 @@ class Frame1(wx.Frame):
         menu = wx.Menu()
         #tree_item = self.treeCtrl_ObjectsBrowser.GetSelection()
         tree_item = event.GetItem()
-        obj = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item).GetData()
+        obj = self._get_tree_obj(tree_item)
         self.GLOB_last_rclick_tree_obj = obj
         #self.treeCtrl_ObjectsBrowser.SelectItem(tree_item)
         if obj._check_existence():       
@@ -179,12 +233,40 @@ class Frame1(wx.Frame):
             self.PopupMenu(menu)
             menu.Destroy()
         else:
-            self._init_windows_tree()
-            tree_item = self.treeCtrl_ObjectsBrowser.GetRootItem()
-            obj = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item).GetData()
+            # refresh the subtree of the nearest ancestor still exists
+            tree_item, obj = self._get_existing_ancestor(tree_item)
             self.prop_updater.props_update(obj)
             self.tree_updater.tree_update(tree_item, obj)
+
+    def _get_existing_ancestor(self, tree_item):
+
+        """
+        Return (tree_item, obj) of the nearest ancestor which still exists.
+        The root exists always, its update applies the desktop changes only.
+        """
+
+        root_item = self.treeCtrl_ObjectsBrowser.GetRootItem()
+        while tree_item != root_item:
+            tree_item = self.treeCtrl_ObjectsBrowser.GetItemParent(tree_item)
+            obj = self._get_tree_obj(tree_item)
+            if obj._check_existence():
+                return tree_item, obj
+        return root_item, self._get_tree_obj(root_item)
     
+    def _get_tree_obj(self, tree_item):
+
+        """
+        Return the object of the tree item. A listed node is replaced by its
+        wrapper, a node of a gone control is returned as is.
+        """
+
+        item_data = self.treeCtrl_ObjectsBrowser.GetItemData(tree_item)
+        obj = item_data.GetData()
+        if isinstance(obj, proxy.ControlNode) and obj._check_existence():
+            obj = proxy.materialize(obj)
+            item_data.SetData(obj)
+        return obj
+
     def PropertiesRightClick(self, event):
         self.GLOB_prop_item_index = event.GetIndex()
         menu = wx.Menu()
@@ -284,10 +366,9 @@ class Frame1(wx.Frame):
             # Regular action
             action = const.ACTIONS[menu_id]
             try:
-                code = obj.Get_code(action)
+                obj.Add_code(action)
                 obj.Exec_action(action)
             except:
-                code = None
                 dlg = wx.MessageDialog(self, traceback.format_exc(5),
                                        'Warning!', wx.OK | wx.ICON_WARNING)
                 dlg.ShowModal()
@@ -297,24 +378,18 @@ class Frame1(wx.Frame):
             # Extended action
             try:
                 obj.SetCodestyle(menu_id)
-                code = obj.Get_code()
+                obj.Add_code()
             except:
-                code = None
                 dlg = wx.MessageDialog(self, traceback.format_exc(5),
                                        'Warning!', wx.OK | wx.ICON_WARNING)
                 dlg.ShowModal()
                 dlg.Destroy()
 
-        if code is not None:
-            self.textCtrl_Editor.SetForegroundColour(wx.BLACK)
-            self.textCtrl_Editor.SetValue(code)
-
     def editor_action(self, menu_id):
         cm = code_manager.CodeManager()
 
         if 'Clear last command' == const.EDITOR_ACTIONS[menu_id]:
             cm.clear_last()
-            self.textCtrl_Editor.SetValue(cm.get_full_code())
 
         elif 'Clear the code' == const.EDITOR_ACTIONS[menu_id]:
             def confirm_clearing():
@@ -328,7 +403,6 @@ class Frame1(wx.Frame):
                 return result
 
             if confirm_clearing():
-                self.textCtrl_Editor.SetValue("")
                 cm.clear()
 
         elif 'Copy' == const.EDITOR_ACTIONS[menu_id]:
@@ -385,29 +459,21 @@ class prop_viewer_updater(object):
         index = self.listctrl.InsertStringItem(0, 'Updating...')
         self.listctrl.SetStringItem(index, 1, '')
         global PROPERTIES
+        PROPERTIES = {}
         try:
-            PROPERTIES = obj.GetProperties()
+            for tier_properties in obj.Iter_properties():
+                if obj != self.queue[-1]:
+                    break  # there is the newer object for properties view.
+                PROPERTIES.update(tier_properties)
+                self._show(PROPERTIES, updating=True)
         except:
-            PROPERTIES = {}
             dlg = wx.MessageDialog(self.listctrl, traceback.format_exc(5),
                                    'Warning!', wx.OK | wx.ICON_WARNING)
             dlg.ShowModal()
             dlg.Destroy()
 
-        param_names = PROPERTIES.keys()
-        param_names.sort(key=lambda name: name.lower(), reverse=True)
-        
         if obj == self.queue[-1]:
-            self.listctrl.DeleteAllItems()
-            for p_name in param_names:
-                p_name_str = str(p_name)
-                try:
-                    p_values_str = str(PROPERTIES[p_name])
-                except exceptions.UnicodeEncodeError:
-                    p_values_str = PROPERTIES[p_name].encode(
-                        locale.getpreferredencoding(), 'replace')
-                index = self.listctrl.InsertStringItem(0, p_name_str)
-                self.listctrl.SetStringItem(index, 1, p_values_str)
+            self._show(PROPERTIES)
             self.queue = []
             self.updating = False
         
@@ -417,6 +483,30 @@ class prop_viewer_updater(object):
             #Do not update listctrl
             #run _update again
 
+    def _show(self, properties, updating=False):
+
+        """
+        Fill the listctrl with the properties. Keep 'Updating...' line on
+        the top while the rest of properties is being fetched.
+        """
+
+        param_names = properties.keys()
+        param_names.sort(key=lambda name: name.lower(), reverse=True)
+
+        self.listctrl.DeleteAllItems()
+        for p_name in param_names:
+            p_name_str = str(p_name)
+            try:
+                p_values_str = str(properties[p_name])
+            except exceptions.UnicodeEncodeError:
+                p_values_str = properties[p_name].encode(
+                    locale.getpreferredencoding(), 'replace')
+            index = self.listctrl.InsertStringItem(0, p_name_str)
+            self.listctrl.SetStringItem(index, 1, p_values_str)
+        if updating:
+            index = self.listctrl.InsertStringItem(0, 'Updating...')
+            self.listctrl.SetStringItem(index, 1, '')
+
 
 class tree_updater(object):
     def __init__(self, treectrl):
@@ -434,25 +524,16 @@ class tree_updater(object):
     def _update(self):
         self.updating = True
         tree_item, obj = self.queue[-1]
-        self.treectrl.DeleteChildren(tree_item)
-        subitems = obj.Get_subitems()
-        for i_name, i_obj in subitems:
-          item_data = wx.TreeItemData()
-          item_data.SetData(i_obj)
-          try:
-              i_name_str = str(i_name)
-          except exceptions.UnicodeEncodeError:
-              i_name_str = i_name.encode(locale.getpreferredencoding(), 'replace')
-
-          try:
-            item_id = self.treectrl.AppendItem(tree_item, i_name_str, data=item_data)
-            if (not i_obj._check_visibility()) or (not i_obj._check_actionable()):
-                self.treectrl.SetItemTextColour(item_id,'gray')
-          except wx._core.PyAssertionError:
-              pass
-              #Ignore tree item creation error when parent is not exists
-          finally:
-              del item_data
+        if isinstance(obj, proxy.PC_system) and \
+                self.treectrl.ItemHasChildren(tree_item):
+            # Keep the existing windows and their expanded subtrees
+            self._update_windows(tree_item, obj)
+        else:
+            self.treectrl.DeleteChildren(tree_item)
+            subitems = obj.Get_subitems()
+            states = obj.Get_subitems_states(subitems)
+            for (i_name, i_obj), state in zip(subitems, states):
+                self._add_item(tree_item, i_name, i_obj, state=state)
         self.treectrl.Expand(self.treectrl.GetRootItem())
         
         if (tree_item, obj) == self.queue[-1]:
@@ -463,4 +544,75 @@ class tree_updater(object):
             self._update()
             #there is the newer object for tree view.
             #Do not update treeCtrl
-            #run _update again
\ No newline at end of file
+            #run _update again
+
+    def _update_windows(self, tree_item, obj):
+
+        """
+        Apply the desktop delta to the top level windows items.
+        """
+
+        added, removed, retitled = obj.Get_subitems_delta()
+        # the items are matched by the handles, the wrappers of the removed
+        # windows may be dropped already
+        removed = set(removed)
+        retitled = dict((i_obj._get_handle(), (i_name, i_obj))
+                        for i_name, i_obj in retitled)
+
+        children = []  # [(lowered name, item_id),...] of the kept windows
+        item_id, cookie = self.treectrl.GetFirstChild(tree_item)
+        while item_id.IsOk():
+            next_item_id = self.treectrl.GetNextSibling(item_id)
+            handle = self.treectrl.GetItemData(item_id).GetData()._get_handle()
+            if handle in removed or handle in retitled:
+                # a retitled window is inserted again at its sorted place
+                self.treectrl.Delete(item_id)
+            else:
+                children.append(
+                    (self.treectrl.GetItemText(item_id).lower(), item_id))
+            item_id = next_item_id
+
+        # Insert new and retitled windows in the sorted order
+        names = [name for name, item_id in children]
+        for i_name, i_obj in added + retitled.values():
+            index = bisect.bisect(names, i_name.lower())
+            self._add_item(tree_item, i_name, i_obj, index)
+            names.insert(index, i_name.lower())
+
+    def _add_item(self, tree_item, i_name, i_obj, index=None, state=None):
+
+        """
+        Add the item, gray if it is not visible or not actionable.
+        `state` is (visible, actionable) if already known.
+        """
+
+        item_data = wx.TreeItemData()
+        item_data.SetData(i_obj)
+        i_name_str = self._str_name(i_name)
+        try:
+            if index is None:
+                item_id = self.treectrl.AppendItem(tree_item, i_name_str,
+                                                   data=item_data)
+            else:
+                item_id = self.treectrl.InsertItemBefore(tree_item, index,
+                                                         i_name_str,
+                                                         data=item_data)
+            if state is None:
+                gray = (not i_obj._check_visibility()) or \
+                    (not i_obj._check_actionable())
+            else:
+                gray = not all(state)
+            if gray:
+                self.treectrl.SetItemTextColour(item_id,'gray')
+        except wx._core.PyAssertionError:
+            pass
+            #Ignore tree item creation error when parent is not exists
+        finally:
+            del item_data
+
+    def _str_name(self, i_name):
+        try:
+            i_name_str = str(i_name)
+        except exceptions.UnicodeEncodeError:
+            i_name_str = i_name.encode(locale.getpreferredencoding(), 'replace')
+        return i_name_str
\ No newline at end of file
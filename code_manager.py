@@ -19,7 +19,12 @@
 #    Boston, MA 02111-1307 USA
 
 
+import collections
+import contextlib
 import re
+import threading
+
+import script_ir
 
 
 def check_valid_identifier(identifier):
@@ -104,29 +109,96 @@ class CodeSnippet(object):
         return '\n'.join(lines)
 
 
-class CodeManager(object):
+# Change of the code text. `start` and `end` are (line, column) of the
+# replaced range, `text` is the new text of the range.
+CodeDelta = collections.namedtuple('CodeDelta', ['start', 'end', 'text'])
+
+
+def apply_delta(code, delta):
+
+    """
+    Return the code with the delta applied.
+    """
+
+    lines = code.split("\n")
+
+    def offset(position):
+        line, column = position
+        return sum(len(text) + 1 for text in lines[:line]) + column
+
+    return code[:offset(delta.start)] + delta.text + code[offset(delta.end):]
+
+
+def end_position(code):
+
+    """
+    Return (line, column) of the code end.
+    """
+
+    lines = code.split("\n")
+    return len(lines) - 1, len(lines[-1])
+
+
+class NameAllocator(object):
+
+    """
+    Variable names of a code session. Every pattern, e.g. "button{id}",
+    counts its own names, "button", "button2",... A released name is given
+    again before a new one is composed, so a name still in use is never
+    handed out.
+    """
+
+    def __init__(self):
+        self.counters = {}  # pattern -> the names composed
+        self.free = {}  # pattern -> [released name,...]
+        self.lock = threading.Lock()
+
+    def allocate(self, pattern):
+        with self.lock:
+            free = self.free.get(pattern)
+            if free:
+                return free.pop()
+            count = self.counters.get(pattern, 0) + 1
+            self.counters[pattern] = count
+            # "app=..." instead of "app1=..."
+            return pattern.format(id='' if count == 1 else count)
+
+    def release(self, pattern, name):
+        with self.lock:
+            self.free.setdefault(pattern, []).append(name)
+
+
+class CodeSession(object):
 
     """
     Manages code snippets. Handles intent if needed and keeps `close_code` 
     always at the end.
-    Single instance.
+    The snippets are rendered once, when added. The code is kept as body
+    lines followed by the endings, every change is passed to the
+    subscribers as CodeDelta.
+    `optimizations` are script_ir passes applied to the full code, no
+    optimizations keep the code the snippets rendered to.
+    The session owns the variables and the main windows of the code
+    generators, see `use_session`.
     """
 
-    single_object = None
     inited = False
 
-    def __new__(cls, *args, **kwargs):
-        if cls.single_object is None:
-            new = super(CodeManager, cls).__new__(cls, *args, **kwargs)
-            cls.single_object = new
-            return new
-        else:
-            return cls.single_object
-
-    def __init__(self, indent_symbols=' '*4):
+    def __init__(self, indent_symbols=' '*4, optimizations=()):
         if not self.inited:
             self.snippets = []
             self.indent_symbols = indent_symbols
+            # rendered snippets, [(body_lines, ending, indent_count),...]
+            self.rendered = []
+            self.body = []  # lines of all the snippets
+            self.endings = []  # close lines in the snippets order
+            self.owners = {}  # owner -> [snippet,...]
+            self.subscribers = []
+            self.optimizations = tuple(optimizations)
+            self.shown_code = ""  # the optimized code the subscribers have
+            self.names = NameAllocator()
+            self.variables = {}  # owner -> variable name
+            self.main_windows = {}  # process -> the window code starts from
 
             self.inited = True
 
@@ -138,8 +210,233 @@ class CodeManager(object):
             indents=self.indent_symbols * indent_count,
             code=code)
 
+    def bind_variable(self, owner, pattern):
+
+        """
+        Return a new variable name of the owner.
+        """
+
+        name = self.names.allocate(pattern)
+        self.variables[owner] = name
+        return name
+
+    def release_variable(self, owner, pattern):
+
+        """
+        Make the owner variable name free for other owners.
+        """
+
+        name = self.variables.pop(owner, None)
+        if name is not None:
+            self.names.release(pattern, name)
+
+    def subscribe(self, callback):
+
+        """
+        Call callback(delta) for every change of the code.
+        """
+
+        self.subscribers.append(callback)
+
+    def set_optimizations(self, optimizations):
+
+        """
+        Apply other script_ir passes, the subscribers get the whole code.
+        """
+
+        for name in optimizations:
+            if name not in script_ir.PASSES:
+                raise RuntimeError("Unknown optimization - %s" % name)
+        old_end = end_position(self.get_full_code())
+        self.optimizations = tuple(optimizations)
+        self.shown_code = self.get_full_code()
+        self._notify([CodeDelta((0, 0), old_end, self.shown_code)])
+
+    def _notify(self, deltas):
+        if self.optimizations and self.subscribers and deltas:
+            # a pass may change any line, replace the whole code
+            code = self.get_full_code()
+            deltas = [CodeDelta((0, 0), end_position(self.shown_code), code)]
+            self.shown_code = code
+        for delta in deltas:
+            for callback in self.subscribers:
+                callback(delta)
+
+    def _render(self, snippet, indent_count):
+
+        """
+        Return (body_lines, ending, indent_count) of the snippet.
+        """
+
+        lines = []
+        if snippet.init_code:
+            lines.append(self._line(snippet.init_code, indent_count))
+
+        if snippet.indent:
+            # Add indent if needed. Notice the indent does not affect the
+            # init_code in this iteration.
+            indent_count += 1
+
+        if snippet.action_code:
+            lines.append(self._line(snippet.action_code, indent_count))
+
+        ending = None
+        if snippet.close_code:
+            ending = self._line(snippet.close_code, indent_count)
+        return lines, ending, indent_count
+
+    def _last_position(self):
+
+        """
+        Return (line, column) of the code end.
+        """
+
+        if not self.body:
+            return 0, 0
+        if not self.endings:
+            return len(self.body) + 1, 0
+        return len(self.body) + len(self.endings), len(self.endings[0])
+
+    def _whole_delta(self, old_end):
+
+        """
+        Return the delta replaces the whole code.
+        """
+
+        return CodeDelta((0, 0), old_end, self.get_full_code())
+
     def add(self, snippet):
+        indent_count = self.rendered[-1][2] if self.rendered else 0
+        lines, ending, indent_count = self._render(snippet, indent_count)
+
+        was_empty = not self.body
+        old_end = self._last_position()
+        deltas = []
+        if not was_empty:
+            line = len(self.body)  # the empty line after the body
+            if lines:
+                deltas.append(CodeDelta((line, 0), (line, 0),
+                                        "".join(text + "\n"
+                                                for text in lines)))
+            if ending is not None:
+                # the last ending is the first line after the empty line
+                line += len(lines) + 1
+                text = ending + "\n" if self.endings else ending
+                deltas.append(CodeDelta((line, 0), (line, 0), text))
+
         self.snippets.append(snippet)
+        self.rendered.append((lines, ending, indent_count))
+        self.body.extend(lines)
+        if ending is not None:
+            self.endings.append(ending)
+        self.owners.setdefault(snippet.owner, []).append(snippet)
+
+        if was_empty and self.body:
+            deltas.append(self._whole_delta(old_end))
+        self._notify(deltas)
+
+    def update(self, snippet, **kwargs):
+
+        """
+        Update the snippet code, see CodeSnippet.update.
+        """
+
+        index = self.snippets.index(snippet)
+        old_end = self._last_position()
+        old_lines, old_ending, old_indent_count = self.rendered[index]
+        indent_count = self.rendered[index - 1][2] if index else 0
+
+        snippet.update(**kwargs)
+        lines, ending, indent_count = self._render(snippet, indent_count)
+        if indent_count != old_indent_count or \
+                len(lines) != len(old_lines) or \
+                (ending is None) != (old_ending is None):
+            # the rest of the snippets and the code layout are affected
+            self._rerender(index)
+            self._notify([self._whole_delta(old_end)])
+            return
+
+        self.rendered[index] = (lines, ending, indent_count)
+        deltas = []
+        line = sum(len(rendered[0]) for rendered in self.rendered[:index])
+        for old_text, text in zip(old_lines, lines):
+            self.body[line] = text
+            deltas.append(CodeDelta((line, 0), (line, len(old_text)), text))
+            line += 1
+        if ending is not None:
+            ending_index = sum(1 for rendered in self.rendered[:index]
+                               if rendered[1] is not None)
+            old_ending = self.endings[ending_index]
+            self.endings[ending_index] = ending
+            line = len(self.body) + len(self.endings) - ending_index
+            deltas.append(CodeDelta((line, 0), (line, len(old_ending)),
+                                    ending))
+        if self.body:
+            self._notify(deltas)
+
+    def _rerender(self, index):
+
+        """
+        Render the snippets again, starting from the `index` one.
+        The subscribers are not notified.
+        """
+
+        snippets = self.snippets[index:]
+        del self.snippets[index:]
+        del self.rendered[index:]
+        for snippet in snippets:
+            self.owners[snippet.owner].remove(snippet)
+        self.body = [text for rendered in self.rendered
+                     for text in rendered[0]]
+        self.endings = [rendered[1] for rendered in self.rendered
+                        if rendered[1] is not None]
+
+        subscribers = self.subscribers
+        self.subscribers = []
+        try:
+            for snippet in snippets:
+                self.add(snippet)
+        finally:
+            self.subscribers = subscribers
+
+    def add_steps(self, steps):
+
+        """
+        Add the code of the (generator, action) steps, the same code as
+        generator.Add_code(action) for every step gives. Every target is
+        checked once, before any code is added. The subscribers get one
+        delta.
+        """
+
+        steps = list(steps)
+        checked = set()
+        for generator, action in steps:
+            if generator not in checked:
+                if not generator._check_existence():  # target does not exist
+                    raise Exception("Target object does not exist")
+                checked.add(generator)
+
+        old_end = self._last_position()
+        count = len(self.snippets)
+        subscribers = self.subscribers
+        self.subscribers = []
+        try:
+            with use_session(self):
+                for generator, action in steps:
+                    generator._add_code(action)
+        finally:
+            self.subscribers = subscribers
+            if len(self.snippets) != count:
+                self._notify([self._whole_delta(old_end)])
+
+    def get_code(self, steps):
+
+        """
+        Return all the code after the steps are added, see add_steps.
+        """
+
+        self.add_steps(steps)
+        return self.get_full_code()
 
     def clear(self):
 
@@ -147,8 +444,18 @@ class CodeManager(object):
         Safely clear all the snippents. Reset all the code counters.
         """
 
-        while self.snippets:
-            self.clear_last()
+        old_end = self._last_position()
+        subscribers = self.subscribers
+        self.subscribers = []
+        try:
+            while self.snippets:
+                self.clear_last()
+        finally:
+            self.subscribers = subscribers
+        self.names = NameAllocator()
+        self.variables = {}
+        self.main_windows = {}
+        self._notify([CodeDelta((0, 0), old_end, "")])
 
     def clear_last(self):
 
@@ -158,41 +465,58 @@ class CodeManager(object):
         """
 
         if self.snippets:
+            old_end = self._last_position()
             last_snippet = self.snippets.pop()
+            lines, ending, indent_count = self.rendered.pop()
+            self.owners[last_snippet.owner].pop()
+            if not self.owners[last_snippet.owner]:
+                del self.owners[last_snippet.owner]
+
+            deltas = []
+            if len(self.body) == len(lines):
+                if lines:
+                    deltas.append(CodeDelta((0, 0), old_end, ""))
+            else:
+                line = len(self.body) + 1  # the last ending
+                if ending is not None:
+                    if len(self.endings) > 1:
+                        deltas.append(CodeDelta((line, 0), (line + 1, 0), ""))
+                    else:
+                        deltas.append(CodeDelta((line, 0),
+                                                (line, len(ending)), ""))
+                if lines:
+                    line = len(self.body) - len(lines)
+                    deltas.append(CodeDelta((line, 0), (len(self.body), 0),
+                                            ""))
+
+            if lines:
+                del self.body[-len(lines):]
+            if ending is not None:
+                self.endings.pop()
+
             if last_snippet.types & CodeSnippet.INIT_SNIPPET:
-                last_snippet.owner.release_variable()
+                with use_session(self):
+                    last_snippet.owner.release_variable()
+            self._notify(deltas)
 
     def get_full_code(self):
 
         """
-        Compose complete code from the snippets.
+        Compose complete code from the rendered lines.
         """
 
-        lines = []
-        endings = []
-        indent_count = 0
-        for snippet in self.snippets:
-            if snippet.init_code:
-                lines.append(self._line(snippet.init_code, indent_count))
-
-            if snippet.indent:
-                # Add indent if needed. Notice the indent does not affect the
-                # init_code in this iteration.
-                indent_count += 1
-
-            if snippet.action_code:
-                lines.append(self._line(snippet.action_code, indent_count))
-
-            if snippet.close_code:
-                endings.append(self._line(snippet.close_code, indent_count))
+        if self.optimizations:
+            script = script_ir.Script.from_snippets(self.snippets,
+                                                    self.indent_symbols)
+            return script_ir.optimize(script, self.optimizations).render()
 
         # Add the close_code codes.
         # Reverse the list for a close_code from the first snippet was passed
         # at the end of the code.
-        if lines:
-            full_code = "\n".join(lines)
+        if self.body:
+            full_code = "\n".join(self.body)
             full_code += 2*"\n"
-            full_code += "\n".join(endings[::-1])
+            full_code += "\n".join(self.endings[::-1])
         else:
             full_code = ""
         return full_code
@@ -203,9 +527,8 @@ class CodeManager(object):
         Return the owner's the first INIT snippet.
         """
 
-        for snippet in self.snippets:
-            if snippet.owner == owner and \
-                    snippet.types & CodeSnippet.INIT_SNIPPET:
+        for snippet in self.owners.get(owner, []):
+            if snippet.types & CodeSnippet.INIT_SNIPPET:
                 return snippet
         else:
             return None
@@ -214,6 +537,53 @@ class CodeManager(object):
         return self.get_full_code()
 
 
+class CodeManager(CodeSession):
+
+    """
+    The default code session, the one the GUI shows.
+    Single instance.
+    """
+
+    single_object = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls.single_object is None:
+            new = super(CodeManager, cls).__new__(cls, *args, **kwargs)
+            cls.single_object = new
+            return new
+        else:
+            return cls.single_object
+
+
+sessions = threading.local()
+
+
+def current_session():
+
+    """
+    Return the code session of the thread, CodeManager by default.
+    """
+
+    session = getattr(sessions, 'current', None)
+    return CodeManager() if session is None else session
+
+
+@contextlib.contextmanager
+def use_session(session):
+
+    """
+    Generate the code of the thread in the session, e.g.
+    with use_session(CodeSession()): button.Get_code('Click')
+    """
+
+    previous = getattr(sessions, 'current', None)
+    sessions.current = session
+    try:
+        yield session
+    finally:
+        sessions.current = previous
+
+
 class CodeGenerator(object):
 
     """
@@ -221,43 +591,24 @@ class CodeGenerator(object):
     SWAPYObject's wrapper.
     """
 
-    code_manager = CodeManager()
-    code_var_name = None  # Default value, will be rewrote with composed
-    # variable name as an instance attribute.
-
-    code_var_counters = {}  # Default value, will be rewrote as instance's
-    # class attribute by get_code_id(cls)
-
-    @classmethod
-    def get_code_id(cls, var_prefix='default'):
+    @property
+    def code_manager(self):
 
         """
-        Increment code id. For example, the script already has
-        `button1=...` line, so for a new button make `button2=... code`.
-        The idea is the CodeGenerator's default value
-        code_var_counters['var_prefix'] will be overwrote by this funk
-        as a control's wrapper class(e.g Pwa_window) attribute.
-        Its non default value will be shared for all the control's wrapper
-        class(e.g Pwa_window) instances.
+        The code session of the thread, see `use_session`.
         """
 
-        if var_prefix not in cls.code_var_counters or \
-                cls.code_var_counters[var_prefix] == 0:
-            cls.code_var_counters[var_prefix] = 1
-            return ''  # "app=..." instead of "app1=..."
+        return current_session()
 
-        else:
-            cls.code_var_counters[var_prefix] += 1
-            return cls.code_var_counters[var_prefix]
-
-    @classmethod
-    def decrement_code_id(cls, var_prefix='default'):
+    @property
+    def code_var_name(self):
 
         """
-        Decrement code id.
+        The variable name in the current session, None if the object is
+        not inited there.
         """
 
-        cls.code_var_counters[var_prefix] -= 1
+        return self.code_manager.variables.get(self)
 
     def get_code_self(self):
 
@@ -274,8 +625,7 @@ class CodeGenerator(object):
         pattern = self._code_self
         if pattern:
             if self.code_var_name is None:
-                self.code_var_name = self.code_var_pattern.format(
-                    id=self.get_code_id(self.code_var_pattern))
+                self.code_manager.bind_variable(self, self.code_var_pattern)
 
             format_kwargs = {'var': self.code_var_name}
             try:
@@ -353,8 +703,26 @@ class CodeGenerator(object):
         Walk parents if needed.
         """
 
+        self.Add_code(action)
+        return self.code_manager.get_full_code()
+
+    def Add_code(self, action=None):
+
+        """
+        Add the code needed to make the action on the control, the code
+        manager passes the changes to its subscribers.
+        Walk parents if needed.
+        """
+
         if not self._check_existence():  # target does not exist
             raise Exception("Target object does not exist")
+        self._add_code(action)
+
+    def _add_code(self, action=None):
+
+        """
+        Add_code of the checked target.
+        """
 
         if self.code_var_name is None:
             # parent/s code is not inited
@@ -390,8 +758,6 @@ class CodeGenerator(object):
                                                  action_code=own_code_action)
                 self.code_manager.add(new_action_snippet)
 
-        return self.code_manager.get_full_code()
-
     def update_code_style(self):
 
         """
@@ -404,7 +770,8 @@ class CodeGenerator(object):
             own_code_self = self.get_code_self()
             own_close_code = self.get_code_close()
             if own_code_self or own_close_code:
-                init_code_snippet.update(init_code=own_code_self,
+                self.code_manager.update(init_code_snippet,
+                                         init_code=own_code_self,
                                          close_code=own_close_code)
 
     def release_variable(self):
@@ -414,9 +781,7 @@ class CodeGenerator(object):
         make possible other use the variable name.
         """
 
-        if self.code_var_name:
-            self.code_var_name = None
-            self.decrement_code_id(self.code_var_pattern)
+        self.code_manager.release_variable(self, self.code_var_pattern)
 
 
 if __name__ == '__main__':
@@ -436,7 +801,35 @@ if __name__ == '__main__':
     print id(c2)
     print cm
 
-    c2.update('button1 = the_change', 'the_change.Click()',
-                     'del the_change')
+    cm.update(c2, init_code='button1 = the_change',
+              action_code='the_change.Click()', close_code='del the_change')
     print id(c2)
     print cm
+
+    # Benchmark: the cost of an action while the code grows to 10k snippets,
+    # the deltas vs the full code rendering after every action.
+    import time
+
+    class Owner(object):
+        code_var_name = None
+
+    CodeManager.single_object = None
+    cm = CodeManager()
+    deltas = []
+    cm.subscribe(deltas.append)
+    owner = Owner()
+    for start in range(0, 10000, 2000):
+        started = time.time()
+        for i in range(start, start + 2000):
+            cm.add(CodeSnippet(owner, 'button%s = frame1.button' % i,
+                               'button%s.Click()' % i))
+        delta_time = (time.time() - started) / 2000
+
+        started = time.time()
+        for i in range(10):
+            cm.get_full_code()
+        full_time = (time.time() - started) / 10
+
+        print "%5s snippets: %.1f us per action with deltas, " \
+              "%.1f us more to render the full code" % \
+              (start + 2000, delta_time * 1e6, full_time * 1e6)
@@ -62,5 +62,52 @@ EDITOR_ACTIONS = {401: 'Clear last command',
                   405: 'Select all',
                   406: None,
                   407: 'Save code to file'}
+
+# Concurrent .Texts() retrieval for the objects browser.
+# 0 workers means serial retrieval. Texts of a control not read in
+# TEXTS_DEADLINE seconds are treated as unavailable.
+TEXTS_WORKERS = 0
+TEXTS_DEADLINE = 5
+
+# Not responding top level windows.
+# HUNG_SAFE checks a window is hung before sending messages to it.
+# HUNG_TIMEOUT is the longest wait (milliseconds) for a title message.
+# HUNG_FALLBACK is 'caption' to show the caption of a hung window or
+# 'placeholder' to show its handle only.
+HUNG_SAFE = False
+HUNG_TIMEOUT = 500
+HUNG_FALLBACK = 'caption'
+
+# Seconds a wrapper keeps its properties snapshot. 0 disables the cache.
+PROPERTIES_TTL = 2
+
+# ListView items are shown by pages of LISTVIEW_PAGE_SIZE rows, the next page
+# is under the "more" node. LISTVIEW_COLUMNS are the column indexes to show,
+# None to show all the columns.
+LISTVIEW_PAGE_SIZE = 100
+LISTVIEW_COLUMNS = (0,)
+
+# ComboBox and ListBox with more items are shown by chunks of the size.
+ITEMS_CHUNK_SIZE = 1000
+
+# Most top level windows and processes wrappers kept for reuse. Wrappers
+# nobody uses are dropped anyway.
+WINDOWS_CACHE_SIZE = 1000
+PROCESSES_CACHE_SIZE = 200
+
+# Watch the windows create/destroy/name change events. The objects browser
+# then updates the top level windows by itself and selection does not check
+# the window exists. WINDOW_EVENTS_DELAY is the milliseconds to collect the
+# events before the update.
+WINDOW_EVENTS = False
+WINDOW_EVENTS_DELAY = 500
+
+# script_ir passes applied to the generated code, e.g. ('dead_bindings',
+# 'duplicate_lookups', 'loops'). 'loops' turns repeated
+# actions into a loop, "Clear last command" removes one action of the loop.
+# Empty keeps the code as recorded and the editor is patched by small
+# deltas. Any pass renders the whole code again and replaces the editor
+# text on every action.
+CODE_OPTIMIZATIONS = ()
             
 VERSION = '0.4.8'
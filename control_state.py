@@ -0,0 +1,65 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+WS_VISIBLE = 0x10000000
+WS_DISABLED = 0x08000000
+
+
+def sibling_states(handles, styles, parents, top_handle, top_style):
+
+    """
+    Return [(visible, actionable),...] of the controls, no window is read.
+    `styles` and `parents` are {handle: style} and {handle: parent handle}
+    of the listed controls, read once when the controls were listed. A
+    control of unknown style is neither visible nor actionable.
+    A control is visible if it and all of its listed parents have
+    WS_VISIBLE and so does the `top_handle` window, whose style is
+    `top_style`. It is actionable if it is visible and neither the control
+    nor the top level window has WS_DISABLED, the same as pywinauto's
+    IsVisible/IsEnabled check.
+    """
+
+    top_visible = bool(top_style & WS_VISIBLE)
+    top_enabled = not top_style & WS_DISABLED
+    shown = {top_handle: top_visible}  # handle -> visible with its parents
+
+    def is_visible(handle):
+        chain = []
+        while handle in styles and handle not in shown:
+            chain.append(handle)
+            handle = parents.get(handle)
+        visible = shown.get(handle, top_visible)
+        for handle in reversed(chain):
+            style = styles[handle]
+            visible = visible and style is not None and \
+                bool(style & WS_VISIBLE)
+            shown[handle] = visible
+        return visible
+
+    states = []
+    for handle in handles:
+        visible = is_visible(handle)
+        style = styles.get(handle)
+        enabled = top_enabled and style is not None and \
+            not style & WS_DISABLED
+        states.append((visible, visible and enabled))
+    return states
@@ -0,0 +1,159 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import collections
+import threading
+import time
+
+
+# WinEvents of the windows changes
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_NAMECHANGE = 0x800C
+
+
+class EventSource(object):
+
+    """
+    Window create/destroy/name change notifications.
+    A derived class calls `notify(event, handle)` for every event between
+    `start` and `stop`.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+        self.started = False
+
+    def subscribe(self, callback):
+
+        """
+        Call callback(event, handle) for the events.
+        """
+
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def notify(self, event, handle):
+        for callback in list(self.subscribers):
+            callback(event, handle)
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.started = False
+
+
+class SyntheticEventSource(EventSource):
+
+    """
+    Events from a feed instead of the system, drives the subscribers in
+    tests.
+    """
+
+    def feed(self, events):
+
+        """
+        Notify the subscribers of [(event, handle),...] if started.
+        """
+
+        for event, handle in events:
+            if self.started:
+                self.notify(event, handle)
+
+
+class StaleTracker(object):
+
+    """
+    Remembers the windows changed by the events.
+    A destroyed handle does not exist until a window with the handle is
+    created again. Data read from a window before its change is stale.
+    Changes older than `keep` seconds are forgotten, use the age limit
+    of the cached data.
+    """
+
+    def __init__(self, keep, clock=time.time):
+        self.keep = keep
+        self.clock = clock
+        self.destroyed = set()
+        self.changed = collections.OrderedDict()  # handle -> time, old first
+        self.lock = threading.Lock()
+        self.source = None
+
+    @property
+    def watching(self):
+
+        """
+        Check the events are delivered, the tracker knows the changes.
+        """
+
+        return self.source is not None and self.source.started
+
+    def watch(self, source):
+        if self.source is not None:
+            self.source.unsubscribe(self)
+        self.source = source
+        source.subscribe(self)
+
+    def unwatch(self):
+
+        """
+        Stop tracking, the changes known are forgotten.
+        """
+
+        if self.source is not None:
+            self.source.unsubscribe(self)
+            self.source = None
+        with self.lock:
+            self.destroyed.clear()
+            self.changed.clear()
+
+    def __call__(self, event, handle):
+        now = self.clock()
+        with self.lock:
+            if event == EVENT_OBJECT_DESTROY:
+                self.destroyed.add(handle)
+            elif event == EVENT_OBJECT_CREATE:
+                self.destroyed.discard(handle)  # the handle is reused
+            self.changed.pop(handle, None)
+            self.changed[handle] = now
+            while self.changed:
+                handle, changed = next(self.changed.iteritems())
+                if now - changed <= self.keep:
+                    break
+                del self.changed[handle]
+
+    def is_destroyed(self, handle):
+        with self.lock:
+            return handle in self.destroyed
+
+    def is_stale(self, handle, since):
+
+        """
+        Check the window changed after `since`.
+        """
+
+        with self.lock:
+            changed = self.changed.get(handle)
+        return changed is not None and changed >= since
@@ -0,0 +1,86 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+class ItemTable(object):
+
+    """
+    Texts of a ComboBox or ListBox items, read on demand by ranges.
+    `read_texts(start, stop)` returns the texts of the items range.
+    `indexes` maps a text to the first index of the text.
+    """
+
+    def __init__(self, count, read_texts):
+        self.read_texts = read_texts
+        self.texts = [None] * count  # None for not read yet
+        self.indexes = {}
+        self.prefix = 0  # count of the leading items read
+
+    def __len__(self):
+        return len(self.texts)
+
+    def load(self, start, stop):
+
+        """
+        Read the not read texts of the items range in one go.
+        """
+
+        missing = [i for i in range(start, stop) if self.texts[i] is None]
+        if not missing:
+            return
+        first, last = missing[0], missing[-1] + 1
+        for i, text in enumerate(self.read_texts(first, last), first):
+            if self.texts[i] is None:
+                self.texts[i] = text
+                if self.indexes.get(text, len(self.texts)) > i:
+                    self.indexes[text] = i
+        while self.prefix < len(self.texts) and \
+                self.texts[self.prefix] is not None:
+            self.prefix += 1
+
+    def text(self, index):
+        self.load(index, index + 1)
+        return self.texts[index]
+
+    def index(self, text):
+
+        """
+        Return the first index of the text or None.
+        """
+
+        index = self.indexes.get(text)
+        if index is None or index >= self.prefix:
+            # the text may be among not read items before
+            self.load(0, index if index is not None else len(self.texts))
+            index = self.indexes.get(text)
+        return index
+
+    def key(self, index):
+
+        """
+        Return the item identifier for .Select(), the text or the index
+        if there is no text.
+        """
+
+        return self.text(index) or index
+
+    def title(self, index):
+        return self.text(index) or "option #%s" % index
@@ -0,0 +1,122 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+SEPARATOR_TYPE = 2048  # MF_SEPARATOR
+
+
+class MenuNode(object):
+
+    """
+    A menu item of the menu snapshot.
+    `path` is the precomputed path for MenuItem(), e.g. "File->#0->Save".
+    The submenu is opened and read when its `children` are asked first,
+    opening a popup menu may run the application handlers.
+    """
+
+    def __init__(self, item, index, text, item_type, state, item_id, path,
+                 read_items=None, open_submenu=None):
+        self.item = item
+        self.index = index
+        self.text = text
+        self.item_type = item_type
+        self.state = state
+        self.item_id = item_id
+        self.path = path
+        self.read_items = read_items
+        self.open_submenu = open_submenu
+        self.submenu = None
+        self.submenu_nodes = None
+
+    @property
+    def has_submenu(self):
+        return self.open_submenu is not None
+
+    @property
+    def children(self):
+
+        """
+        The submenu nodes, None if there is no submenu.
+        """
+
+        if self.has_submenu and self.submenu_nodes is None:
+            self.submenu = self.open_submenu()
+            self.submenu_nodes = build(self.read_items, self.submenu,
+                                       self.path)
+        return self.submenu_nodes
+
+    @property
+    def title(self):
+        if self.text:
+            return self.text
+        if self.item_type == SEPARATOR_TYPE:
+            return '-----Separator-----'
+        return 'Index: %d' % self.index
+
+    def properties(self, keys=None):
+
+        """
+        Return the same properties as MenuItem.GetProperties() does.
+        The submenu is read for them, as pywinauto does, unless the `keys`
+        subset goes without 'MenuItems'.
+        """
+
+        props = {'Index': self.index,
+                 'State': self.state,
+                 'Type': self.item_type,
+                 'ID': self.item_id,
+                 'Text': self.text}
+        if self.has_submenu and (keys is None or 'MenuItems' in keys):
+            props['MenuItems'] = menu_properties(self.children)
+        return props
+
+
+def build(read_items, menu, parent_path=None):
+
+    """
+    Read the menu items, the submenus are read on demand.
+    `read_items(menu)` returns
+    [(item, text, item_type, state, item_id, open_submenu),...],
+    open_submenu() returns the submenu, it is None for an item without
+    a submenu.
+    Return [MenuNode,...] of the menu items.
+    """
+
+    nodes = []
+    for index, (item, text, item_type, state, item_id, open_submenu) in \
+            enumerate(read_items(menu)):
+        part = text or '#%d' % index
+        if parent_path is None:
+            path = part
+        else:
+            path = '%s->%s' % (parent_path, part)
+        nodes.append(MenuNode(item, index, text, item_type, state, item_id,
+                              path, read_items, open_submenu))
+    return nodes
+
+
+def menu_properties(nodes):
+
+    """
+    Return the same properties as Menu.GetProperties() does.
+    """
+
+    return {'MenuItems': [node.properties() for node in nodes]}
@@ -0,0 +1,112 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+# Shared unicode titles, intern() takes byte strings only. Cleared when
+# it grows over TITLES_LIMIT, the titles of closed windows are not kept.
+titles = {}
+TITLES_LIMIT = 10000
+
+
+def intern_title(title):
+
+    """
+    Share equal titles between the nodes.
+    """
+
+    if isinstance(title, str):
+        return intern(title)
+    if len(titles) >= TITLES_LIMIT:
+        titles.clear()
+    return titles.setdefault(title, title)
+
+
+class Node(object):
+
+    """
+    A listed child, holds only what the objects browser shows.
+    `key` the control handle, `title` the browser title,
+    `tag` the pywinauto wrapper type, `parent` the parent's SWAPY wrapper.
+    The SWAPY wrapper is created by `materialize` when the node is selected
+    or used for the code.
+    """
+
+    __slots__ = ('key', 'title', 'tag', 'parent', 'wrapper')
+
+    def __init__(self, key, title, tag, parent):
+        self.key = key
+        self.title = intern_title(title)
+        self.tag = tag
+        self.parent = parent
+        self.wrapper = None
+
+    def materialize(self, factory):
+
+        """
+        Return the node's wrapper, create it by factory(node) the first time.
+        """
+
+        if self.wrapper is None:
+            self.wrapper = factory(self)
+        return self.wrapper
+
+
+if __name__ == '__main__':
+    import tracemalloc  # pytracemalloc on Python 2
+
+    class Control(object):
+        # what pywinauto HwndWrapper keeps for a child control
+        def __init__(self, handle):
+            self.handle = handle
+            self._as_parameter_ = handle
+            self.ref = None
+            self.appdata = None
+            self._cache = {}
+            self.writable_props = ['Class', 'FriendlyClassName', 'Texts',
+                                   'Style', 'ExStyle', 'ControlID',
+                                   'UserData', 'ContextHelpID', 'Fonts',
+                                   'ClientRects', 'Rectangle', 'IsVisible',
+                                   'IsUnicode', 'IsEnabled', 'MenuItems',
+                                   'ControlCount']
+
+    class Wrapper(object):
+        # what an eager SWAPYObject kept for a listed child
+        def __init__(self, pwa_obj, parent):
+            self.pwa_obj = pwa_obj
+            self.parent = parent
+            self.subitems_sort_key = lambda name: name[0].lower()
+            self.code_parents = [parent]
+
+    def measure(make, count=10000):
+        handles = xrange(0x10000, 0x10000 + count)
+        tracemalloc.start()
+        items = [make(handle) for handle in handles]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del items
+        return size / count
+
+    parent = Wrapper(Control(0), None)
+    eager = measure(lambda handle: ('Button', Wrapper(Control(handle), parent)))
+    lazy = measure(lambda handle: ('Button', Node(handle, 'Button', Control,
+                                                  parent)))
+    print 'eager wrapper: %s bytes per child' % eager
+    print 'node record: %s bytes per child' % lazy
@@ -0,0 +1,88 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+MORE_TITLE = u'more\u2026'  # the next page node
+
+
+def page_bounds(start, size, count):
+
+    """
+    Return (stop, next_start) of the page starting at `start` in a list of
+    `count` items. next_start is None for the last page.
+    """
+
+    stop = min(start + size, count)
+    if stop < count:
+        return stop, stop
+    return stop, None
+
+
+def select_columns(columns, column_count):
+
+    """
+    Return the column indexes to read. `columns` None means all of them.
+    A list without a header has the only column.
+    """
+
+    column_count = max(column_count, 1)
+    if columns is None:
+        return range(column_count)
+    return [column for column in columns if 0 <= column < column_count]
+
+
+def more_last_key(subitem):
+
+    """
+    Sort key for [(name, obj),...] subitems, which keeps a "more" node
+    at the end.
+    """
+
+    name = subitem[0]
+    return name == MORE_TITLE, name.lower()
+
+
+def chunks(count, size):
+
+    """
+    Return [(start, stop),...] ranges of `size` items covering `count` items.
+    """
+
+    return [(start, min(start + size, count))
+            for start in range(0, count, size)]
+
+
+def chunk_title(start, stop):
+    return u'#%s\u2026#%s' % (start, stop - 1)
+
+
+def chunk_key(subitem):
+
+    """
+    Sort key for [(name, obj),...] subitems, which keeps chunk nodes
+    in the order of their `chunk_start` after the rest of subitems.
+    """
+
+    name, obj = subitem
+    chunk_start = getattr(obj, 'chunk_start', None)
+    if chunk_start is None:
+        return 0, name.lower()
+    return 1, chunk_start
@@ -0,0 +1,122 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import Queue
+import threading
+import time
+
+
+def map_with_deadline(func, items, workers=0, deadline=None, default=None):
+
+    """
+    Return [func(item) for item in items] in the order of `items`.
+    With `workers` > 0 func is called from a bounded pool of threads.
+    `deadline` is seconds every call may take, counted from the call start.
+    An item not done in time gets `default` value, its thread is left
+    behind to finish on its own and a new thread takes the rest of the
+    items. An exception raised by func is re-raised in the calling thread.
+    Without workers func is called serially and the deadline is ignored.
+    """
+
+    items = list(items)
+    if not workers or len(items) < 2:
+        return [func(item) for item in items]
+
+    results = [default] * len(items)
+    state = {'done': 0, 'stopped': False, 'error': None}
+    started = {}  # index -> start time of the running calls
+    expired = set()  # indexes of the calls left behind
+    condition = threading.Condition()
+    tasks = Queue.Queue()
+    for task in enumerate(items):
+        tasks.put(task)
+
+    def worker():
+        while True:
+            try:
+                index, item = tasks.get_nowait()
+            except Queue.Empty:
+                return
+            with condition:
+                if state['stopped']:
+                    return
+                started[index] = time.time()
+                condition.notify()
+            try:
+                result = func(item)
+            except Exception as exc:
+                result = None
+                error = exc
+            else:
+                error = None
+            with condition:
+                if index in expired:
+                    return  # replaced by a new thread
+                del started[index]
+                if error is None:
+                    results[index] = result
+                else:
+                    state['error'] = state['error'] or error
+                state['done'] += 1
+                condition.notify()
+
+    def start_worker():
+        worker_thread = threading.Thread(target=worker)
+        worker_thread.daemon = True  # a hung call must not block the exit
+        worker_thread.start()
+
+    for i in range(min(workers, len(items))):
+        start_worker()
+
+    with condition:
+        while state['done'] < len(items) and state['error'] is None:
+            timeout = 1
+            if deadline is not None and started:
+                now = time.time()
+                for index, start in started.items():
+                    if now - start >= deadline:
+                        del started[index]
+                        expired.add(index)
+                        state['done'] += 1
+                        start_worker()
+                if started:
+                    timeout = min(started.values()) + deadline - now
+                if state['done'] == len(items):
+                    break
+            condition.wait(timeout)
+        state['stopped'] = True
+        error = state['error']
+
+    if error is not None:
+        raise error
+    return results
+
+
+if __name__ == '__main__':
+    # Benchmark: 100 slow calls, serial vs pool
+    def slow_texts(i):
+        time.sleep(0.02)
+        return [u'control %s' % i]
+
+    for workers in (0, 4, 16):
+        start = time.time()
+        map_with_deadline(slow_texts, range(100), workers=workers)
+        print "workers=%s: %.3f s" % (workers, time.time() - start)
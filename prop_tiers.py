@@ -0,0 +1,144 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import time
+
+
+# The properties are fetched tier by tier, cheap ones first. The last tier
+# is everything else: access names, items, images and other derived data.
+DEFAULT_TIERS = (
+    # window attributes
+    ('Class', 'FriendlyClassName', 'handle', 'pwa_type', 'ControlID',
+     'Style', 'ExStyle', 'Rectangle', 'ClientRects', 'IsVisible',
+     'IsEnabled', 'IsUnicode', 'UserData', 'ContextHelpID', 'ControlCount'),
+    # texts
+    ('Texts', 'Fonts', 'MenuItems'),
+    )
+
+
+class AllBut(object):
+
+    """
+    A keys subset of all the properties except the `keys`.
+    """
+
+    def __init__(self, keys):
+        self.keys = frozenset(keys)
+
+    def __contains__(self, key):
+        return key not in self.keys
+
+
+def select(properties, keys):
+
+    """
+    Return the `keys` subset of the properties dict, all of them if `keys`
+    is None.
+    """
+
+    if keys is None:
+        return dict(properties)
+    return dict((key, value) for key, value in properties.items()
+                if key in keys)
+
+
+def compute(getters, keys):
+
+    """
+    Call only the getters of the `keys` properties, all of them if `keys`
+    is None. `getters` is {key: callable,...}, returns {key: value,...}.
+    """
+
+    return dict((key, getter()) for key, getter in getters.items()
+                if keys is None or key in keys)
+
+
+def exclude(keys, excluded):
+
+    """
+    Return the `keys` subset without the `excluded` keys.
+    """
+
+    if keys is None:
+        return AllBut(excluded)
+    if isinstance(keys, AllBut):
+        return AllBut(keys.keys.union(excluded))
+    return [key for key in keys if key not in excluded]
+
+
+def iter_tiers(get_properties, tiers=DEFAULT_TIERS):
+
+    """
+    Call get_properties(keys) for every tier and at last for the rest of
+    the properties. Yield the properties of each tier.
+    """
+
+    fetched = []
+    for tier in tiers:
+        yield get_properties(tier)
+        fetched.extend(tier)
+    yield get_properties(AllBut(fetched))
+
+
+class Snapshot(object):
+
+    """
+    Properties fetched so far, possibly by subsets.
+    Remembers what keys were asked to tell if it covers a next request,
+    even when a control has no some of the asked properties.
+    """
+
+    def __init__(self):
+        self.properties = {}
+        self.asked = set()
+        self.complete = False
+        self.time = time.time()
+
+    def covers(self, keys):
+
+        """
+        Check the `keys` properties are already fetched.
+        """
+
+        if self.complete:
+            return True
+        if keys is None or isinstance(keys, AllBut):
+            return False
+        return self.asked.issuperset(keys)
+
+    def update(self, properties, keys):
+
+        """
+        Add the properties fetched for the `keys`.
+        """
+
+        self.properties.update(properties)
+        if keys is None:
+            self.complete = True
+        elif isinstance(keys, AllBut):
+            if self.asked.issuperset(keys.keys):
+                self.complete = True
+        else:
+            self.asked.update(keys)
+
+    def get(self, keys=None):
+        return select(self.properties, keys)
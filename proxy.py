@@ -18,19 +18,35 @@
 #    Suite 330,
 #    Boston, MA 02111-1307 USA
 
+import ctypes
 import exceptions
+import locale
 import platform
 import os
 import sys
 import string
 import time
 import thread
-import warnings
+import threading
 
 import pywinauto
 
 from code_manager import CodeGenerator, check_valid_identifier
 from const import *
+import control_state
+import events
+import item_table
+import menu_snapshot
+import nodes
+import paging
+import pool
+import prop_tiers
+import registry
+import snapshot
+import toolbar_table
+import tree_path
+import uniq_names
+import wrapper_cache
 
 '''
 proxy module for pywinauto 
@@ -39,6 +55,18 @@ proxy module for pywinauto
 
 pywinauto.timings.Timings.window_find_timeout = 1
 
+# Guards the wrappers registries (Pwa_window.handles, Process.processes)
+registry_lock = threading.RLock()
+
+# Windows changes, known if the events are watched, see watch_events
+window_events = events.StaleTracker(keep=PROPERTIES_TTL)
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+WINEVENT_OUTOFCONTEXT = 0
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+GA_PARENT = 1
+
 
 def resource_path(filename):
     if hasattr(sys, '_MEIPASS'):
@@ -55,12 +83,408 @@ def resource_path(filename):
     return filename
 
 
+def process_creation_time(pid):
+
+    """
+    Return the process creation time, None if the process is not accessible.
+    Tells the process from a new one with a reused pid.
+    """
+
+    kernel32 = ctypes.windll.kernel32
+    process = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False,
+                                   pid)
+    if not process:
+        return None
+    try:
+        # creation, exit, kernel and user times as 64 bit FILETIMEs
+        times = [ctypes.c_ulonglong() for i in range(4)]
+        if not kernel32.GetProcessTimes(process,
+                                        *[ctypes.byref(t) for t in times]):
+            return None
+        return times[0].value
+    finally:
+        kernel32.CloseHandle(process)
+
+
+def window_identity(handle, process=None, class_name=None):
+
+    """
+    Return (handle, pid, class, creation) of the top level window,
+    a reused handle gives another identity.
+    The pid and the creation time are taken from the window's Process
+    wrapper and the class from the desktop snapshot if passed, so the
+    process is not opened for every window.
+    """
+
+    handleprops = pywinauto.handleprops
+    if class_name is None:
+        class_name = handleprops.classname(handle)
+    if process is None:
+        pid = handleprops.processid(handle)
+        return handle, pid, class_name, process_creation_time(pid)
+    return handle, process.pid, class_name, process.creation
+
+
+def control_states(control, nodes_list):
+
+    """
+    Return [(visible, actionable),...] of the `control` descendants listed
+    as ControlNodes, from the styles the nodes were listed with. Only the
+    top level window style is read.
+    """
+
+    handleprops = pywinauto.handleprops
+    try:
+        top_handle = control.TopLevelParent().handle
+        top_style = handleprops.style(top_handle)
+    except Exception:
+        return [(False, False)] * len(nodes_list)  # the control has gone
+    styles = dict((node.key, node.style) for node in nodes_list)
+    parents = dict((node.key, node.parent_handle) for node in nodes_list)
+    return control_state.sibling_states([node.key for node in nodes_list],
+                                        styles, parents,
+                                        top_handle, top_style)
+
+
+def control_info(control):
+
+    """
+    Read everything the access names are composed from.
+    Return uniq_names.ControlInfo of the pywinauto control.
+    """
+
+    friendly_class = control.FriendlyClassName()
+    text = control.WindowText()
+    texts = []
+    if not text and control.has_title and friendly_class != 'TreeView':
+        try:
+            texts = control.Texts()
+        except Exception:
+            pass  # findbestmatch ignores the failed .Texts() too
+    rect = control.Rectangle()
+    return uniq_names.ControlInfo(key=control.handle,
+                                  friendly_class=friendly_class,
+                                  text=text,
+                                  texts=texts,
+                                  has_title=control.has_title,
+                                  can_be_label=control.can_be_label,
+                                  visible=control.IsVisible(),
+                                  rect=(rect.left, rect.top,
+                                        rect.right, rect.bottom))
+
+
+def control_texts(control):
+
+    """
+    Return control.Texts() or None if fails.
+    """
+
+    try:
+        return control.Texts()
+    except exceptions.WindowsError:
+        # workaround for WindowsError: [Error 0] ...
+        return None
+    except exceptions.RuntimeError:
+        # workaround for RuntimeError: GetButtonInfo failed for button
+        # with command id 256
+        return None
+
+
+def control_listing(control):
+
+    """
+    Return (texts, style, parent handle) of a listed child control, the
+    style and the parent are kept for the state check, see control_states.
+    """
+
+    handleprops = pywinauto.handleprops
+    return (control_texts(control), handleprops.style(control.handle),
+            handleprops.parent(control.handle))
+
+
+def read_listview_items(listview, rows, columns):
+
+    """
+    Read the ListView cells through one remote memory block.
+    Return [(item, item_data),...], the same as .GetItem(row, column) and
+    its .ItemData() for every row and column.
+    """
+
+    remote_mem = pywinauto.controls.common_controls.RemoteMemoryBlock(
+        listview)
+    item = listview.LVITEM()
+    char_data = listview.create_buffer(2000)
+    items = []
+    try:
+        for row in rows:
+            for column in columns:
+                item.mask = pywinauto.win32defines.LVIF_TEXT | \
+                    pywinauto.win32defines.LVIF_IMAGE | \
+                    pywinauto.win32defines.LVIF_INDENT | \
+                    pywinauto.win32defines.LVIF_STATE
+                item.iItem = row
+                item.iSubItem = column
+                item.stateMask = pywinauto.win32structures.UINT(-1)
+                item.cchTextMax = 2000
+                item.pszText = remote_mem.Address() + ctypes.sizeof(item) + 1
+                remote_mem.Write(item)
+
+                if not listview.SendMessage(listview.LVM_GETITEM, 0,
+                                            remote_mem):
+                    raise RuntimeError("LVM_GETITEM failed, item_index = %s, "
+                                       "subitem_index = %s" % (row, column))
+                remote_mem.Read(item)
+                remote_mem.Read(char_data, item.pszText)
+
+                item_data = {'text': listview.text_decode(char_data.value),
+                             'state': item.state,
+                             'image': item.iImage,
+                             'indent': item.iIndent}
+                items.append((listview.GetItem(row, column), item_data))
+    finally:
+        remote_mem.CleanUp()
+    return items
+
+
+def read_item_texts(control, text_len_msg, text_msg, start, stop):
+
+    """
+    Read texts of the ComboBox or ListBox items range, the same way as
+    .ItemTexts() reads all of them.
+    """
+
+    texts = []
+    for i in range(start, stop):
+        text_len = control.SendMessage(text_len_msg, i, 0)
+        text = ctypes.create_string_buffer(text_len + 1)
+        control.SendMessage(text_msg, i, ctypes.byref(text))
+        texts.append(text.value.decode(locale.getpreferredencoding(),
+                                       'ignore').replace('?', ''))
+    return texts
+
+
+def read_toolbar_buttons(toolbar, indexes):
+
+    """
+    Read the toolbar buttons through one remote memory block.
+    Return [toolbar_table.ButtonRecord,...], the buttons failed to read
+    are skipped.
+    """
+
+    remote_mem = pywinauto.controls.common_controls.RemoteMemoryBlock(toolbar)
+    records = []
+    try:
+        for index in indexes:
+            # the same as .GetButton(index)
+            button = pywinauto.win32structures.TBBUTTON()
+            remote_mem.Write(button)
+            if not toolbar.SendMessage(pywinauto.win32defines.TB_GETBUTTON,
+                                       index, remote_mem):
+                continue  # GetButton failed
+            remote_mem.Read(button)
+
+            button_info = pywinauto.win32structures.TBBUTTONINFOW()
+            button_info.cbSize = ctypes.sizeof(button_info)
+            button_info.dwMask = pywinauto.win32defines.TBIF_COMMAND | \
+                pywinauto.win32defines.TBIF_SIZE | \
+                pywinauto.win32defines.TBIF_STYLE | \
+                pywinauto.win32defines.TBIF_IMAGE | \
+                pywinauto.win32defines.TBIF_LPARAM | \
+                pywinauto.win32defines.TBIF_STATE | \
+                pywinauto.win32defines.TBIF_TEXT
+            button_info.cchText = 2000
+            button_info.pszText = remote_mem.Address() + \
+                ctypes.sizeof(button_info)
+            remote_mem.Write(button_info)
+            ret = toolbar.SendMessage(pywinauto.win32defines.TB_GETBUTTONINFOW,
+                                      button.idCommand, remote_mem)
+            remote_mem.Read(button_info)
+            if ret == -1:
+                continue  # GetButtonInfo failed
+            text = ctypes.create_unicode_buffer(1999)
+            remote_mem.Read(text, remote_mem.Address() +
+                            ctypes.sizeof(button_info))
+            button_info.text = text.value
+
+            # the same as .Button(index).Rectangle()
+            rect = pywinauto.win32structures.RECT()
+            remote_mem.Write(rect)
+            toolbar.SendMessage(pywinauto.win32defines.TB_GETRECT,
+                                button_info.idCommand, remote_mem)
+            rect = remote_mem.Read(rect)
+            if rect == pywinauto.win32structures.RECT(0, 0, 0, 0):
+                toolbar.SendMessage(pywinauto.win32defines.TB_GETITEMRECT,
+                                    index, remote_mem)
+                rect = remote_mem.Read(rect)
+
+            records.append(toolbar_table.ButtonRecord(
+                index=index,
+                command_id=button_info.idCommand,
+                text=button_info.text,
+                style=button_info.fsStyle,
+                state=button_info.fsState,
+                rect=rect,
+                info=button_info))
+    finally:
+        remote_mem.CleanUp()
+    return records
+
+
+def toolbar_button(toolbar, record):
+
+    """
+    Return pywinauto's _toolbar_button of the record without reading
+    the button again.
+    """
+
+    button_class = pywinauto.controls.common_controls._toolbar_button
+    button = button_class.__new__(button_class)
+    button.toolbar_ctrl = toolbar
+    button.index = record.index
+    button.info = record.info
+    return button
+
+
+def read_menu_items(menu):
+
+    """
+    Read the menu items, each item is read once.
+    Return [(item, text, item_type, state, item_id, open_submenu),...] for
+    menu_snapshot.build.
+    """
+
+    if not menu.accessible:
+        return []
+    entries = []
+    for item in menu.Items():
+        info = item._read_item()
+        if info.hSubMenu:
+            open_submenu = item.SubMenu  # inits the submenu popup too
+        else:
+            open_submenu = None
+        entries.append((item, info.text, info.fType, info.fState, info.wID,
+                        open_submenu))
+    return entries
+
+
+def tree_elements(tree, elem=None):
+
+    """
+    Return handles of the TreeView roots or of the `elem` children,
+    the items are not read.
+    """
+
+    if elem is None:
+        next_elem = tree.SendMessage(pywinauto.win32defines.TVM_GETNEXTITEM,
+                                     pywinauto.win32defines.TVGN_ROOT, 0)
+    else:
+        next_elem = tree.SendMessage(pywinauto.win32defines.TVM_GETNEXTITEM,
+                                     pywinauto.win32defines.TVGN_CHILD, elem)
+    elems = []
+    while next_elem:
+        elems.append(next_elem)
+        next_elem = tree.SendMessage(pywinauto.win32defines.TVM_GETNEXTITEM,
+                                     pywinauto.win32defines.TVGN_NEXT,
+                                     next_elem)
+    return elems
+
+
+def read_tree_items(tree, elems):
+
+    """
+    Read the TreeView items through one remote memory block.
+    Return [(text, has_children),...], the same as .Text() and
+    .Item().cChildren of the items.
+    """
+
+    remote_mem = pywinauto.controls.common_controls.RemoteMemoryBlock(tree)
+    item = pywinauto.win32structures.TVITEMW()
+    char_data = ctypes.create_unicode_buffer(2000)
+    items = []
+    try:
+        for elem in elems:
+            item.mask = pywinauto.win32defines.TVIF_TEXT | \
+                pywinauto.win32defines.TVIF_HANDLE | \
+                pywinauto.win32defines.TVIF_CHILDREN | \
+                pywinauto.win32defines.TVIF_STATE
+            item.pszText = remote_mem.Address() + ctypes.sizeof(item) + 16
+            item.cchTextMax = 2000
+            item.hItem = elem
+            item.stateMask = pywinauto.win32structures.UINT(-1)
+            remote_mem.Write(item)
+
+            if not tree.SendMessage(pywinauto.win32defines.TVM_GETITEMW, 0,
+                                    remote_mem):
+                raise ctypes.WinError()
+            remote_mem.Read(item)
+            remote_mem.Read(char_data, item.pszText)
+            items.append((char_data.value, item.cChildren != 0))
+    finally:
+        remote_mem.CleanUp()
+    return items
+
+
+def tree_level(parent, tree, elems, parent_path=None):
+
+    """
+    Return [(text, Pwa_tree_item),...] of the TreeView items, all the
+    texts are read in one batch.
+    """
+
+    level = []
+    for elem, (text, has_children) in zip(elems, read_tree_items(tree, elems)):
+        element = pywinauto.controls.common_controls._treeview_element(elem,
+                                                                       tree)
+        obj = Pwa_tree_item(element, parent,
+                            path=tree_path.child(parent_path, text),
+                            has_children=has_children)
+        level.append((text, obj))
+    return level
+
+
+class ControlNode(nodes.Node):
+
+    """
+    A listed child control, see nodes.Node.
+    The control state is checked by the handle, without the SWAPY wrapper.
+    `style` and `parent_handle` are read when the control is listed, None
+    if the listing timed out.
+    """
+
+    __slots__ = ('style', 'parent_handle')
+
+    def __init__(self, key, title, tag, parent, style=None,
+                 parent_handle=None):
+        super(ControlNode, self).__init__(key, title, tag, parent)
+        self.style = style
+        self.parent_handle = parent_handle
+
+    def _check_visibility(self):
+        try:
+            return self.tag(self.key).IsVisible()
+        except Exception:
+            return False
+
+    def _check_actionable(self):
+        try:
+            self.tag(self.key).VerifyActionable()
+        except Exception:
+            return False
+        return True
+
+    def _check_existence(self):
+        return pywinauto.handleprops.iswindow(self.key)
+
+
 class PwaWrapper(object):
 
     """
     Base proxy class for pywinauto objects.
     """
 
+    uniq_names_cache = uniq_names.NameTableCache()  # shared by all wrappers
+    properties_tiers = prop_tiers.DEFAULT_TIERS
+
     def __init__(self, pwa_obj, parent=None):
         '''
         Constructor
@@ -68,18 +492,33 @@ class PwaWrapper(object):
         #original pywinauto object
         self.pwa_obj = pwa_obj
         self.parent = parent
-        default_sort_key = lambda name: name[0].lower()
-        self.subitems_sort_key = default_sort_key
 
-    def GetProperties(self):
+    @staticmethod
+    def subitems_sort_key(name):
+        return name[0].lower()
+
+    def GetProperties(self, keys=None):
         '''
         Return dict of original + additional properties
+        Return only the `keys` properties if passed
         Can be overridden for non pywinauto objects
         '''
         properties = {}
-        properties.update(self._get_properties())
-        properties.update(self._get_additional_properties())
+        properties.update(self._get_properties(keys))
+        properties.update(self._get_additional_properties(keys))
+        if keys is not None:
+            properties = prop_tiers.select(properties, keys)
         return properties
+
+    def Iter_properties(self):
+
+        """
+        Yield the properties tier by tier, cheap ones first.
+        Window attributes, then texts, then access names and the rest.
+        """
+
+        return prop_tiers.iter_tiers(self.GetProperties,
+                                     self.properties_tiers)
         
     def Get_subitems(self):
         '''
@@ -98,6 +537,27 @@ class PwaWrapper(object):
             #name = name.encode('cp1251', 'replace')
             subitems_encoded.append((name, obj))
         return subitems_encoded
+
+    def Get_subitems_states(self, subitems):
+        '''
+        Return [(visible, actionable),...] of the Get_subitems result
+        Listed controls are checked in one pass, other subitems one by one
+        Can be overridden if the state is shared by all the subitems
+        '''
+        nodes_list = [obj for name, obj in subitems
+                      if isinstance(obj, ControlNode)]
+        if nodes_list:
+            nodes_states = dict(zip(
+                [node.key for node in nodes_list],
+                control_states(self.pwa_obj, nodes_list)))
+        states = []
+        for name, obj in subitems:
+            if isinstance(obj, ControlNode):
+                states.append(nodes_states[obj.key])
+            else:
+                states.append((obj._check_visibility(),
+                               obj._check_actionable()))
+        return states
         
     def Exec_action(self, action):
         '''
@@ -137,30 +597,60 @@ class PwaWrapper(object):
           thread.start_new_thread(self._highlight_control,(3,))
         return 0
 
-    def _get_properties(self):
+    def _get_properties(self, keys=None):
         '''
         Get original pywinauto's object properties
+        Read only the `keys` properties if passed
         '''
         #print type(self.pwa_obj)
         try:
-            properties = self.pwa_obj.GetProperties()
+            if keys is None:
+                properties = self.pwa_obj.GetProperties()
+            else:
+                properties = self.__read_properties(keys)
         except exceptions.RuntimeError:
             properties = {} #workaround
         return properties
-        
-    def _get_additional_properties(self):
+
+    def __read_properties(self, keys):
+
+        """
+        Read the `keys` subset of pywinauto's object properties, the same
+        way as HwndWrapper.GetProperties reads all of them.
+        """
+
+        try:
+            wrapper = self.pwa_obj.WrapperObject()
+        except AttributeError:
+            wrapper = self.pwa_obj
+
+        if not hasattr(wrapper, 'writable_props'):
+            # not a HwndWrapper, e.g. a menu
+            return prop_tiers.select(wrapper.GetProperties(), keys)
+
+        properties = {}
+        for prop_name in wrapper.writable_props:
+            if prop_name in keys:
+                properties[prop_name] = getattr(wrapper, prop_name)()
+        if wrapper._NeedsImageProp and 'Image' in keys:
+            properties['Image'] = wrapper.CaptureAsImage()
+        return properties
+
+    def _get_additional_properties(self, keys=None):
 
         """
         Get additional useful properties, like a handle, process ID, etc.
+        Compute only the `keys` properties if passed
         Can be overridden by derived class
         """
 
         additional_properties = {}
 
         #-----Access names
-        access_names = [name for name, obj in self.__get_uniq_names(target_control=self.pwa_obj)]
-        if access_names:
-            additional_properties.update({'Access names' : access_names})
+        if keys is None or 'Access names' in keys:
+            access_names = self.__get_uniq_names(target_control=self.pwa_obj)
+            if access_names:
+                additional_properties.update({'Access names' : access_names})
         #-----
         
         #-----pwa_type
@@ -179,7 +669,7 @@ class PwaWrapper(object):
 
         """
         Return original pywinauto's object children & names
-        [(control_text, swapy_obj),...]
+        [(control_text, ControlNode),...]
         """
 
         if self.pwa_obj.Parent() and isinstance(self.parent, Pwa_window):
@@ -190,19 +680,13 @@ class PwaWrapper(object):
         u_names = None
         children = []
         children_controls = self.pwa_obj.Children()
-        for child_control in children_controls:
-            try:
-                texts = child_control.Texts()
-            except exceptions.WindowsError:
-                # texts = ['Unknown control name2!'] #workaround for
-                # WindowsError: [Error 0] ...
-                texts = None
-            except exceptions.RuntimeError:
-                # texts = ['Unknown control name3!'] #workaround for
-                # RuntimeError: GetButtonInfo failed for button
-                # with command id 256
-                texts = None
-
+        children_listing = pool.map_with_deadline(control_listing,
+                                                  children_controls,
+                                                  workers=TEXTS_WORKERS,
+                                                  deadline=TEXTS_DEADLINE,
+                                                  default=(None, None, None))
+        for child_control, (texts, style, parent_handle) in \
+                zip(children_controls, children_listing):
             if texts:
                 texts = filter(bool, texts)  # filter out '' and None items
 
@@ -212,18 +696,19 @@ class PwaWrapper(object):
                 # .Texts() does not have a useful title, trying get it
                 # from the uniqnames
                 if u_names is None:
-                    # init unames list
-                    u_names = self.__get_uniq_names()
+                    # init unames table
+                    u_names = self.__get_name_table()
 
-                child_uniq_name = [u_name for u_name, obj in u_names
-                                   if obj.WrapperObject() == child_control]
+                child_uniq_name = u_names.names_of(child_control.handle)
 
                 if child_uniq_name:
                     title = child_uniq_name[-1]
                 else:
                     # uniqnames has no useful title
                     title = 'Unknown control name1!'
-            children.append((title, self._get_swapy_object(child_control)))
+            children.append((title, ControlNode(child_control.handle, title,
+                                                type(child_control), self,
+                                                style, parent_handle)))
 
         return children
 
@@ -234,64 +719,6 @@ class PwaWrapper(object):
         '''
         return []
         
-    def _get_pywinobj_type(self, obj):
-        '''
-        Check self pywinauto object type
-        '''
-        if type(obj) == pywinauto.application.WindowSpecification:
-            return 'window'
-        elif type(obj) == pywinauto.controls.menuwrapper.Menu:
-            return 'menu'
-        elif type(obj) == pywinauto.controls.menuwrapper.MenuItem:
-            return 'menu_item'
-        elif type(obj) == pywinauto.controls.win32_controls.ComboBoxWrapper:
-            return 'combobox'
-        elif type(obj) == pywinauto.controls.win32_controls.ListBoxWrapper:
-            return 'listbox'
-        elif type(obj) == pywinauto.controls.common_controls.ListViewWrapper:
-            return 'listview'
-        elif type(obj) == pywinauto.controls.common_controls.TabControlWrapper:
-            return 'tab'
-        elif type(obj) == pywinauto.controls.common_controls.ToolbarWrapper:
-            return 'toolbar'
-        elif type(obj) == pywinauto.controls.common_controls._toolbar_button:
-            return 'toolbar_button'
-        elif type(obj) == pywinauto.controls.common_controls.TreeViewWrapper:
-            return 'tree_view'
-        elif type(obj) == pywinauto.controls.common_controls._treeview_element:
-            return 'tree_item'
-        else:
-            return 'unknown'
-        
-    def _get_swapy_object(self, pwa_obj):
-        pwa_type = self._get_pywinobj_type(pwa_obj)
-        #print pwa_type
-        if pwa_type == 'window':
-            process = Process(self, pwa_obj.ProcessID())
-            return Pwa_window(pwa_obj, process)
-        if pwa_type == 'menu':
-            return Pwa_menu(pwa_obj, self)
-        if pwa_type == 'menu_item':
-            return Pwa_menu_item(pwa_obj, self)
-        if pwa_type == 'combobox':
-            return Pwa_combobox(pwa_obj, self)
-        if pwa_type == 'listbox':
-            return Pwa_listbox(pwa_obj, self)
-        if pwa_type == 'listview':
-            return Pwa_listview(pwa_obj, self)
-        if pwa_type == 'tab':
-            return Pwa_tab(pwa_obj, self)
-        if pwa_type == 'toolbar':
-            return Pwa_toolbar(pwa_obj, self)
-        if pwa_type == 'toolbar_button':
-            return Pwa_toolbar_button(pwa_obj, self)
-        if pwa_type == 'tree_view':
-            return Pwa_tree(pwa_obj, self)
-        if pwa_type == 'tree_item':
-            return Pwa_tree_item(pwa_obj, self)
-        else:
-            return SWAPYObject(pwa_obj, self)
-
     def _highlight_control(self, repeat = 1):
         while repeat > 0:
             repeat -= 1
@@ -330,8 +757,13 @@ class PwaWrapper(object):
         '''
         Check control/window Exists.
         Return True or False if fails
+        No round trip if the window events are watched
         '''
 
+        handle = self._get_handle()
+        if handle is not None and window_events.watching:
+            return not window_events.is_destroyed(handle)
+
         try:
             handle_ = self.pwa_obj.handle
             obj = pywinauto.application.WindowSpecification({'handle': handle_})
@@ -341,17 +773,32 @@ class PwaWrapper(object):
             is_exist = obj.Exists()
         return is_exist
 
-    def __get_uniq_names(self, target_control=None):
+    def _get_handle(self):
+        '''
+        Return the window handle, None for non window objects
+        Does not resolve a window specification
+        '''
+        hwnd_wrapper = pywinauto.controls.HwndWrapper.HwndWrapper
+        if isinstance(self.pwa_obj, hwnd_wrapper):
+            return self.pwa_obj.handle
+        return None
+
+    def __get_uniq_names(self, target_control):
 
         """
-        Return uniq_names of the control
-        [(uniq_name, obj), ]
-        If target_control specified, apply additional filtering for obj == target_control
+        Return uniq_names of the target_control
+        [uniq_name, ]
         """
 
-        # TODO: cache this method
+        name_table = self.__get_name_table()
+        target_handle = getattr(target_control, 'handle', None)
+        return name_table.names_of(target_handle)
 
-        pwa_app = pywinauto.application.Application()  # TODO: do not call .Application() everywhere.
+    def __get_name_table(self):
+
+        """
+        Return uniq_names.NameTable of the top level parent
+        """
 
         try:
             parent_obj = self.pwa_obj.TopLevelParent()
@@ -361,14 +808,30 @@ class PwaWrapper(object):
             #InvalidWindowHandle: Handle 0x262710 is not a valid window handle
             parent_obj = self.pwa_obj
         except AttributeError:
-            return []
+            return uniq_names.NameTable([], [])
+
+        handles = pywinauto.findwindows.find_windows(parent=parent_obj.handle,
+                                                     top_level_only=False)
+        return self.uniq_names_cache.get(parent_obj.handle, handles,
+                                         self.__build_uniq_names)
+
+    @staticmethod
+    def __build_uniq_names(handles):
+
+        """
+        Return [(uniq_name, handle), ] of the controls
+        """
 
-        visible_controls = [pwa_app.window_(handle=ch) for ch in
-                            pywinauto.findwindows.find_windows(parent=parent_obj.handle, top_level_only=False)]
-        uniq_names_obj = [(uniq_name, obj) for uniq_name, obj
-                      in pywinauto.findbestmatch.build_unique_dict(visible_controls).items()
-                      if uniq_name != '' and (not target_control or obj.WrapperObject() == target_control)]
-        return sorted(uniq_names_obj, key=lambda name_obj: len(name_obj[0]))  # sort by name
+        controls = []
+        for handle in handles:
+            try:
+                control = pywinauto.controls.WrapHandle(handle)
+            except pywinauto.controls.InvalidWindowHandle:
+                continue  # the control has gone
+            controls.append(control_info(control))
+        return [(uniq_name, handle) for uniq_name, handle
+                in uniq_names.build_unique_dict(controls).items()
+                if uniq_name != '']
 
 
 class SWAPYObject(PwaWrapper, CodeGenerator):
@@ -385,9 +848,56 @@ class SWAPYObject(PwaWrapper, CodeGenerator):
     __code_var_pattern = None  # cached value, to access even if the pwa
     # object was closed
 
-    def __init__(self, *args, **kwargs):
-        super(SWAPYObject, self).__init__(*args, **kwargs)
-        self.code_parents = self.get_code_parents()
+    properties_ttl = PROPERTIES_TTL
+    properties_hits = 0  # GetProperties calls served from the snapshot
+    properties_misses = 0  # GetProperties calls fetched the properties
+    __properties = None  # prop_tiers.Snapshot
+    __code_parents = None  # collected on first use
+
+    @property
+    def code_parents(self):
+        if self.__code_parents is None:
+            self.__code_parents = self.get_code_parents()
+        return self.__code_parents
+
+    def GetProperties(self, keys=None):
+
+        """
+        Return the properties snapshot, fetch new one if the snapshot is
+        older than `properties_ttl` seconds or the window has changed since.
+        The `keys` subset is fetched only if the snapshot misses it.
+        """
+
+        snapshot_ = self.__properties
+        if snapshot_ is None or \
+                time.time() - snapshot_.time >= self.properties_ttl or \
+                window_events.is_stale(self._get_handle(), snapshot_.time):
+            self.__properties = prop_tiers.Snapshot()
+
+        if self.__properties.covers(keys):
+            self.properties_hits += 1
+        else:
+            self.properties_misses += 1
+            properties = super(SWAPYObject, self).GetProperties(keys)
+            self.__properties.update(properties, keys)
+        return self.__properties.get(keys)
+
+    def invalidate_properties(self):
+
+        """
+        Drop the properties snapshot, next GetProperties fetches them again.
+        """
+
+        self.__properties = None
+
+    def Exec_action(self, action):
+
+        """
+        An action may change the control, do not keep its properties.
+        """
+
+        self.invalidate_properties()
+        return super(SWAPYObject, self).Exec_action(action)
 
     def get_code_parents(self):
 
@@ -415,7 +925,7 @@ class SWAPYObject(PwaWrapper, CodeGenerator):
         Default _code_self.
         """
         #print self._get_additional_properties()
-        access_name = self.GetProperties()['Access names'][0]
+        access_name = self.GetProperties(['Access names'])['Access names'][0]
 
         if check_valid_identifier(access_name):
             # A valid identifier
@@ -460,9 +970,10 @@ class SWAPYObject(PwaWrapper, CodeGenerator):
 
         if self.__code_var_pattern is None:
             var_prefix = self.short_name
-            if 'Class' in self.GetProperties():
+            properties = self.GetProperties(['Class'])
+            if 'Class' in properties:
                 crtl_class = filter(lambda c: c in string.ascii_letters,
-                                    self.GetProperties()['Class']).lower()
+                                    properties['Class']).lower()
                 if crtl_class:
                     var_prefix = crtl_class
 
@@ -487,7 +998,6 @@ class VirtualSWAPYObject(SWAPYObject):
         self._check_visibility = self.parent._check_visibility
         self._check_actionable = self.parent._check_actionable
         self._check_existence = self.parent._check_existence
-        self.code_parents = self.get_code_parents()
 
     code_action_pattern = "{parent_var}.{action}({index})"
 
@@ -519,7 +1029,7 @@ class VirtualSWAPYObject(SWAPYObject):
     def Select(self):
         self.parent.pwa_obj.Select(self.index)
 
-    def _get_properties(self):
+    def _get_properties(self, keys=None):
         return {}
     
     def Get_subitems(self):
@@ -530,9 +1040,110 @@ class VirtualSWAPYObject(SWAPYObject):
         return 0
 
     
+class Win32WindowEnumerator(snapshot.WindowEnumerator):
+
+    """
+    Desktop snapshot based on the pywinauto handleprops.
+    """
+
+    def handles(self):
+        return pywinauto.findwindows.enum_windows()
+
+    def window_info(self, handle):
+        handleprops = pywinauto.handleprops
+        owner = ctypes.windll.user32.GetWindow(handle,
+                                               pywinauto.win32defines.GW_OWNER)
+        return (handleprops.classname(handle),
+                handleprops.processid(handle),
+                handleprops.isvisible(handle),
+                handleprops.isenabled(handle),
+                owner)
+
+    def window_text(self, handle):
+        if not self.hung_safe:
+            return pywinauto.handleprops.text(handle)
+
+        # The same as handleprops.text, but both messages have the timeout
+        win32defines = pywinauto.win32defines
+        send_message = pywinauto.win32functions.SendMessageTimeout
+        length = ctypes.c_ulong()
+        if not send_message(handle, win32defines.WM_GETTEXTLENGTH, 0, 0,
+                            win32defines.SMTO_ABORTIFHUNG, self.hung_timeout,
+                            ctypes.byref(length)):
+            raise snapshot.NotResponding(handle)
+        if length.value <= 0:
+            return ''
+
+        buffer_ = ctypes.create_unicode_buffer(length.value + 1)
+        copied = ctypes.c_ulong()
+        if not send_message(handle, win32defines.WM_GETTEXT,
+                            length.value + 1, ctypes.byref(buffer_),
+                            win32defines.SMTO_ABORTIFHUNG, self.hung_timeout,
+                            ctypes.byref(copied)):
+            raise snapshot.NotResponding(handle)
+        return buffer_.value
+
+    def is_hung(self, handle):
+        return bool(ctypes.windll.user32.IsHungAppWindow(handle))
+
+    def window_caption(self, handle):
+        buffer_ = ctypes.create_unicode_buffer(512)
+        ctypes.windll.user32.InternalGetWindowText(handle, buffer_, 512)
+        return buffer_.value
+
+
+class Win32EventSource(events.EventSource):
+
+    """
+    Window events from SetWinEventHook.
+    The events are delivered to the thread started the source while it
+    pumps messages, e.g. the GUI thread.
+    """
+
+    hooked_events = ((events.EVENT_OBJECT_CREATE, events.EVENT_OBJECT_DESTROY),
+                     (events.EVENT_OBJECT_NAMECHANGE,
+                      events.EVENT_OBJECT_NAMECHANGE))
+
+    def __init__(self):
+        super(Win32EventSource, self).__init__()
+        self.hooks = []
+        self.callback = None
+
+    def start(self):
+        from ctypes import wintypes
+        win_event_proc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE,
+                                            wintypes.DWORD, wintypes.HWND,
+                                            wintypes.LONG, wintypes.LONG,
+                                            wintypes.DWORD, wintypes.DWORD)
+        self.callback = win_event_proc(self._on_event)  # keep it alive
+        set_hook = ctypes.windll.user32.SetWinEventHook
+        set_hook.restype = wintypes.HANDLE
+        for first, last in self.hooked_events:
+            self.hooks.append(set_hook(first, last, None, self.callback, 0, 0,
+                                       WINEVENT_OUTOFCONTEXT))
+        super(Win32EventSource, self).start()
+
+    def stop(self):
+        super(Win32EventSource, self).stop()
+        for hook in self.hooks:
+            ctypes.windll.user32.UnhookWinEvent(hook)
+        self.hooks = []
+        self.callback = None
+
+    def _on_event(self, hook, event, handle, object_id, child_id, thread,
+                  event_time):
+        if handle and object_id == OBJID_WINDOW and child_id == CHILDID_SELF:
+            self.notify(event, handle)
+
+
 class PC_system(SWAPYObject):
     handle = 0
     short_name = 'pc'  # hope it never be used in the code generator
+    window_enumerator = Win32WindowEnumerator(workers=TEXTS_WORKERS,
+                                              deadline=TEXTS_DEADLINE,
+                                              hung_safe=HUNG_SAFE,
+                                              hung_timeout=HUNG_TIMEOUT,
+                                              hung_fallback=HUNG_FALLBACK)
 
     single_object = None
     inited = False
@@ -548,6 +1159,8 @@ class PC_system(SWAPYObject):
     def __init__(self, *args, **kwargs):
         if not self.inited:
             super(PC_system, self).__init__(*args, **kwargs)
+            self.windows = []  # the last snapshot, [(window_text, record),...]
+            self.listed_handles = set()
             self.inited = True
 
     @property
@@ -565,12 +1178,80 @@ class PC_system(SWAPYObject):
         returns [(window_text, swapy_obj),...]
         '''
         #windows--------------------
-        windows = []
-        try_count = 3
+        self.windows = snapshot.list_windows(self._get_snapshot())
+        windows = self._get_window_objects(self.windows)
+        self.listed_handles = set(record.handle
+                                  for title, record in self.windows)
+        #-----------------------
+        
+        #smt new----------------
+        #------------------------
+        return windows
+
+    def Get_subitems_delta(self):
+
+        """
+        Compare the desktop with the previous Get_subitems/Get_subitems_delta
+        call. Wrappers of the windows which still exist are reused.
+        returns (added, removed, retitled), where `added` and `retitled` are
+        [(window_text, swapy_obj),...] and `removed` is [handle,...]. The
+        removed windows are given by handles, their wrappers may be dropped
+        already, e.g. by a destroy event or by the cache eviction.
+        """
+
+        windows = snapshot.list_windows(self._get_snapshot())
+        delta = snapshot.diff_windows(self.windows, windows)
+        self.windows = windows
+        self.listed_handles = set(record.handle for title, record in windows)
+
+        objects = self._get_window_objects(delta.added + delta.retitled)
+        added = objects[:len(delta.added)]
+        retitled = objects[len(delta.added):]
+        with registry_lock:
+            for handle in delta.removed:
+                Pwa_window.handles.remove(handle)
+        return added, delta.removed, retitled
+
+    def is_listed(self, handle):
+
+        """
+        Check the top level window is in the last Get_subitems or
+        Get_subitems_delta result.
+        """
+
+        return handle in self.listed_handles
+
+    def _get_window_objects(self, windows):
+
+        """
+        Return [(window_title, Pwa_window),...] of the snapshot windows.
+        Every process is looked up once, the windows identities are made
+        of the snapshot records and the processes.
+        """
+
         app = pywinauto.application.Application()
+        processes = {}
+        objects = []
+        for title, record in windows:
+            if record.pid not in processes:
+                processes[record.pid] = Process(self, record.pid)
+            wind = app.window_(handle=record.handle)
+            window = Pwa_window(wind, processes[record.pid],
+                                class_name=record.class_name)
+            window.not_responding = record.hung
+            objects.append((title, window))
+        return objects
+
+    def _get_snapshot(self):
+
+        """
+        Return records of the top level windows, collected in one sweep.
+        """
+
+        try_count = 3
         for i in range(try_count):
           try:
-            handles = pywinauto.findwindows.find_windows()
+            records = self.window_enumerator()
           except exceptions.OverflowError: # workaround for OverflowError: array too large
             time.sleep(1)
           except exceptions.MemoryError:# workaround for MemoryError
@@ -579,34 +1260,13 @@ class PC_system(SWAPYObject):
             break
         else:
           #TODO: add swapy exception: Could not get windows list
-          handles = []
-        #we have to find taskbar in windows list
-        warnings.filterwarnings("ignore", category=FutureWarning) #ignore future warning in taskbar module
-        from pywinauto import taskbar
-        taskbar_handle = taskbar.TaskBarHandle()
-        for w_handle in handles:
-            wind = app.window_(handle=w_handle)
-            if w_handle == taskbar_handle:
-                title = 'TaskBar'
-            else:
-                texts = wind.Texts()
-                texts = filter(bool, texts)  # filter out '' and None items
-                if not texts:
-                    title = 'Window#%s' % w_handle
-                else:
-                    title = ', '.join(texts)
-            windows.append((title, self._get_swapy_object(wind)))
-        windows.sort(key=lambda name: name[0].lower())
-        #-----------------------
-        
-        #smt new----------------
-        #------------------------
-        return windows
+          records = []
+        return records
 
-    def _get_properties(self):
-        info = {'Platform': platform.platform(),
-                'Processor': platform.processor(),
-                'PC name': platform.node()}
+    def _get_properties(self, keys=None):
+        info = prop_tiers.compute({'Platform': platform.platform,
+                                   'Processor': platform.processor,
+                                   'PC name': platform.node}, keys)
         return info
         
     def Get_actions(self):
@@ -636,24 +1296,25 @@ class Process(CodeGenerator):
     It will never be shown in the object browser. Used to hold 'app' counter
     independent of 'window' counters.
     """
-    processes = {}
+    processes = wrapper_cache.WrapperCache(PROCESSES_CACHE_SIZE)
     inited = False
-    main_window = None
 
     def __new__(cls, parent, pid):
-        if pid in cls.processes:
-            return cls.processes[pid]
-        else:
-            new_process = super(Process, cls).__new__(cls, parent, pid)
-            cls.processes[pid] = new_process
-            return new_process
+        identity = (pid, process_creation_time(pid))
+        with registry_lock:
+            process = cls.processes.get(pid, identity)
+            if process is None:
+                process = super(Process, cls).__new__(cls, parent, pid)
+                process.pid, process.creation = identity
+                cls.processes.add(pid, identity, process)
+            return process
 
     def __init__(self, parent, pid):
-        if not self.inited:
-            self.parent = parent
-            self._var_name = None
+        with registry_lock:
+            if not self.inited:
+                self.parent = parent
 
-        self.inited = True
+            self.inited = True
 
     @property
     def _code_self(self):
@@ -671,38 +1332,59 @@ class Process(CodeGenerator):
     def code_var_pattern(self):
         return "{var_prefix}{id}".format(var_prefix='app', id="{id}")
 
+    @property
+    def main_window(self):
+
+        """
+        The window the process code is started from, in the current code
+        session.
+        """
+
+        return self.code_manager.main_windows.get(self)
+
+    @main_window.setter
+    def main_window(self, window):
+        self.code_manager.main_windows[self] = window
+
     @property
     def code_var_name(self):
-        if self._var_name is None:
-            self._var_name = self.code_var_pattern.format(
-                id=self.get_code_id(self.code_var_pattern))
-        return self._var_name
+        name = self.code_manager.variables.get(self)
+        if name is None:
+            name = self.code_manager.bind_variable(self,
+                                                   self.code_var_pattern)
+        return name
 
 
 class Pwa_window(SWAPYObject):
     code_self_close = "{parent_var}.Kill_()"
     short_name = 'window'
 
-    handles = {}
+    handles = wrapper_cache.WrapperCache(WINDOWS_CACHE_SIZE)
     inited = False
-
-    def __new__(cls, pwa_obj, parent=None):
-        if pwa_obj.handle in cls.handles:
-            return cls.handles[pwa_obj.handle]
-        else:
-            new_window = super(Pwa_window, cls).__new__(cls, pwa_obj,
+    not_responding = False  # set by PC_system from the desktop snapshot
+
+    def __new__(cls, pwa_obj, parent=None, class_name=None):
+        handle = pwa_obj.handle
+        identity = window_identity(handle, parent, class_name)
+        with registry_lock:
+            window = cls.handles.get(handle, identity)
+            if window is None:
+                window = super(Pwa_window, cls).__new__(cls, pwa_obj,
                                                         parent=None)
-            cls.handles[pwa_obj.handle] = new_window
-            return new_window
+                window.__handle = handle
+                cls.handles.add(handle, identity, window)
+            return window
 
     def __init__(self, *args, **kwargs):
-        if not self.inited:
-            # Set default style
-            self.code_self_style = self.__code_self_start
-            self.code_close_style = self.__code_close_start
-            super(Pwa_window, self).__init__(*args, **kwargs)
+        kwargs.pop('class_name', None)  # used by __new__ only
+        with registry_lock:
+            if not self.inited:
+                # Set default style
+                self.code_self_style = self.__code_self_start
+                self.code_close_style = self.__code_close_start
+                super(Pwa_window, self).__init__(*args, **kwargs)
 
-        self.inited = True
+            self.inited = True
 
     def __code_self_connect(self):
         title = self.pwa_obj.WindowText().encode('unicode-escape')
@@ -735,7 +1417,7 @@ class Pwa_window(SWAPYObject):
     @property
     def _code_self(self):
         code = ""
-        if not self._get_additional_properties()['Access names']:
+        if not self.GetProperties(['Access names'])['Access names']:
             raise NotImplementedError
         else:
             is_main_window = bool(self.parent.main_window is None or
@@ -768,6 +1450,19 @@ class Pwa_window(SWAPYObject):
 
         return code
 
+    def _get_handle(self):
+        return self.__handle
+
+    def _check_actionable(self):
+
+        """
+        Do not wait for input idle of a not responding window.
+        """
+
+        if self.not_responding:
+            return False
+        return super(Pwa_window, self)._check_actionable()
+
     def _get_additional_children(self):
         '''
         Add menu object as children
@@ -775,11 +1470,11 @@ class Pwa_window(SWAPYObject):
         additional_children = []
         menu = self.pwa_obj.Menu()
         if menu:
-            menu_child = [('!Menu', self._get_swapy_object(menu))]
+            menu_child = [('!Menu', wrappers.wrap(menu, self))]
             additional_children += menu_child
         return additional_children
 
-    def _get_additional_properties(self):
+    def _get_additional_properties(self, keys=None):
         '''
         Get additional useful properties, like a handle, process ID, etc.
         Can be overridden by derived class
@@ -787,10 +1482,11 @@ class Pwa_window(SWAPYObject):
         additional_properties = {}
         pwa_app = pywinauto.application.Application()
         #-----Access names
-
-        access_names = [name for name in pywinauto.findbestmatch.build_unique_dict([self.pwa_obj]).keys() if name != '']
-        access_names.sort(key=len)
-        additional_properties.update({'Access names': access_names})
+        if keys is None or 'Access names' in keys:
+            window_info = control_info(self.pwa_obj.WrapperObject())
+            access_names = [name for name in uniq_names.build_unique_dict([window_info]).keys() if name != '']
+            access_names.sort(key=len)
+            additional_properties.update({'Access names': access_names})
         #-----
 
         #-----pwa_type
@@ -841,15 +1537,30 @@ class Pwa_window(SWAPYObject):
 
     def release_variable(self):
         super(Pwa_window, self).release_variable()
-        if self.parent._var_name:
-            self.parent._var_name = None
-            self.parent.decrement_code_id(self.parent.code_var_pattern)
+        self.parent.release_variable()
 
 
 class Pwa_menu(SWAPYObject):
 
     short_name = 'menu'
 
+    def __init__(self, pwa_obj, parent=None, nodes=None):
+        super(Pwa_menu, self).__init__(pwa_obj, parent)
+        # A menu without the nodes reads the snapshot of the whole menu
+        # tree, its submenus get the nodes from the snapshot.
+        self.nodes = nodes
+        self.snapshot_root = nodes is None
+
+    def get_nodes(self):
+
+        """
+        Return menu_snapshot nodes of the menu items
+        """
+
+        if self.nodes is None:
+            self.nodes = menu_snapshot.build(read_menu_items, self.pwa_obj)
+        return self.nodes
+
     def _check_visibility(self):
         is_visible = False
         try:
@@ -880,23 +1591,27 @@ class Pwa_menu(SWAPYObject):
         #print(self.pwa_obj.is_main_menu)
         #print(self.pwa_obj.owner_item)
         
-        self.subitems_sort_key = lambda obj: obj[1].pwa_obj.Index() #sorts items by indexes
+        self.subitems_sort_key = lambda obj: obj[1].node.index #sorts items by indexes
 
         if not self.pwa_obj.accessible:
             return []
 
+        if self.snapshot_root:
+            self.nodes = None  # the menu may have changed, read it again
+
         additional_children = []
-        menu_items = self.pwa_obj.Items()
-        for menu_item in menu_items:
-            item_text = menu_item.Text()
-            if not item_text:
-                if menu_item.Type() == 2048:
-                    item_text = '-----Separator-----'
-                else:
-                    item_text = 'Index: %d' % menu_item.Index()
-            menu_item_child = [(item_text, self._get_swapy_object(menu_item))]
+        for node in self.get_nodes():
+            menu_item_child = [(node.title, Pwa_menu_item(node.item, self,
+                                                          node))]
             additional_children += menu_item_child
         return additional_children
+
+    def _get_properties(self, keys=None):
+        if not self.pwa_obj.accessible:
+            return {}
+        if keys is not None and 'MenuItems' not in keys:
+            return {}  # do not open the submenus for nothing
+        return menu_snapshot.menu_properties(self.get_nodes())
         
     def _get_children(self):
         '''
@@ -917,6 +1632,10 @@ class Pwa_menu_item(Pwa_menu):
     main_parent_type = Pwa_window
     code_self_pattern = "{var} = {main_parent_var}.MenuItem(u'{menu_path}')"
 
+    def __init__(self, pwa_obj, parent=None, node=None):
+        super(Pwa_menu_item, self).__init__(pwa_obj, parent)
+        self.node = node  # menu_snapshot.MenuNode of the item
+
     @property
     def _code_self(self):
         menu_path = self.get_menuitems_path().encode('unicode-escape')
@@ -926,7 +1645,11 @@ class Pwa_menu_item(Pwa_menu):
         return code
 
     def _check_actionable(self):
-        if self.pwa_obj.State() == 3: #grayed
+        if self.node is not None:
+            state = self.node.state
+        else:
+            state = self.pwa_obj.State()
+        if state == 3: #grayed
             is_actionable = False
         else:
             is_actionable = True
@@ -941,16 +1664,35 @@ class Pwa_menu_item(Pwa_menu):
         #print self.get_menuitems_path()
         
         additional_children = []
+        if self.node is not None:
+            if self.node.has_submenu:
+                nodes = self.node.children  # opens the submenu
+                submenu_child = [(self.node.text+' submenu',
+                                  Pwa_menu(self.node.submenu, self, nodes))]
+                additional_children += submenu_child
+            return additional_children
+
         submenu = self.pwa_obj.SubMenu()
         if submenu:
-            submenu_child = [(self.pwa_obj.Text()+' submenu', self._get_swapy_object(submenu))]
+            nodes = menu_snapshot.build(read_menu_items, submenu,
+                                        self.get_menuitems_path())
+            submenu_child = [(self.pwa_obj.Text()+' submenu',
+                              Pwa_menu(submenu, self, nodes))]
             additional_children += submenu_child
         return additional_children
+
+    def _get_properties(self, keys=None):
+        if self.node is not None:
+            return prop_tiers.select(self.node.properties(keys), keys)
+        return super(Pwa_menu, self)._get_properties(keys)
         
     def get_menuitems_path(self):
         '''
         Compose menuitems_path for GetMenuPath. Example "#0 -> Save As", "Tools -> #0 -> Configure"
         '''
+        if self.node is not None:
+            return self.node.path  # precomputed by the menu snapshot
+
         path = []
         owner_item = self.pwa_obj
         
@@ -964,89 +1706,209 @@ class Pwa_menu_item(Pwa_menu):
         return '->'.join(path[::-1])
 
 
-class Pwa_combobox(SWAPYObject):
+class Pwa_item_list(SWAPYObject):
 
-    short_name = 'combobox'
+    """
+    Common base of ComboBox and ListBox.
+    Keeps the items texts table, shows the items by chunks of `chunk_size`
+    if there are more.
+    """
+
+    chunk_size = ITEMS_CHUNK_SIZE
+    text_len_msg = None
+    text_msg = None
+    texts_table = None
+
+    def __init__(self, *args, **kwargs):
+        super(Pwa_item_list, self).__init__(*args, **kwargs)
+        self.subitems_sort_key = paging.chunk_key
+
+    def get_texts_table(self):
+
+        """
+        Return item_table.ItemTable of the items
+        """
+
+        if self.texts_table is None:
+            self.texts_table = item_table.ItemTable(self.pwa_obj.ItemCount(),
+                                                    self.__read_texts)
+        return self.texts_table
+
+    def __read_texts(self, start, stop):
+        return read_item_texts(self.pwa_obj, self.text_len_msg,
+                               self.text_msg, start, stop)
 
     def _get_additional_children(self):
         '''
-        Add ComboBox items as children
+        Add the items as children, by chunks for a long list
         '''
-        additional_children = []
-        for i, text in enumerate(self.pwa_obj.ItemTexts()):
-            if not text:
-                text = "option #%s" % i
-                additional_children.append((text,
-                                            virtual_combobox_item(self, i)))
-            else:
-                additional_children.append((text,
-                                            virtual_combobox_item(self, text)))
-        return additional_children
+        self.texts_table = None  # the items may have changed
+        count = len(self.get_texts_table())
+        if count > self.chunk_size:
+            return [(paging.chunk_title(start, stop),
+                     virtual_items_chunk(self, start, stop))
+                    for start, stop in paging.chunks(count, self.chunk_size)]
+        return self.get_items(0, count)
 
+    def get_items(self, start, stop):
 
-class virtual_combobox_item(VirtualSWAPYObject):
+        """
+        Return [(title, item),...] of the items range
+        """
 
-    def _get_properties(self):
-        index = None
-        text = self.index
-        for i, name in enumerate(self.parent.pwa_obj.ItemTexts()):
-            if name == text:
-                index = i
-                break
-        return {'Index': index, 'Text': text}
+        texts_table = self.get_texts_table()
+        texts_table.load(start, stop)
+        return [(texts_table.title(row), self._get_item(row))
+                for row in range(start, stop)]
 
+    def _get_item(self, row):
+        raise NotImplementedError
 
-class Pwa_listbox(SWAPYObject):
 
-    short_name = 'listbox'
+class virtual_items_chunk(VirtualSWAPYObject):
 
-    def _get_additional_children(self):
+    """
+    The ComboBox or ListBox items from `chunk_start` to `chunk_stop`.
+    """
 
-        """
-        Add ListBox items as children
-        """
+    def __init__(self, parent, start, stop):
+        super(virtual_items_chunk, self).__init__(parent, start)
+        self.chunk_start = start
+        self.chunk_stop = stop
 
-        additional_children = []
-        for i, text in enumerate(self.pwa_obj.ItemTexts()):
-            if not text:
-                text = "option #%s" % i
-                additional_children.append((text,
-                                            virtual_listbox_item(self, i)))
-            else:
-                additional_children.append((text,
-                                            virtual_listbox_item(self, text)))
-        return additional_children
+    def Get_subitems(self):
+        subitems = self.parent.get_items(self.chunk_start, self.chunk_stop)
+        subitems.sort(key=lambda name: name[0].lower())
+        return subitems
 
+    def Get_actions(self):
+        return []
 
-class virtual_listbox_item(VirtualSWAPYObject):
+    def _get_properties(self, keys=None):
+        return prop_tiers.select({'First index': self.chunk_start,
+                                  'Last index': self.chunk_stop - 1}, keys)
 
-    def _get_properties(self):
-        index = None
-        text = self.index
-        for i, name in enumerate(self.parent.pwa_obj.ItemTexts()):
-            if name == text:
-                index = i
-                break
-        return {'Index': index, 'Text': text}
+
+class virtual_list_item(VirtualSWAPYObject):
+
+    """
+    ComboBox or ListBox item, keeps a row of the parent's texts table only.
+    """
+
+    def __init__(self, parent, row):
+        super(virtual_list_item, self).__init__(
+            parent, parent.get_texts_table().key(row))
+        self.row = row
+
+    def _get_properties(self, keys=None):
+        return prop_tiers.compute(
+            {'Index': lambda: self.row,
+             'Text': lambda: self.parent.get_texts_table().text(self.row)},
+            keys)
+
+
+class Pwa_combobox(Pwa_item_list):
+
+    short_name = 'combobox'
+    text_len_msg = pywinauto.win32defines.CB_GETLBTEXTLEN
+    text_msg = pywinauto.win32defines.CB_GETLBTEXT
+
+    def _get_item(self, row):
+        return virtual_combobox_item(self, row)
+
+
+class virtual_combobox_item(virtual_list_item):
+    pass
+
+
+class Pwa_listbox(Pwa_item_list):
+
+    short_name = 'listbox'
+    text_len_msg = pywinauto.win32defines.LB_GETTEXTLEN
+    text_msg = pywinauto.win32defines.LB_GETTEXT
+
+    def _get_item(self, row):
+        return virtual_listbox_item(self, row)
+
+
+class virtual_listbox_item(virtual_list_item):
+    pass
 
 
 class Pwa_listview(SWAPYObject):
 
     short_name = 'listview'
+    page_size = LISTVIEW_PAGE_SIZE
+    columns = LISTVIEW_COLUMNS
+    paged_properties = ('Items', 'Texts')  # read every cell
+
+    def __init__(self, *args, **kwargs):
+        super(Pwa_listview, self).__init__(*args, **kwargs)
+        self.subitems_sort_key = paging.more_last_key
 
     def _get_additional_children(self):
         '''
-        Add SysListView32 items as children
+        Add SysListView32 items of the first page as children
         '''
-        additional_children = []
-        for item in self.pwa_obj.Items():
-            text = item.Text()
+        return self.get_page(0)
+
+    def get_page(self, start):
+
+        """
+        Return [(text, listview_item),...] of the page rows, sorted by text.
+        Add the "more" node if there are rows after the page.
+        """
+
+        stop, next_start = paging.page_bounds(start, self.page_size,
+                                              self.pwa_obj.ItemCount())
+        columns = paging.select_columns(self.columns,
+                                        self.pwa_obj.ColumnCount())
+        page = []
+        for item, item_data in read_listview_items(self.pwa_obj,
+                                                   range(start, stop),
+                                                   columns):
+            text = item_data['text']
             if not text:
                 index = item.item_index
                 column_index = item.subitem_index
                 text = "option #%s,%s" % (index, column_index)
-            additional_children += [(text, listview_item(item, self))]
-        return additional_children
+            page.append((text, listview_item(item, self, item_data)))
+        page.sort(key=self.subitems_sort_key)
+
+        if next_start is not None:
+            page.append((paging.MORE_TITLE, listview_more(self, next_start)))
+        return page
+
+    def _get_properties(self, keys=None):
+
+        """
+        Do not read every cell for the properties, the items are available
+        page by page as the children.
+        """
+
+        properties = super(Pwa_listview, self)._get_properties(
+            prop_tiers.exclude(keys, self.paged_properties))
+        if keys is None or 'Texts' in keys:
+            properties['Texts'] = [self.pwa_obj.WindowText()]
+        return properties
+
+
+class listview_more(VirtualSWAPYObject):
+
+    """
+    The "more" node, holds the ListView rows starting at `index`.
+    """
+
+    def Get_subitems(self):
+        return self.parent.get_page(self.index)
+
+    def Get_actions(self):
+        return []
+
+    def _get_properties(self, keys=None):
+        return prop_tiers.compute(
+            {'First row': lambda: self.index,
+             'Row count': self.parent.pwa_obj.ItemCount}, keys)
 
 
 class listview_item(SWAPYObject):
@@ -1055,9 +1917,22 @@ class listview_item(SWAPYObject):
     code_self_patt_index = "{var} = {parent_var}.GetItem({index}, {col_index})"
     short_name = 'listview_item'
 
+    def __init__(self, pwa_obj, parent=None, item_data=None):
+        super(listview_item, self).__init__(pwa_obj, parent)
+        self.item_data = item_data  # read with the page
+
+    def invalidate_properties(self):
+        self.item_data = None
+        super(listview_item, self).invalidate_properties()
+
+    def _get_item_data(self):
+        if self.item_data is None:
+            self.item_data = self.pwa_obj.ItemData()
+        return self.item_data
+
     @property
     def _code_self(self):
-        text = self.pwa_obj.Text()
+        text = self._get_item_data()['text']
         if not text:
             index = self.pwa_obj.item_index
             col_index = self.pwa_obj.subitem_index
@@ -1075,11 +1950,12 @@ class listview_item(SWAPYObject):
                                                    var="{var}")
         return code
 
-    def _get_properties(self):
+    def _get_properties(self, keys=None):
+        # the item data is read once, with the page or by the first call
         item_properties = {'index': self.pwa_obj.item_index,
                            'column_index': self.pwa_obj.subitem_index}
-        item_properties.update(self.pwa_obj.ItemData())
-        return item_properties
+        item_properties.update(self._get_item_data())
+        return prop_tiers.select(item_properties, keys)
 
     def _check_visibility(self):
         return True
@@ -1130,9 +2006,11 @@ class virtual_tab_item(VirtualSWAPYObject):
                                                parent_var="{parent_var}")
         return code
 
-    def _get_properties(self):
-        item_properties = {'Index' : self.index,
-                           'Texts': self.parent.pwa_obj.GetTabText(self.index)}
+    def _get_properties(self, keys=None):
+        item_properties = prop_tiers.compute(
+            {'Index': lambda: self.index,
+             'Texts': lambda: self.parent.pwa_obj.GetTabText(self.index)},
+            keys)
         return item_properties
 
 
@@ -1140,25 +2018,20 @@ class Pwa_toolbar(SWAPYObject):
 
     short_name = 'toolbar'
 
+    buttons_table = None  # [toolbar_table.ButtonRecord,...]
+
     def _get_additional_children(self):
         '''
         Add button objects as children
         '''
+        self.buttons_table = read_toolbar_buttons(
+            self.pwa_obj, range(self.pwa_obj.ButtonCount()))
         additional_children = []
-        buttons_count = self.pwa_obj.ButtonCount()
-        for button_index in range(buttons_count):
-            try:
-                button = self.pwa_obj.Button(button_index)
-                button_text = button.info.text
-                if not button_text:
-                    button_text = "button #%s" % button_index
-                button_object = self._get_swapy_object(button)
-            except exceptions.RuntimeError:
-                #button_text = ['Unknown button name1!'] #workaround for RuntimeError: GetButtonInfo failed for button with index 0
-                pass #ignore the button
-            else:
-                button_item = [(button_text, button_object)]
-                additional_children += button_item
+        for record in self.buttons_table:
+            button_object = Pwa_toolbar_button(
+                toolbar_button(self.pwa_obj, record), self, record)
+            additional_children.append((toolbar_table.button_title(record),
+                                        button_object))
         return additional_children
         
     def _get_children(self):
@@ -1174,6 +2047,14 @@ class Pwa_toolbar_button(SWAPYObject):
     code_self_pattern = "{var} = {parent_var}.Button({index})"
     short_name = 'toolbar_button'
 
+    def __init__(self, pwa_obj, parent=None, record=None):
+        super(Pwa_toolbar_button, self).__init__(pwa_obj, parent)
+        self.record = record  # a row of the toolbar's buttons table
+
+    def invalidate_properties(self):
+        self.record = None
+        super(Pwa_toolbar_button, self).invalidate_properties()
+
     @property
     def _code_self(self):
         text = self.pwa_obj.info.text
@@ -1223,19 +2104,15 @@ class Pwa_toolbar_button(SWAPYObject):
     def _get_children(self):
         return []
         
-    def _get_properties(self):
-        o = self.pwa_obj
-        props = {'IsCheckable': o.IsCheckable(),
-                 'IsChecked': o.IsChecked(),
-                 'IsEnabled': o.IsEnabled(),
-                 'IsPressable': o.IsPressable(),
-                 'IsPressed': o.IsPressed(),
-                 'Rectangle': o.Rectangle(),
-                 'State': o.State(),
-                 'Style': o.Style(),
-                 'index': o.index,
-                 'text': o.info.text}
-        return props
+    def _get_properties(self, keys=None):
+        if self.record is None:
+            records = read_toolbar_buttons(self.pwa_obj.toolbar_ctrl,
+                                           [self.pwa_obj.index])
+            if not records:
+                return {}
+            self.record = records[0]
+        return prop_tiers.select(toolbar_table.button_properties(self.record),
+                                 keys)
         
     def Highlight_control(self): 
         pass
@@ -1251,15 +2128,7 @@ class Pwa_tree(SWAPYObject):
         Add roots object as children
         '''
         
-        additional_children = []
-        roots = self.pwa_obj.Roots()
-        for root in roots:
-            root_text = root.Text()
-            obj = self._get_swapy_object(root)
-            obj.path = [root_text]
-            root_item = [(root_text, obj)]
-            additional_children += root_item
-        return additional_children
+        return tree_level(self, self.pwa_obj, tree_elements(self.pwa_obj))
         
     def Highlight_control(self): 
         pass
@@ -1272,9 +2141,14 @@ class Pwa_tree_item(SWAPYObject):
     code_self_pattern = "{var} = {main_parent_var}.GetItem({path})"
     short_name = 'tree_item'
 
+    def __init__(self, pwa_obj, parent=None, path=None, has_children=None):
+        super(Pwa_tree_item, self).__init__(pwa_obj, parent)
+        self.path = path  # tree_path, shared with the children
+        self.has_children = has_children  # read with the item's level
+
     @property
     def _code_self(self):
-        path = self.path
+        path = tree_path.texts(self.path)
         for i in range(len(path)):
             if isinstance(path[i], unicode):
                 path[i] = u'%s' % path[i].encode('unicode-escape')
@@ -1283,13 +2157,23 @@ class Pwa_tree_item(SWAPYObject):
             path=path, var="{var}", main_parent_var="{main_parent_var}")
         return code
 
-    def _get_properties(self):
+    def _get_properties(self, keys=None):
         o = self.pwa_obj
-        props = {'Rectangle' : o.Rectangle(),
-                 'State' : o.State(),
-                 'Text' : o.Text(),}
+        props = prop_tiers.compute(
+            {'Rectangle': o.Rectangle,
+             'State': o.State,
+             'Text': lambda: self.path[1] if self.path else o.Text(),
+             'Has children': self.__has_children,
+             'Children count':
+                 lambda: len(tree_elements(o.tree_ctrl, o.elem))},
+            keys)
         return props
 
+    def __has_children(self):
+        if self.has_children is None:
+            self.has_children = self.pwa_obj.Item().cChildren != 0
+        return self.has_children
+
     def _check_visibility(self):
         return True
         # TODO: It seems like pywinauto bug
@@ -1304,6 +2188,13 @@ class Pwa_tree_item(SWAPYObject):
             return self.parent.pwa_obj.IsExpanded()
         else:
             return True
+
+    def Get_subitems_states(self, subitems):
+        '''
+        All the children are actionable if the item is expanded
+        '''
+        expanded = self.pwa_obj.IsExpanded()
+        return [(True, expanded)] * len(subitems)
         
     def _get_children(self):
         return []
@@ -1317,12 +2208,118 @@ class Pwa_tree_item(SWAPYObject):
         Add sub tree items object as children
         '''
         
-        additional_children = []
-        sub_items = self.pwa_obj.Children()
-        for item in sub_items:
-            item_text = item.Text()
-            obj = self._get_swapy_object(item)
-            obj.path = self.path + [item_text]
-            sub_item = [(item_text, obj)]
-            additional_children += sub_item
-        return additional_children
+        if not self.__has_children():
+            return []
+        tree = self.pwa_obj.tree_ctrl
+        return tree_level(self, tree, tree_elements(tree, self.pwa_obj.elem),
+                          self.path)
+
+
+def wrap_node(node):
+
+    """
+    Create the SWAPY wrapper of the listed node.
+    """
+
+    return wrappers.wrap(node.tag(node.key), node.parent)
+
+
+def materialize(obj):
+
+    """
+    Return the SWAPY wrapper of a listed node, other objects as is.
+    """
+
+    if isinstance(obj, nodes.Node):
+        return obj.materialize(wrap_node)
+    return obj
+
+
+def is_top_level(handle):
+
+    """
+    Check the window is a top level one, its parent is the desktop.
+    """
+
+    user32 = ctypes.windll.user32
+    return user32.GetAncestor(handle, GA_PARENT) == user32.GetDesktopWindow()
+
+
+def on_window_event(event, handle):
+
+    """
+    Mark the cached data of the changed window stale.
+    The properties snapshots check window_events by themselves.
+    """
+
+    if event == events.EVENT_OBJECT_DESTROY:
+        with registry_lock:
+            Pwa_window.handles.remove(handle)
+    if event in (events.EVENT_OBJECT_DESTROY, events.EVENT_OBJECT_NAMECHANGE):
+        # a new control changes the handles, the tables see it anyway
+        PwaWrapper.uniq_names_cache.invalidate_handle(handle)
+
+
+def watch_events(source):
+
+    """
+    Track the windows changes from the events source, see window_events.
+    The source has to be started to make the tracking effective.
+    """
+
+    window_events.watch(source)
+    source.subscribe(on_window_event)
+
+
+def unwatch_events(source):
+
+    """
+    Detach the events source, see watch_events.
+    """
+
+    window_events.unwatch()
+    source.unsubscribe(on_window_event)
+
+
+def window_wrapper(pwa_obj, parent):
+
+    """
+    Wrap a top level window, the window's parent is its process.
+    """
+
+    return Pwa_window(pwa_obj, Process(parent, pwa_obj.ProcessID()))
+
+
+wrappers = registry.WrapperRegistry(default=SWAPYObject)
+
+
+def register_wrapper(pwa_type, factory):
+
+    """
+    Use the factory to wrap pywinauto objects of the type and its
+    subclasses. A factory is called as factory(pwa_obj, parent), so any
+    SWAPYObject derived class fits.
+    """
+
+    wrappers.register(pwa_type, factory)
+
+
+register_wrapper(pywinauto.application.WindowSpecification, window_wrapper)
+register_wrapper(pywinauto.controls.menuwrapper.Menu, Pwa_menu)
+register_wrapper(pywinauto.controls.menuwrapper.MenuItem, Pwa_menu_item)
+register_wrapper(pywinauto.controls.win32_controls.ComboBoxWrapper,
+                 Pwa_combobox)
+register_wrapper(pywinauto.controls.win32_controls.ListBoxWrapper,
+                 Pwa_listbox)
+register_wrapper(pywinauto.controls.common_controls.ListViewWrapper,
+                 Pwa_listview)
+register_wrapper(pywinauto.controls.common_controls.TabControlWrapper,
+                 Pwa_tab)
+register_wrapper(pywinauto.controls.common_controls.ToolbarWrapper,
+                 Pwa_toolbar)
+register_wrapper(pywinauto.controls.common_controls._toolbar_button,
+                 Pwa_toolbar_button)
+register_wrapper(pywinauto.controls.common_controls.TreeViewWrapper,
+                 Pwa_tree)
+register_wrapper(pywinauto.controls.common_controls._treeview_element,
+                 Pwa_tree_item)
@@ -0,0 +1,110 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import inspect
+
+
+class WrapperRegistry(object):
+
+    """
+    Maps pywinauto object types to SWAPY wrapper factories.
+    A factory is called as factory(pwa_obj, parent), a wrapper class fits.
+    Subclasses of a registered type get the wrapper of the nearest
+    registered base, the resolved types are cached.
+    """
+
+    def __init__(self, default=None):
+        self.wrappers = {}  # registered type -> factory
+        self.resolved = {}  # any seen type -> factory
+        self.default = default
+
+    def register(self, pwa_type, factory):
+        self.wrappers[pwa_type] = factory
+        self.resolved.clear()  # may change resolved subclasses
+
+    def lookup(self, pwa_type):
+
+        """
+        Return the factory for the type, the default one if there is no
+        registered base.
+        """
+
+        try:
+            return self.resolved[pwa_type]
+        except KeyError:
+            pass
+
+        factory = self.default
+        for base in inspect.getmro(pwa_type):
+            if base in self.wrappers:
+                factory = self.wrappers[base]
+                break
+        self.resolved[pwa_type] = factory
+        return factory
+
+    def wrap(self, pwa_obj, parent):
+
+        """
+        Return the SWAPY wrapper of the pywinauto object.
+        """
+
+        return self.lookup(type(pwa_obj))(pwa_obj, parent)
+
+
+if __name__ == '__main__':
+    import random
+    import time
+
+    class Wrapper(object):
+        pass
+
+    types = [type('Wrapper%s' % i, (Wrapper,), {}) for i in range(11)]
+    subtypes = [type('Sub%s' % i, (pwa_type,), {})
+                for i, pwa_type in enumerate(types)]
+    names = ['name%s' % i for i in range(len(types))]
+
+    def if_chain(obj):
+        # the way _get_pywinobj_type dispatched
+        for pwa_type, name in zip(types, names):
+            if type(obj) == pwa_type:
+                return name
+        return 'unknown'
+
+    registry = WrapperRegistry(default=lambda obj, parent: 'unknown')
+    for pwa_type, name in zip(types, names):
+        registry.register(pwa_type, lambda obj, parent, name=name: name)
+
+    random.seed(0)
+    all_types = types + subtypes + [Wrapper]
+    tree = [random.choice(all_types)() for _ in range(10000)]
+
+    start = time.time()
+    chain_result = [if_chain(obj) for obj in tree]
+    print 'if-chain, 10k nodes: %.4f s' % (time.time() - start)
+
+    start = time.time()
+    registry_result = [registry.wrap(obj, None) for obj in tree]
+    print 'registry, 10k nodes: %.4f s' % (time.time() - start)
+
+    print 'exact types agree:', all(
+        chain == found for obj, chain, found
+        in zip(tree, chain_result, registry_result) if type(obj) in types)
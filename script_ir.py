@@ -0,0 +1,408 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import re
+
+
+BIND = 'bind'  # var = lookup
+ACTION = 'action'
+WAIT = 'wait'
+CLOSE = 'close'
+BLANK = 'blank'
+
+STRING_RE = re.compile(r"""[uU]?'(?:\\.|[^'\\])*'|[uU]?"(?:\\.|[^"\\])*\"""")
+NAME_RE = re.compile(r"(?<![\w.])[A-Za-z_]\w*")
+BIND_RE = re.compile(r"^([A-Za-z_]\w*) = (.+)$")
+WAIT_RE = re.compile(r"^[A-Za-z_]\w*\.Wait\(")
+# Lookups without side effects: attributes, items and the controls getters
+LOOKUP_RE = re.compile(r"^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*|\[[^\[\]]*\]|"
+                       r"\.(?:GetItem|MenuItem|Button)\([^()]*\))+$")
+INT_RE = re.compile(r"(?<![\w.])\d+(?![\w.])")
+
+# Shortest run of repeated actions compressed to a loop
+LOOP_MIN_RUN = 3
+
+
+def strip_strings(text):
+
+    """
+    Replace string literals with empty ones.
+    """
+
+    return STRING_RE.sub("''", text)
+
+
+def split_numbers(text):
+
+    """
+    Split the code to [code, number, code, number, ..., code], numbers in
+    string literals are a part of the code.
+    """
+
+    parts = ['']
+    last = 0
+    segments = []
+    for string in STRING_RE.finditer(text):
+        segments.append((text[last:string.start()], False))
+        segments.append((string.group(), True))
+        last = string.end()
+    segments.append((text[last:], False))
+
+    for segment, is_string in segments:
+        if is_string:
+            parts[-1] += segment
+            continue
+        position = 0
+        for number in INT_RE.finditer(segment):
+            parts[-1] += segment[position:number.start()]
+            parts.extend([number.group(), ''])
+            position = number.end()
+        parts[-1] += segment[position:]
+    return parts
+
+
+def names(text):
+
+    """
+    Return the set of the variables the code refers to. Attributes and
+    string literals are skipped.
+    """
+
+    return set(NAME_RE.findall(strip_strings(text)))
+
+
+def rename(text, old, new):
+
+    """
+    Rename the variable in the code, attributes and strings are kept.
+    """
+
+    pattern = re.compile(r"(?<![\w.])%s\b" % re.escape(old))
+    parts = []
+    last = 0
+    for string in STRING_RE.finditer(text):
+        parts.append(pattern.sub(new, text[last:string.start()]))
+        parts.append(string.group())
+        last = string.end()
+    parts.append(pattern.sub(new, text[last:]))
+    return "".join(parts)
+
+
+class Statement(object):
+
+    """
+    A line of the script.
+    `kind` is BIND, ACTION, WAIT, CLOSE or BLANK. A BIND statement binds
+    `var` to `expr`, a lookup binding may be dropped or shared.
+    `prefix` is the indentation of the line.
+    """
+
+    def __init__(self, kind, text, prefix=''):
+        self.kind = kind
+        self.text = text
+        self.prefix = prefix
+        self.var = None
+        self.expr = None
+        if kind == BIND:
+            self.var, self.expr = BIND_RE.match(text).groups()
+
+    @classmethod
+    def parse(cls, text, prefix='', close=False):
+        if close:
+            kind = CLOSE
+        elif not text.strip():
+            kind = BLANK
+        elif BIND_RE.match(text):
+            kind = BIND
+        elif WAIT_RE.match(text):
+            kind = WAIT
+        else:
+            kind = ACTION
+        return cls(kind, text, prefix)
+
+    @property
+    def is_lookup(self):
+        return self.kind == BIND and \
+            bool(LOOKUP_RE.match(strip_strings(self.expr)))
+
+    @property
+    def opens_scope(self):
+        return self.kind == ACTION and \
+            strip_strings(self.text).rstrip().endswith(':')
+
+    @property
+    def uses(self):
+
+        """
+        Variables the statement reads.
+        """
+
+        return names(self.expr if self.kind == BIND else self.text)
+
+    def rename(self, old, new):
+        if self.kind == BIND:
+            self.expr = rename(self.expr, old, new)
+            self.text = "%s = %s" % (self.var, self.expr)
+        else:
+            self.text = rename(self.text, old, new)
+
+    def render(self):
+        return self.prefix + self.text
+
+
+class Script(object):
+
+    """
+    The code as `body` statements followed by the `endings`, the close
+    statements in the order they were added.
+    """
+
+    def __init__(self, body=None, endings=None, indent_symbols=' '*4):
+        self.body = body or []
+        self.endings = endings or []
+        self.indent_symbols = indent_symbols
+
+    @classmethod
+    def from_snippets(cls, snippets, indent_symbols=' '*4):
+
+        """
+        Build the script of CodeSnippets, see CodeManager.
+        """
+
+        script = cls(indent_symbols=indent_symbols)
+        indent_count = 0
+        for snippet in snippets:
+            if snippet.init_code:
+                script.add_code(snippet.init_code,
+                                indent_symbols * indent_count)
+            if snippet.indent:
+                indent_count += 1
+            if snippet.action_code:
+                script.add_code(snippet.action_code,
+                                indent_symbols * indent_count)
+            if snippet.close_code:
+                script.endings.append(Statement.parse(
+                    snippet.close_code, indent_symbols * indent_count,
+                    close=True))
+        return script
+
+    def add_code(self, code, prefix=''):
+
+        """
+        Add the code lines to the body, the prefix indents the first line
+        only.
+        """
+
+        for text in code.split("\n"):
+            self.body.append(Statement.parse(text, prefix))
+            prefix = ''
+
+    def free_name(self, base):
+
+        """
+        Return a variable name the script does not use.
+        """
+
+        taken = set()
+        for statement in self.body + self.endings:
+            taken |= statement.uses
+            if statement.var:
+                taken.add(statement.var)
+        name = base
+        number = 1
+        while name in taken:
+            name = '%s%s' % (base, number)
+            number += 1
+        return name
+
+    def render(self):
+        if not self.body:
+            return ""
+        return "\n".join(statement.render() for statement in self.body) + \
+            2*"\n" + "\n".join(statement.render()
+                               for statement in self.endings[::-1])
+
+
+def remove_dead_bindings(script):
+
+    """
+    Drop the lookup bindings nobody reads, e.g. left by clear_last.
+    """
+
+    live = set()
+    for statement in script.endings:
+        live |= statement.uses
+
+    body = []
+    for statement in reversed(script.body):
+        if statement.kind == BIND:
+            if statement.var not in live and statement.is_lookup:
+                continue
+            live.discard(statement.var)
+        live |= statement.uses
+        body.append(statement)
+    body.reverse()
+    script.body = body
+    return script
+
+
+def merge_duplicate_lookups(script):
+
+    """
+    Bind the same lookup once, the duplicates use the first variable.
+    """
+
+    lookups = {}  # (scope, prefix, expr) -> var
+    renames = {}  # dropped var -> var
+    scope = 0
+    body = []
+    for statement in script.body:
+        for old in statement.uses & set(renames):
+            statement.rename(old, renames[old])
+        if statement.opens_scope:
+            scope += 1
+
+        if statement.kind == BIND:
+            key = (scope, statement.prefix, statement.expr)
+            if statement.is_lookup and key in lookups:
+                renames[statement.var] = lookups[key]
+                continue
+
+            # the variable is bound again, forget what depends on it
+            renames.pop(statement.var, None)
+            for old, new in sorted(renames.items()):
+                if new == statement.var:
+                    # the dropped duplicate needs its own variable back
+                    body.append(Statement(BIND, "%s = %s" % (old, new),
+                                          statement.prefix))
+                    del renames[old]
+            for lookup_key, var in lookups.items():
+                if var == statement.var or \
+                        statement.var in names(lookup_key[2]):
+                    del lookups[lookup_key]
+            if statement.is_lookup:
+                lookups[key] = statement.var
+        body.append(statement)
+
+    for statement in script.endings:
+        for old in statement.uses & set(renames):
+            statement.rename(old, renames[old])
+    script.body = body
+    return script
+
+
+def _step(first, second):
+
+    """
+    Compare two actions. Return (None, 0) if they are the same,
+    (number index, step) if they differ in one number only, None otherwise.
+    """
+
+    if first.kind != ACTION or second.kind != ACTION or \
+            first.prefix != second.prefix or first.opens_scope:
+        return None
+    first_parts = split_numbers(first.text)
+    second_parts = split_numbers(second.text)
+    if len(first_parts) != len(second_parts):
+        return None
+
+    changed = [index for index, (part, other) in
+               enumerate(zip(first_parts, second_parts)) if part != other]
+    if not changed:
+        return None, 0
+    index = changed[0]
+    if len(changed) > 1 or index % 2 == 0:  # code parts are even
+        return None
+    if [part for part in (first_parts[index], second_parts[index])
+            if str(int(part)) != part]:
+        return None  # leading zeros
+    return index, int(second_parts[index]) - int(first_parts[index])
+
+
+def compress_loops(script):
+
+    """
+    Replace runs of the same action or the actions stepping a number,
+    e.g. `list1.Select(0)`, `list1.Select(1)`, `list1.Select(2)`, with a
+    loop over the control variable.
+    """
+
+    body = []
+    start = 0
+    while start < len(script.body):
+        first = script.body[start]
+        end = start + 1
+        step = None
+        if end < len(script.body):
+            step = _step(first, script.body[end])
+        if step is not None:
+            while end < len(script.body) and \
+                    _step(script.body[end - 1], script.body[end]) == step:
+                end += 1
+        count = end - start
+        if step is None or count < LOOP_MIN_RUN:
+            body.append(first)
+            start += 1
+            continue
+
+        index, number_step = step
+        if index is None:
+            header = "for _ in range(%s):" % count
+            text = first.text
+        else:
+            parts = split_numbers(first.text)
+            var = script.free_name('index')
+            number = int(parts[index])
+            stop = number + number_step * count
+            if number_step == 1:
+                header = "for %s in range(%s, %s):" % (var, number, stop)
+            else:
+                header = "for %s in range(%s, %s, %s):" % \
+                    (var, number, stop, number_step)
+            parts[index] = var
+            text = "".join(parts)
+        body.append(Statement(ACTION, header, first.prefix))
+        body.append(Statement(ACTION, text,
+                              first.prefix + script.indent_symbols))
+        start = end
+    script.body = body
+    return script
+
+
+PASSES = {'dead_bindings': remove_dead_bindings,
+          'duplicate_lookups': merge_duplicate_lookups,
+          'loops': compress_loops}
+
+
+def optimize(script, passes):
+
+    """
+    Run the named passes, see PASSES, in the order.
+    """
+
+    for name in passes:
+        try:
+            optimization = PASSES[name]
+        except KeyError:
+            raise RuntimeError("Unknown optimization - %s" % name)
+        script = optimization(script)
+    return script
@@ -0,0 +1,219 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import collections
+
+import pool
+
+
+TASKBAR_CLASS = 'Shell_TrayWnd'
+
+# What to show as a title of a not responding window
+HUNG_FALLBACK_CAPTION = 'caption'  # the caption, read without messages
+HUNG_FALLBACK_PLACEHOLDER = 'placeholder'  # no title at all
+
+
+WindowRecord = collections.namedtuple('WindowRecord', ['handle',
+                                                       'title',
+                                                       'class_name',
+                                                       'pid',
+                                                       'visible',
+                                                       'enabled',
+                                                       'owner',
+                                                       'hung'])
+
+
+class NotResponding(Exception):
+
+    """
+    The window did not answer a message in time.
+    """
+
+    pass
+
+
+class WindowEnumerator(object):
+
+    """
+    Collect the desktop snapshot - a `WindowRecord` for every top level
+    window in one sweep.
+    The win32 primitives (`handles`, `window_info`, `window_text`) are
+    implemented by a derived class, so the sweep can be driven by a stub.
+    `visible_only` skips hidden windows before their text is read, the same
+    as `findwindows.find_windows()` does by default.
+    `workers` and `deadline` enable concurrent texts retrieval, see
+    `pool.map_with_deadline`. A window whose text is not read in time is
+    marked as hung.
+    `hung_safe` mode checks `is_hung` before any message is sent to a window.
+    `window_text` may raise NotResponding if it got no answer in
+    `hung_timeout` milliseconds. Titles of hung windows are taken according
+    to `hung_fallback`: HUNG_FALLBACK_CAPTION uses `window_caption`, which
+    sends no messages, HUNG_FALLBACK_PLACEHOLDER leaves the title empty.
+    """
+
+    def __init__(self, visible_only=True, workers=0, deadline=None,
+                 hung_safe=False, hung_timeout=500,
+                 hung_fallback=HUNG_FALLBACK_CAPTION):
+        if hung_fallback not in (HUNG_FALLBACK_CAPTION,
+                                 HUNG_FALLBACK_PLACEHOLDER):
+            raise RuntimeError("Unknown hung_fallback - %s" % hung_fallback)
+        self.visible_only = visible_only
+        self.workers = workers
+        self.deadline = deadline
+        self.hung_safe = hung_safe
+        self.hung_timeout = hung_timeout
+        self.hung_fallback = hung_fallback
+
+    def __call__(self):
+        infos = []
+        for handle in self.handles():
+            info = self.window_info(handle)
+            if self.visible_only and not info[2]:  # not visible
+                continue
+            infos.append((handle, info))
+
+        texts = pool.map_with_deadline(self._read_text,
+                                       [handle for handle, info in infos],
+                                       workers=self.workers,
+                                       deadline=self.deadline,
+                                       default=(None, True))
+        records = []
+        for (handle, info), (text, hung) in zip(infos, texts):
+            class_name, pid, visible, enabled, owner = info
+            records.append(WindowRecord(handle=handle,
+                                        title=text,
+                                        class_name=class_name,
+                                        pid=pid,
+                                        visible=visible,
+                                        enabled=enabled,
+                                        owner=owner,
+                                        hung=hung))
+        return records
+
+    def _read_text(self, handle):
+
+        """
+        Return (text, hung) of the window.
+        """
+
+        if not self.hung_safe:
+            return self.window_text(handle), False
+
+        if not self.is_hung(handle):
+            try:
+                return self.window_text(handle), False
+            except NotResponding:
+                pass
+
+        if self.hung_fallback == HUNG_FALLBACK_CAPTION:
+            return self.window_caption(handle), True
+        return None, True
+
+    def handles(self):
+
+        """
+        Return handles of all the top level windows.
+        """
+
+        raise NotImplementedError
+
+    def window_info(self, handle):
+
+        """
+        Return (class_name, pid, visible, enabled, owner) of the window.
+        """
+
+        raise NotImplementedError
+
+    def window_text(self, handle):
+
+        """
+        Return the window text.
+        """
+
+        raise NotImplementedError
+
+    def is_hung(self, handle):
+
+        """
+        Check the window does not respond, without sending messages to it.
+        """
+
+        raise NotImplementedError
+
+    def window_caption(self, handle):
+
+        """
+        Return the window caption, without sending messages to the window.
+        """
+
+        raise NotImplementedError
+
+
+def list_windows(records):
+
+    """
+    Return [(window_title, record),...] sorted by title, the way the
+    object browser shows top level windows.
+    """
+
+    windows = []
+    taskbar_found = False
+    for record in records:
+        if record.class_name == TASKBAR_CLASS and not taskbar_found:
+            title = 'TaskBar'
+            taskbar_found = True
+        elif record.title:
+            title = record.title
+        else:
+            title = 'Window#%s' % record.handle
+        if record.hung:
+            title = '%s (Not responding)' % title
+        windows.append((title, record))
+    windows.sort(key=lambda name: name[0].lower())
+    return windows
+
+
+WindowsDelta = collections.namedtuple('WindowsDelta', ['added',
+                                                       'removed',
+                                                       'retitled'])
+
+
+def diff_windows(old_windows, new_windows):
+
+    """
+    Compare two `list_windows` results.
+    Return WindowsDelta, where `added` and `retitled` are
+    [(window_title, record),...] and `removed` is [handle,...].
+    """
+
+    old_titles = dict((record.handle, title) for title, record
+                      in old_windows)
+    added = []
+    retitled = []
+    for title, record in new_windows:
+        old_title = old_titles.pop(record.handle, None)
+        if old_title is None:
+            added.append((title, record))
+        elif old_title != title:
+            retitled.append((title, record))
+    removed = sorted(old_titles)
+    return WindowsDelta(added=added, removed=removed, retitled=retitled)
@@ -0,0 +1,68 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import collections
+
+
+# commctrl.h
+TBSTYLE_BUTTON = 0
+TBSTYLE_CHECK = 2
+TBSTATE_CHECKED = 1
+TBSTATE_PRESSED = 2
+TBSTATE_ENABLED = 4
+
+
+# A toolbar button read in the toolbar's bulk read.
+# `info` is TBBUTTONINFO as ToolbarWrapper.GetButton() returns it.
+ButtonRecord = collections.namedtuple('ButtonRecord', ['index',
+                                                       'command_id',
+                                                       'text',
+                                                       'style',
+                                                       'state',
+                                                       'rect',
+                                                       'info'])
+
+
+def button_title(record):
+    return record.text or "button #%s" % record.index
+
+
+def button_properties(record):
+
+    """
+    Return the button properties composed from the record, the same as
+    the _toolbar_button methods return them.
+    """
+
+    style = record.style
+    state = record.state
+    return {'IsCheckable': style & TBSTYLE_CHECK == TBSTYLE_CHECK,
+            'IsChecked': state & TBSTATE_CHECKED == TBSTATE_CHECKED,
+            'IsEnabled': bool(record.command_id) and
+            state & TBSTATE_ENABLED == TBSTATE_ENABLED,
+            'IsPressable': style & TBSTYLE_BUTTON == TBSTYLE_BUTTON,
+            'IsPressed': state & TBSTATE_PRESSED == TBSTATE_PRESSED,
+            'Rectangle': record.rect,
+            'State': state,
+            'Style': style,
+            'index': record.index,
+            'text': record.text}
@@ -0,0 +1,45 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+def child(parent_path, text):
+
+    """
+    Return the path of the `text` item under the `parent_path`.
+    Paths are parent-linked tuples (parent_path, text), a root item path
+    is (None, text). Children share their parent's path.
+    """
+
+    return parent_path, text
+
+
+def texts(path):
+
+    """
+    Return the list of the path texts, from the root item.
+    """
+
+    path_texts = []
+    while path is not None:
+        path, text = path
+        path_texts.append(text)
+    path_texts.reverse()
+    return path_texts
@@ -0,0 +1,455 @@
+# unit tests for the code manager
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import random
+import threading
+import unittest
+
+import code_manager
+from code_manager import CodeSnippet
+
+
+class Owner(object):
+
+    def __init__(self):
+        self.released = 0
+
+    def release_variable(self):
+        self.released += 1
+
+
+class Generator(code_manager.CodeGenerator):
+
+    code_var_pattern = 'button{id}'
+    _code_self = '{var} = window.OK'
+    _code_action = '{var}.{action}()'
+    _code_close = ''
+    code_parents = []
+    checks = 0
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        if parent:
+            self.code_parents = [parent]
+
+    def _check_existence(self):
+        self.checks += 1
+        return True
+
+
+class Child(Generator):
+
+    code_var_pattern = 'child{id}'
+    _code_self = '{var} = {parent_var}.Child'
+
+
+def render(snippets, indent_symbols=' '*4):
+
+    """
+    Compose the code from scratch, the reference for the manager.
+    """
+
+    lines = []
+    endings = []
+    indent_count = 0
+    for snippet in snippets:
+        if snippet.init_code:
+            lines.append(indent_symbols * indent_count + snippet.init_code)
+        if snippet.indent:
+            indent_count += 1
+        if snippet.action_code:
+            lines.append(indent_symbols * indent_count + snippet.action_code)
+        if snippet.close_code:
+            endings.append(indent_symbols * indent_count + snippet.close_code)
+    if not lines:
+        return ""
+    return "\n".join(lines) + "\n\n" + "\n".join(endings[::-1])
+
+
+class CodeManagerTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.single_object = code_manager.CodeManager.single_object
+        code_manager.CodeManager.single_object = None
+        self.cm = code_manager.CodeManager()
+        self.code = ""
+        self.cm.subscribe(self.apply)
+
+    def tearDown(self):
+        code_manager.CodeManager.single_object = self.single_object
+
+    def apply(self, delta):
+        self.code = code_manager.apply_delta(self.code, delta)
+
+    def check(self):
+        self.assertEquals(render(self.cm.snippets), self.cm.get_full_code())
+        self.assertEquals(self.cm.get_full_code(), self.code)
+
+    def testAdd(self):
+
+        """
+        deltas of the added snippets compose the full code
+        """
+
+        owner = Owner()
+        self.cm.add(CodeSnippet(owner, close_code='app.Kill_()'))
+        self.check()
+        self.cm.add(CodeSnippet(owner, 'app = Start_()', indent=True))
+        self.check()
+        self.cm.add(CodeSnippet(owner, 'window = app.Window',
+                                'window.Click()', 'del window'))
+        self.check()
+        self.cm.add(CodeSnippet(owner, action_code='window.Close()'))
+        self.check()
+        self.assertEquals("app = Start_()\n"
+                          "    window = app.Window\n"
+                          "    window.Click()\n"
+                          "    window.Close()\n"
+                          "\n"
+                          "    del window\n"
+                          "app.Kill_()",
+                          self.code)
+
+    def testClearLast(self):
+
+        """
+        deltas of the removed snippets, variables are released
+        """
+
+        owner = Owner()
+        self.cm.add(CodeSnippet(owner, 'app = Start_()', '', 'app.Kill_()'))
+        self.cm.add(CodeSnippet(owner, 'window = app.Window', '',
+                                'del window'))
+        self.cm.add(CodeSnippet(owner, action_code='window.Click()'))
+
+        self.cm.clear_last()
+        self.check()
+        self.assertEquals(0, owner.released)
+        self.cm.clear_last()
+        self.check()
+        self.assertEquals(1, owner.released)
+        self.cm.clear_last()
+        self.check()
+        self.assertEquals("", self.code)
+
+    def testUpdate(self):
+
+        """
+        updated snippet is patched in place
+        """
+
+        owner = Owner()
+        first = CodeSnippet(owner, 'app = Start_()', '', 'app.Kill_()')
+        self.cm.add(first)
+        self.cm.add(CodeSnippet(owner, 'window = app.Window', 'window.Click()',
+                                'del window'))
+
+        deltas = []
+        self.cm.subscribe(deltas.append)
+        self.cm.update(first, init_code='app = Connect_()', close_code='')
+        self.check()
+        self.cm.update(first, init_code='app = Start_()',
+                       close_code='app.Kill_()')
+        self.check()
+        self.cm.update(first, indent=True)
+        self.check()
+        self.assertEquals(3, len(deltas))
+
+    def testOwnerIndex(self):
+
+        """
+        the first INIT snippet of the owner is found
+        """
+
+        owner = Owner()
+        other = Owner()
+        self.cm.add(CodeSnippet(other, 'app = Start_()'))
+        self.cm.add(CodeSnippet(owner, action_code='window.Click()'))
+        init_snippet = CodeSnippet(owner, 'window = app.Window')
+        self.cm.add(init_snippet)
+        self.assertTrue(self.cm.get_init_snippet(owner) is init_snippet)
+        self.assertEquals(None, self.cm.get_init_snippet(Owner()))
+
+        self.cm.clear_last()
+        self.assertEquals(None, self.cm.get_init_snippet(owner))
+
+    def testRandomEdits(self):
+
+        """
+        deltas of any edits compose the full code
+        """
+
+        rnd = random.Random(0)
+        owners = [Owner() for i in range(3)]
+        for i in range(300):
+            choice = rnd.random()
+            if choice < 0.6 or not self.cm.snippets:
+                init_code = rnd.choice(['', 'init%s' % i])
+                close_code = rnd.choice(['', 'close%s' % i])
+                action_code = rnd.choice(['', 'action%s' % i])
+                if not init_code and not close_code:
+                    action_code = 'action%s' % i
+                self.cm.add(CodeSnippet(rnd.choice(owners), init_code,
+                                        action_code, close_code,
+                                        rnd.random() < 0.2))
+            elif choice < 0.8:
+                self.cm.clear_last()
+            elif choice < 0.95:
+                self.cm.update(rnd.choice(self.cm.snippets),
+                               init_code=rnd.choice(['', 'new%s' % i]),
+                               close_code=rnd.choice(['', 'end%s' % i]))
+            else:
+                self.cm.clear()
+            self.check()
+
+    def testOptimizations(self):
+
+        """
+        deltas compose the optimized code, a dead binding left by
+        clear_last is dropped
+        """
+
+        owner = Owner()
+        self.cm.add(CodeSnippet(owner, 'window = app.Window',
+                                "window.Wait('ready')"))
+        self.cm.add(CodeSnippet(owner, 'listview1 = window.ListView'))
+        self.cm.add(CodeSnippet(owner, 'item1 = listview1.GetItem(0)',
+                                'item1.Click()'))
+        self.cm.set_optimizations(['dead_bindings'])
+        self.assertEquals(self.cm.get_full_code(), self.code)
+        self.cm.clear_last()
+        self.assertEquals(self.cm.get_full_code(), self.code)
+        self.assertEquals("window = app.Window\n"
+                          "window.Wait('ready')\n"
+                          "\n",
+                          self.code)
+
+        self.cm.set_optimizations([])
+        self.check()
+        self.assertRaises(RuntimeError, self.cm.set_optimizations,
+                          ['unknown'])
+
+    def testLoopsClearLast(self):
+
+        """
+        clear_last removes one action of the loop
+        """
+
+        owner = Owner()
+        self.cm.set_optimizations(['loops'])
+        self.cm.add(CodeSnippet(owner, 'button1 = window.OK'))
+        for i in range(4):
+            self.cm.add(CodeSnippet(owner, action_code='button1.Click()'))
+        self.assertEquals("button1 = window.OK\n"
+                          "for _ in range(4):\n"
+                          "    button1.Click()\n"
+                          "\n",
+                          self.code)
+
+        self.cm.clear_last()
+        self.assertEquals(self.cm.get_full_code(), self.code)
+        self.assertTrue("range(3)" in self.code)
+        self.cm.clear_last()
+        self.assertEquals("button1 = window.OK\n"
+                          "button1.Click()\n"
+                          "button1.Click()\n"
+                          "\n",
+                          self.code)
+
+
+class NameAllocatorTestCases(unittest.TestCase):
+
+    def testAllocate(self):
+
+        """
+        every pattern counts its names
+        """
+
+        names = code_manager.NameAllocator()
+        self.assertEquals(['button', 'button2', 'app', 'button3'],
+                          [names.allocate(pattern) for pattern in
+                           ['button{id}', 'button{id}', 'app{id}',
+                            'button{id}']])
+
+    def testRelease(self):
+
+        """
+        a released name is reused, a name in use is not
+        """
+
+        names = code_manager.NameAllocator()
+        names.allocate('button{id}')
+        names.allocate('button{id}')
+        names.release('button{id}', 'button')
+        self.assertEquals('button', names.allocate('button{id}'))
+        self.assertEquals('button3', names.allocate('button{id}'))
+
+
+class CodeSessionTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.single_object = code_manager.CodeManager.single_object
+        code_manager.CodeManager.single_object = None
+
+    def tearDown(self):
+        code_manager.CodeManager.single_object = self.single_object
+
+    def testDefaultSession(self):
+
+        """
+        the code goes to CodeManager out of use_session
+        """
+
+        generator = Generator()
+        generator.Add_code('Click')
+        self.assertEquals("button = window.OK\n"
+                          "button.Click()\n"
+                          "\n",
+                          code_manager.CodeManager().get_full_code())
+
+    def testIsolation(self):
+
+        """
+        sessions own the variables and the code
+        """
+
+        first = code_manager.CodeSession()
+        second = code_manager.CodeSession()
+        generators = [Generator(), Generator()]
+        with code_manager.use_session(first):
+            generators[0].Add_code('Click')
+            generators[1].Add_code('Click')
+            self.assertEquals('button2', generators[1].code_var_name)
+        with code_manager.use_session(second):
+            self.assertEquals(None, generators[1].code_var_name)
+            generators[1].Add_code('Close')
+            self.assertEquals('button', generators[1].code_var_name)
+        self.assertEquals(None, generators[1].code_var_name)
+        self.assertEquals(2, len(first))
+        self.assertEquals(1, len(second))
+        self.assertEquals(0, len(code_manager.CodeManager()))
+
+    def testClearLast(self):
+
+        """
+        the session releases the variable of its own
+        """
+
+        session = code_manager.CodeSession()
+        generator = Generator()
+        with code_manager.use_session(session):
+            generator.Add_code('Click')
+        code_manager.CodeManager().bind_variable(generator, 'button{id}')
+        session.clear_last()
+        self.assertEquals({}, session.variables)
+        self.assertEquals('button',
+                          code_manager.CodeManager().variables[generator])
+
+    def testThreads(self):
+
+        """
+        every thread generates in its session
+        """
+
+        sessions = {}
+
+        def generate(number):
+            with code_manager.use_session(code_manager.CodeSession()) \
+                    as session:
+                for i in range(number):
+                    Generator().Add_code('Click')
+                sessions[number] = session
+
+        threads = [threading.Thread(target=generate, args=(number,))
+                   for number in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for number, session in sessions.items():
+            self.assertEquals(number, len(session))
+            self.assertEquals(number, len(set(session.variables.values())))
+
+
+class StepsTestCases(unittest.TestCase):
+
+    def steps(self):
+        parents = [Generator(), Generator()]
+        children = [Child(parents[0]), Child(parents[1]), Child(parents[0])]
+        return [(children[0], 'Click'), (children[1], 'Click'),
+                (parents[0], 'Close'), (children[0], 'Click'),
+                (children[2], None), (parents[1], 'Click')]
+
+    def testSameCode(self):
+
+        """
+        the steps give the code of Get_code in a loop
+        """
+
+        session = code_manager.CodeSession()
+        with code_manager.use_session(session):
+            for generator, action in self.steps():
+                code = generator.Get_code(action)
+        self.assertEquals(code, code_manager.CodeSession().get_code(
+            self.steps()))
+        self.assertEquals("button = window.OK\n"
+                          "child = button.Child\n"
+                          "child.Click()\n"
+                          "button2 = window.OK\n"
+                          "child2 = button2.Child\n"
+                          "child2.Click()\n"
+                          "button.Close()\n"
+                          "child.Click()\n"
+                          "child3 = button.Child\n"
+                          "button2.Click()\n"
+                          "\n",
+                          code)
+
+    def testBulk(self):
+
+        """
+        every target is checked once, the subscribers get one delta
+        """
+
+        session = code_manager.CodeSession()
+        deltas = []
+        session.subscribe(deltas.append)
+        steps = self.steps()
+        session.add_steps(steps)
+        self.assertEquals([1, 1, 1, 1, 1],
+                          [generator.checks for generator in
+                           set(generator for generator, action in steps)])
+        self.assertEquals(1, len(deltas))
+        self.assertEquals(session.get_full_code(),
+                          code_manager.apply_delta("", deltas[0]))
+
+    def testMissingTarget(self):
+
+        """
+        no code is added if a target does not exist
+        """
+
+        session = code_manager.CodeSession()
+        steps = self.steps()
+        steps[-1][0]._check_existence = lambda: False
+        self.assertRaises(Exception, session.add_steps, steps)
+        self.assertEquals(0, len(session))
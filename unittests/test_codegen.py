@@ -28,7 +28,10 @@ from pywinauto.sysinfo import is_x64_Python
 
 import code_manager
 import const
+import events
+import paging
 import proxy
+import toolbar_table
 
 
 SAMPLE_APPS_PATH = u"..\\apps\\MFC_samples"
@@ -54,6 +57,13 @@ def test_app(filename):
         app.kill_()
 
 
+# Class attributes the tests change, restored after every test
+CONFIGURABLE = [(proxy.SWAPYObject, 'properties_ttl'),
+                (proxy.Pwa_listview, 'page_size'),
+                (proxy.Pwa_listview, 'columns'),
+                (proxy.Pwa_item_list, 'chunk_size')]
+
+
 class BaseTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -63,7 +73,8 @@ class BaseTestCase(unittest.TestCase):
         All setUp actions moved in the test_app contextmanager.
         """
 
-        pass
+        self.configuration = [(cls, name, cls.__dict__[name])
+                              for cls, name in CONFIGURABLE]
 
     def tearDown(self):
 
@@ -71,10 +82,11 @@ class BaseTestCase(unittest.TestCase):
         All app's tearDown moved into the test_app contextmanager.
         """
 
-        code_manager.CodeManager().clear()  # Clear single tone CodeManager
-        reload(code_manager)  # Reset class's counters
-        reload(proxy)  # Reset class's counters
-        del self.pwa_root
+        for cls, name, value in self.configuration:
+            setattr(cls, name, value)
+        code_manager.CodeManager().clear()  # Clear the code and the names
+        if hasattr(self, 'pwa_root'):
+            del self.pwa_root
 
     def get_proxy_object(self, path):
         if not hasattr(self, 'pwa_root'):
@@ -87,7 +99,7 @@ class BaseTestCase(unittest.TestCase):
                 raise RuntimeError("'%s' cannot be found" % target_sub)
             for name, pwa_object in subitems:
                 if target_sub == name:
-                    proxy_object = pwa_object
+                    proxy_object = proxy.materialize(pwa_object)
                     break
             else:
                 raise RuntimeError("Invalid path, '%s' not found" % target_sub)
@@ -767,3 +779,394 @@ class ControlsCodeTestCases(BaseTestCase):
 
         expected_code = expected_code.format(app_path=app_path)
         self.assertEquals(expected_code, code)
+
+
+class PropertiesTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',
+            u'TVS_CHECKBOXES',
+            )
+
+    def testOneFetchPerAction(self):
+
+        """
+        the code generator uses properties fetched for the properties panel
+        """
+
+        proxy.SWAPYObject.properties_ttl = 60  # do not expire while test
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            proxy_obj.GetProperties()  # the properties panel
+            proxy_obj.Get_code('Click')
+
+        self.assertEquals(1, proxy_obj.properties_misses)
+        self.assertEquals(2, proxy_obj.properties_hits)
+
+    def testKeysSubset(self):
+
+        """
+        only the requested properties are returned
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            properties = proxy_obj.GetProperties(['Class', 'handle'])
+
+        self.assertEquals(['Class', 'handle'], sorted(properties.keys()))
+
+    def testTiersCoverAllProperties(self):
+
+        """
+        the properties tiers together are the same as all the properties
+        """
+
+        proxy.SWAPYObject.properties_ttl = 0  # fetch every time
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            tiers_keys = []
+            for properties in proxy_obj.Iter_properties():
+                tiers_keys.extend(properties.keys())
+            all_keys = proxy_obj.GetProperties().keys()
+
+        self.assertEquals(sorted(all_keys), sorted(tiers_keys))
+
+
+class ListViewPagesTestCases(BaseTestCase):
+
+    path = (u'RowList Sample Application',
+
+            u'Yellow, 255, 255, 0, 40, 240, 120, Neutral, Red, 255, 0, 0, '
+            u'0, 240, 120, Warm, Green, 0, 255, 0, 80, 240, 120, Cool, '
+            u'Magenta, 255, 0, 255, 200, 240, 120, Warm, Cyan, 0, 255, '
+            u'255, 120, 240, 120, Cool, Blue, 0, 0, 255, 160, 240, 120, '
+            u'Cool, Gray, 192, 192, 192, 160, 0, 181, Neutral',
+            )
+
+    def testPages(self):
+
+        """
+        rows are shown by pages, the next page is under the "more" node
+        """
+
+        proxy.Pwa_listview.page_size = 3
+        with test_app("RowList.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            pages = []
+            subitems = proxy_obj.get_page(0)
+            while subitems[-1][0] == paging.MORE_TITLE:
+                pages.append([name for name, obj in subitems[:-1]])
+                subitems = subitems[-1][1].Get_subitems()
+            pages.append([name for name, obj in subitems])
+
+        self.assertEquals([[u'Green', u'Red', u'Yellow'],
+                           [u'Blue', u'Cyan', u'Magenta'],
+                           [u'Gray']],
+                          pages)
+
+    def testColumns(self):
+
+        """
+        only the configured columns are shown
+        """
+
+        proxy.Pwa_listview.columns = (0, 1)
+        with test_app("RowList.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            names = [name for name, obj in proxy_obj.get_page(0)]
+
+        self.assertEquals(14, len(names))
+        self.assertTrue(u'192' in names)
+
+    def testItemDataOfPage(self):
+
+        """
+        item properties are read with the page
+        """
+
+        with test_app("RowList.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path + (u'Gray',))
+            properties = proxy_obj.GetProperties()
+
+        self.assertEquals(u'Gray', properties['text'])
+        self.assertEquals(6, properties['index'])
+
+
+class ItemsChunksTestCases(BaseTestCase):
+
+    def testComboBoxChunks(self):
+
+        """
+        long list items are under the chunks, the code is the same
+        """
+
+        expected_code = \
+            "from pywinauto.application import Application\n\n" \
+            "app = Application().Start(cmd_line=u'{app_path}')\n" \
+            "window = app.Dialog\n" \
+            "window.Wait('ready')\n" \
+            "combobox = window.ComboBox\n" \
+            "combobox.Select(u'Black')\n\n" \
+            "app.Kill_()"
+
+        path = (u'Common Controls Sample',
+                u'Gray, Gray, White, Black',
+                u'#2\u2026#2',
+                u'Black',
+                )
+
+        proxy.Pwa_item_list.chunk_size = 2
+        with test_app("CmnCtrl3.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(path)
+            properties = proxy_obj.GetProperties()
+            code = proxy_obj.Get_code('Select')
+
+        expected_code = expected_code.format(app_path=app_path)
+        self.assertEquals(expected_code, code)
+        self.assertEquals({'Index': 2, 'Text': u'Black'}, properties)
+
+
+class TreeViewTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',
+            u'Treeview1, Birds, Eagle, Hummingbird, Pigeon',
+            u'Birds',
+            )
+
+    def testChildrenCount(self):
+
+        """
+        a not expanded item reports its children count only
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            properties = proxy_obj.GetProperties()
+
+        self.assertEquals(3, properties['Children count'])
+        self.assertTrue(properties['Has children'])
+
+    def testSharedPath(self):
+
+        """
+        children share the parent's path
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            subitems = proxy_obj.Get_subitems()
+
+        self.assertEquals([u'Eagle', u'Hummingbird', u'Pigeon'],
+                          [name for name, obj in subitems])
+        for name, obj in subitems:
+            self.assertTrue(obj.path[0] is proxy_obj.path)
+
+
+class ToolbarTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',
+
+            u'Erase, Pencil, Select, Brush, Airbrush, Fill, Line, Select '
+            u'Color, Magnify, Rectangle, Round Rect, Ellipse',
+
+            u'Line',
+            )
+
+    def testButtonsTable(self):
+
+        """
+        button properties are the same as the button methods return
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            app.Dialog.TabControl.Select('CToolBarCtrl')  # open needed tab
+            proxy_obj = self.get_proxy_object(self.path)
+            properties = proxy_obj.GetProperties()
+            button = app.Dialog.Toolbar2.Button(u'Line')
+            # ToolbarButton.IsCheckable checks the toolbar style, not the
+            # button one
+            check = button.info.fsStyle & toolbar_table.TBSTYLE_CHECK
+            expected = {'IsCheckable': check == toolbar_table.TBSTYLE_CHECK,
+                        'IsChecked': button.IsChecked(),
+                        'IsEnabled': button.IsEnabled(),
+                        'IsPressed': button.IsPressed(),
+                        'Rectangle': button.Rectangle(),
+                        'State': button.State(),
+                        'index': button.index,
+                        'text': button.info.text}
+
+        for name, value in expected.items():
+            self.assertEquals(value, properties[name])
+        self.assertTrue(proxy_obj.record in proxy_obj.parent.buttons_table)
+
+
+class NodesTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',)
+
+    def testChildrenAreNodes(self):
+
+        """
+        controls are listed as nodes, the wrapper is created once
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            proxy_obj = self.get_proxy_object(self.path)
+            name, node = proxy_obj.Get_subitems()[0]
+            wrapper = proxy.materialize(node)
+
+            self.assertTrue(isinstance(node, proxy.ControlNode))
+            self.assertEquals(name, node.title)
+            self.assertEquals(node.key, wrapper.pwa_obj.handle)
+            self.assertTrue(proxy.materialize(node) is wrapper)
+            self.assertEquals([proxy_obj], wrapper.code_parents[:1])
+
+
+class WindowEventsTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',)
+
+    def setUp(self):
+        super(WindowEventsTestCases, self).setUp()
+        self.source = events.SyntheticEventSource()
+        proxy.watch_events(self.source)
+        self.source.start()
+
+    def tearDown(self):
+        self.source.stop()
+        proxy.unwatch_events(self.source)
+        super(WindowEventsTestCases, self).tearDown()
+
+    def testDestroyed(self):
+
+        """
+        destroyed window does not exist, its wrapper is dropped
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            window = self.get_proxy_object(self.path)
+            handle = window._get_handle()
+            self.assertTrue(window._check_existence())
+
+            self.source.feed([(events.EVENT_OBJECT_DESTROY, handle)])
+            self.assertFalse(window._check_existence())
+            self.assertFalse(handle in proxy.Pwa_window.handles)
+
+    def testRenamed(self):
+
+        """
+        properties of a renamed window are fetched again
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            window = self.get_proxy_object(self.path)
+            window.GetProperties(['Class'])
+            window.GetProperties(['Class'])
+            self.assertEquals((1, 1), (window.properties_hits,
+                                       window.properties_misses))
+
+            self.source.feed([(events.EVENT_OBJECT_NAMECHANGE,
+                               window._get_handle())])
+            window.GetProperties(['Class'])
+            self.assertEquals((1, 2), (window.properties_hits,
+                                       window.properties_misses))
+
+    def testDestroyedRefresh(self):
+
+        """
+        the delta after a destroy event still reports the removed handle
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            window = self.get_proxy_object(self.path)
+            handle = window._get_handle()
+            self.pwa_root.Get_subitems_delta()
+
+            self.source.feed([(events.EVENT_OBJECT_DESTROY, handle)])
+            app.kill_()
+            added, removed, retitled = self.pwa_root.Get_subitems_delta()
+
+        self.assertTrue(handle in removed)
+
+
+class BulkCodeTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',)
+
+    def testSameCode(self):
+
+        """
+        session steps give the code of Get_code in a loop
+        """
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            window = self.get_proxy_object(self.path)
+            controls = [proxy.materialize(node) for name, node in
+                        window.Get_subitems()[:3]]
+            steps = [(window, None)] + \
+                    [(control, 'Click') for control in controls] + \
+                    [(controls[0], 'Click')]
+
+            for control, action in steps:
+                code_loop = control.Get_code(action)
+            code_steps = code_manager.CodeSession().get_code(steps)
+
+        self.assertEquals(code_loop, code_steps)
+
+
+class WindowIdentityTestCases(BaseTestCase):
+
+    def testProcessOpenedOnce(self):
+
+        """
+        listing the desktop opens every process once, not every window
+        """
+
+        opened = []
+        process_creation_time = proxy.process_creation_time
+
+        def counting_creation_time(pid):
+            opened.append(pid)
+            return process_creation_time(pid)
+
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            pwa_root = self.get_proxy_object(())
+            proxy.process_creation_time = counting_creation_time
+            try:
+                windows = pwa_root.Get_subitems()
+            finally:
+                proxy.process_creation_time = process_creation_time
+
+        self.assertEquals(len(set(opened)), len(opened))
+        self.assertEquals(len(set(window.parent for name, window
+                                  in windows)),
+                          len(opened))
+
+
+class SessionsTestCases(BaseTestCase):
+
+    path = (u'Common Controls Sample',)
+
+    def testSameProcess(self):
+
+        """
+        every session starts the code of the same app on its own
+        """
+
+        first = code_manager.CodeSession()
+        second = code_manager.CodeSession()
+        with test_app("CmnCtrl1.exe") as (app, app_path):
+            window = self.get_proxy_object(self.path)
+            with code_manager.use_session(first):
+                first_code = window.Get_code()
+            with code_manager.use_session(second):
+                second_code = window.Get_code()
+
+        self.assertTrue("Application().Start(" in first_code)
+        self.assertEquals(first_code, second_code)
+        self.assertEquals({window.parent: window}, first.main_windows)
+        self.assertEquals({window.parent: window}, second.main_windows)
+        self.assertEquals({},
+                          code_manager.CodeManager().main_windows)
+        first.clear()
+        self.assertEquals({}, first.main_windows)
+        self.assertEquals({window.parent: window}, second.main_windows)
@@ -0,0 +1,99 @@
+# unit tests for the controls state checks
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import unittest
+
+from control_state import WS_DISABLED, WS_VISIBLE, sibling_states
+
+
+class SiblingStatesTestCases(unittest.TestCase):
+
+    def testStyles(self):
+
+        """
+        visible and disabled bits are applied
+        """
+
+        styles = {2: WS_VISIBLE, 3: 0, 4: WS_VISIBLE | WS_DISABLED}
+        parents = {2: 1, 3: 1, 4: 1}
+        self.assertEquals([(True, True), (False, False), (True, False)],
+                          sibling_states([2, 3, 4], styles, parents,
+                                         1, WS_VISIBLE))
+
+    def testHiddenParent(self):
+
+        """
+        control of a hidden panel is not visible
+        """
+
+        styles = {2: 0, 3: WS_VISIBLE}
+        parents = {2: 1, 3: 2}
+        self.assertEquals([(False, False), (False, False)],
+                          sibling_states([2, 3], styles, parents,
+                                         1, WS_VISIBLE))
+
+    def testDisabledTopLevel(self):
+
+        """
+        controls of a disabled or hidden window are not actionable
+        """
+
+        styles = {2: WS_VISIBLE}
+        parents = {2: 1}
+        self.assertEquals([(True, False)],
+                          sibling_states([2], styles, parents,
+                                         1, WS_VISIBLE | WS_DISABLED))
+        self.assertEquals([(False, False)],
+                          sibling_states([2], styles, parents, 1, 0))
+
+    def testUnknownStyle(self):
+
+        """
+        a control listed without the style and its children are not
+        visible
+        """
+
+        styles = {2: None, 3: WS_VISIBLE}
+        parents = {2: 1, 3: 2}
+        self.assertEquals([(False, False), (False, False)],
+                          sibling_states([2, 3], styles, parents,
+                                         1, WS_VISIBLE))
+
+    def testLargeSiblingSet(self):
+
+        """
+        siblings of a large container share the panel state
+        """
+
+        handles = range(10, 510)
+        styles = dict((handle, WS_VISIBLE) for handle in handles)
+        styles[2] = 0
+        parents = dict((handle, 2) for handle in handles)
+        parents[2] = 1
+
+        self.assertEquals([(False, False)] * 500,
+                          sibling_states(handles, styles, parents,
+                                         1, WS_VISIBLE))
+        styles[2] = WS_VISIBLE
+        self.assertEquals([(True, True)] * 500,
+                          sibling_states(handles, styles, parents,
+                                         1, WS_VISIBLE))
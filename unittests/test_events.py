@@ -0,0 +1,130 @@
+# unit tests for the window events
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import unittest
+
+import events
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class SyntheticEventSourceTestCases(unittest.TestCase):
+
+    def testFeed(self):
+
+        """
+        subscribers get the events while the source is started
+        """
+
+        source = events.SyntheticEventSource()
+        received = []
+        source.subscribe(lambda event, handle: received.append((event,
+                                                                handle)))
+        source.feed([(events.EVENT_OBJECT_CREATE, 1)])
+        source.start()
+        source.feed([(events.EVENT_OBJECT_CREATE, 2),
+                     (events.EVENT_OBJECT_DESTROY, 2)])
+        source.stop()
+        source.feed([(events.EVENT_OBJECT_DESTROY, 1)])
+
+        self.assertEquals([(events.EVENT_OBJECT_CREATE, 2),
+                           (events.EVENT_OBJECT_DESTROY, 2)],
+                          received)
+
+
+class StaleTrackerTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.source = events.SyntheticEventSource()
+        self.tracker = events.StaleTracker(keep=2, clock=self.clock)
+        self.tracker.watch(self.source)
+
+    def testWatching(self):
+
+        """
+        tracker knows the changes only if the source is started
+        """
+
+        self.assertFalse(self.tracker.watching)
+        self.source.start()
+        self.assertTrue(self.tracker.watching)
+
+    def testUnwatch(self):
+
+        """
+        detached tracker does not watch nor keep the changes
+        """
+
+        self.source.start()
+        self.source.feed([(events.EVENT_OBJECT_DESTROY, 1)])
+        self.tracker.unwatch()
+        self.assertFalse(self.tracker.watching)
+        self.assertFalse(self.tracker.is_destroyed(1))
+        self.source.feed([(events.EVENT_OBJECT_DESTROY, 2)])
+        self.assertFalse(self.tracker.is_destroyed(2))
+
+    def testDestroyed(self):
+
+        """
+        destroyed handle exists again when a window is created with it
+        """
+
+        self.source.start()
+        self.source.feed([(events.EVENT_OBJECT_DESTROY, 1)])
+        self.assertTrue(self.tracker.is_destroyed(1))
+        self.assertFalse(self.tracker.is_destroyed(2))
+
+        self.source.feed([(events.EVENT_OBJECT_CREATE, 1)])
+        self.assertFalse(self.tracker.is_destroyed(1))
+
+    def testStale(self):
+
+        """
+        data read before the change is stale
+        """
+
+        self.source.start()
+        self.clock.now = 10
+        self.source.feed([(events.EVENT_OBJECT_NAMECHANGE, 1)])
+        self.assertTrue(self.tracker.is_stale(1, since=9))
+        self.assertFalse(self.tracker.is_stale(1, since=11))
+        self.assertFalse(self.tracker.is_stale(2, since=9))
+
+    def testForget(self):
+
+        """
+        changes older than `keep` seconds are forgotten
+        """
+
+        self.source.start()
+        self.source.feed([(events.EVENT_OBJECT_NAMECHANGE, 1)])
+        self.clock.now = 3
+        self.source.feed([(events.EVENT_OBJECT_NAMECHANGE, 2)])
+        self.assertEquals([2], list(self.tracker.changed))
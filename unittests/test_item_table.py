@@ -0,0 +1,113 @@
+# unit tests for the ComboBox and ListBox items table
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import unittest
+
+from item_table import ItemTable
+
+
+class TextsSource(object):
+
+    """
+    Serve texts of the items ranges and record the ranges.
+    """
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.ranges = []
+
+    def __call__(self, start, stop):
+        self.ranges.append((start, stop))
+        return self.texts[start:stop]
+
+
+class ItemTableTestCases(unittest.TestCase):
+
+    texts = [u'Red', u'', u'Green', u'Red', u'Blue']
+
+    def setUp(self):
+        self.source = TextsSource(self.texts)
+        self.table = ItemTable(len(self.texts), self.source)
+
+    def testLazy(self):
+
+        """
+        nothing is read until a text is needed
+        """
+
+        self.assertEquals(5, len(self.table))
+        self.assertEquals([], self.source.ranges)
+
+    def testLoadOnce(self):
+
+        """
+        a range is read in one go and only once
+        """
+
+        self.table.load(1, 3)
+        self.table.load(0, 5)
+        self.table.text(2)
+        self.assertEquals([(1, 3), (0, 5)], self.source.ranges)
+        self.assertEquals(self.texts, self.table.texts)
+
+    def testIndex(self):
+
+        """
+        index is the first index of the text
+        """
+
+        self.table.load(3, 5)
+        self.assertEquals(0, self.table.index(u'Red'))
+        self.assertEquals(4, self.table.index(u'Blue'))
+        self.assertEquals(None, self.table.index(u'Gray'))
+
+    def testIndexReadsOnlyBefore(self):
+
+        """
+        index of an already read text reads only the items before it
+        """
+
+        self.table.load(2, 3)
+        self.assertEquals(2, self.table.index(u'Green'))
+        self.assertEquals([(2, 3), (0, 2)], self.source.ranges)
+
+    def testKeyAndTitle(self):
+
+        """
+        an item without a text is selected by its index
+        """
+
+        self.assertEquals(u'Green', self.table.key(2))
+        self.assertEquals(1, self.table.key(1))
+        self.assertEquals(u'Green', self.table.title(2))
+        self.assertEquals('option #1', self.table.title(1))
+
+    def testLongList(self):
+
+        """
+        a chunk of a long list is read without reading the rest
+        """
+
+        source = TextsSource([u'item %s' % i for i in range(100000)])
+        table = ItemTable(100000, source)
+        table.load(50000, 51000)
+        self.assertEquals(u'item 50999', table.text(50999))
+        self.assertEquals([(50000, 51000)], source.ranges)
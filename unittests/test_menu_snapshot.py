@@ -0,0 +1,148 @@
+# unit tests for the menu snapshot
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import unittest
+
+import menu_snapshot
+
+
+class FakeMenu(object):
+
+    """
+    A menu of [(text, item_type, submenu),...] items.
+    """
+
+    def __init__(self, items):
+        self.items = items
+
+
+MENU = FakeMenu([(u'&File', 0, FakeMenu([(u'&Open', 0, None),
+                                          (u'', menu_snapshot.SEPARATOR_TYPE,
+                                           None),
+                                          (u'', 0, FakeMenu([(u'Recent', 0,
+                                                              None)]))])),
+                 (u'&Help', 0, FakeMenu([(u'&About', 0, None)]))])
+
+
+class ItemsReader(object):
+
+    """
+    read_items for FakeMenu, counts the reads and the opened submenus.
+    """
+
+    def __init__(self):
+        self.reads = 0
+        self.opened = []
+
+    def __call__(self, menu):
+        self.reads += 1
+        return [('item', text, item_type, 0, 100 + index,
+                 self.opener(submenu) if submenu is not None else None)
+                for index, (text, item_type, submenu)
+                in enumerate(menu.items)]
+
+    def opener(self, submenu):
+        def open_submenu():
+            self.opened.append(submenu)
+            return submenu
+        return open_submenu
+
+
+class MenuSnapshotTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = ItemsReader()
+        self.nodes = menu_snapshot.build(self.reader, MENU)
+
+    def testLazy(self):
+
+        """
+        a submenu is opened and read when it is expanded only, once
+        """
+
+        self.assertEquals((1, []), (self.reader.reads, self.reader.opened))
+        self.nodes[0].children
+        self.nodes[0].children
+        self.assertEquals((2, [MENU.items[0][2]]),
+                          (self.reader.reads, self.reader.opened))
+        self.assertTrue(self.nodes[0].submenu is MENU.items[0][2])
+
+    def testPropertiesSubset(self):
+
+        """
+        the properties without 'MenuItems' do not open the submenu
+        """
+
+        self.nodes[1].properties(['Text'])
+        self.assertEquals([], self.reader.opened)
+
+    def testPaths(self):
+
+        """
+        paths are precomputed, an item without a text is referred by index
+        """
+
+        file_nodes = self.nodes[0].children
+        self.assertEquals(u'&File', self.nodes[0].path)
+        self.assertEquals(u'&File->&Open', file_nodes[0].path)
+        self.assertEquals(u'&File->#2->Recent',
+                          file_nodes[2].children[0].path)
+        self.assertEquals(u'&Help->&About', self.nodes[1].children[0].path)
+
+    def testParentPath(self):
+
+        """
+        a submenu snapshot continues the path of its owner item
+        """
+
+        nodes = menu_snapshot.build(self.reader, MENU.items[1][2], u'&Help')
+        self.assertEquals(u'&Help->&About', nodes[0].path)
+
+    def testTitles(self):
+
+        """
+        separators and items without a text have titles
+        """
+
+        file_nodes = self.nodes[0].children
+        self.assertEquals([u'&Open', '-----Separator-----', 'Index: 2'],
+                          [node.title for node in file_nodes])
+
+    def testProperties(self):
+
+        """
+        properties are the same as pywinauto's GetProperties
+        """
+
+        help_node = self.nodes[1]
+        self.assertEquals({'Index': 1,
+                           'State': 0,
+                           'Type': 0,
+                           'ID': 101,
+                           'Text': u'&Help',
+                           'MenuItems': {'MenuItems': [{'Index': 0,
+                                                        'State': 0,
+                                                        'Type': 0,
+                                                        'ID': 100,
+                                                        'Text': u'&About'}]}},
+                          help_node.properties())
+        self.assertEquals(2, len(menu_snapshot.menu_properties(
+            self.nodes)['MenuItems']))
@@ -0,0 +1,70 @@
+# unit tests for the objects browser nodes
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import unittest
+
+import nodes
+
+
+class NodeTestCases(unittest.TestCase):
+
+    def testFields(self):
+
+        """
+        node keeps the listed child fields only
+        """
+
+        node = nodes.Node(0x10, 'Button', int, 'parent')
+        self.assertEquals((0x10, 'Button', int, 'parent', None),
+                          (node.key, node.title, node.tag, node.parent,
+                           node.wrapper))
+        self.assertRaises(AttributeError, setattr, node, 'other', 1)
+
+    def testMaterialize(self):
+
+        """
+        wrapper is created on the first use only
+        """
+
+        calls = []
+
+        def factory(node):
+            calls.append(node)
+            return (node.tag(node.key), node.parent)
+
+        node = nodes.Node(0x10, 'Button', str, 'parent')
+        self.assertEquals(('16', 'parent'), node.materialize(factory))
+        self.assertTrue(node.materialize(factory) is node.wrapper)
+        self.assertEquals([node], calls)
+
+    def testInternTitle(self):
+
+        """
+        equal titles are shared, byte strings and unicode ones
+        """
+
+        title = ''.join(['But', 'ton'])
+        self.assertTrue(nodes.intern_title(title) is intern('Button'))
+        first = nodes.intern_title(u''.join([u'But', u'ton']))
+        second = nodes.intern_title(u''.join([u'But', u'ton']))
+        self.assertEquals(u'Button', second)
+        self.assertTrue(first is second)
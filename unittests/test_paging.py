@@ -0,0 +1,134 @@
+# unit tests for the paged children
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import unittest
+
+import paging
+
+
+class PageBoundsTestCases(unittest.TestCase):
+
+    def testFirstPage(self):
+
+        """
+        the first page of a long list has a next page
+        """
+
+        self.assertEquals((100, 100), paging.page_bounds(0, 100, 50000))
+
+    def testLastPage(self):
+
+        """
+        the last page is cut by the list end and has no next page
+        """
+
+        self.assertEquals((50000, None), paging.page_bounds(49950, 100,
+                                                            50000))
+
+    def testExactPage(self):
+
+        """
+        a list of exactly one page has no next page
+        """
+
+        self.assertEquals((100, None), paging.page_bounds(0, 100, 100))
+
+    def testEmpty(self):
+
+        """
+        an empty list has an empty page
+        """
+
+        self.assertEquals((0, None), paging.page_bounds(0, 100, 0))
+
+
+class SelectColumnsTestCases(unittest.TestCase):
+
+    def testAll(self):
+
+        """
+        None means all the columns
+        """
+
+        self.assertEquals([0, 1, 2], list(paging.select_columns(None, 3)))
+
+    def testNoHeader(self):
+
+        """
+        a list without a header has the only column
+        """
+
+        self.assertEquals([0], list(paging.select_columns(None, 0)))
+        self.assertEquals([0], paging.select_columns((0, 1), 0))
+
+    def testOutOfRange(self):
+
+        """
+        missing columns are skipped
+        """
+
+        self.assertEquals([0, 11], paging.select_columns((0, 11, 12), 12))
+
+
+class MoreLastKeyTestCases(unittest.TestCase):
+
+    def testSort(self):
+
+        """
+        the "more" node is the last one, the rest is sorted by name
+        """
+
+        subitems = [(u'b', 1), (paging.MORE_TITLE, 2), (u'z', 3), (u'A', 4)]
+        subitems.sort(key=paging.more_last_key)
+        self.assertEquals([u'A', u'b', u'z', paging.MORE_TITLE],
+                          [name for name, obj in subitems])
+
+
+class Chunk(object):
+
+    def __init__(self, chunk_start):
+        self.chunk_start = chunk_start
+
+
+class ChunksTestCases(unittest.TestCase):
+
+    def testChunks(self):
+
+        """
+        the chunks cover all the items
+        """
+
+        self.assertEquals([(0, 1000), (1000, 2000), (2000, 2500)],
+                          paging.chunks(2500, 1000))
+        self.assertEquals([], paging.chunks(0, 1000))
+
+    def testChunkKey(self):
+
+        """
+        chunks are kept in order after other subitems
+        """
+
+        subitems = [(paging.chunk_title(10, 20), Chunk(10)),
+                    (paging.chunk_title(2, 10), Chunk(2)),
+                    (u'Edit', None)]
+        subitems.sort(key=paging.chunk_key)
+        self.assertEquals([u'Edit', u'#2\u2026#9', u'#10\u2026#19'],
+                          [name for name, obj in subitems])
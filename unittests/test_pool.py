@@ -0,0 +1,138 @@
+# unit tests for the threads pool
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import threading
+import time
+import unittest
+
+import pool
+from unittests.test_snapshot import DESKTOP, StubEnumerator
+
+
+class MapWithDeadlineTestCases(unittest.TestCase):
+
+    def testSerial(self):
+
+        """
+        serial mode calls func from the current thread
+        """
+
+        threads = set()
+
+        def func(item):
+            threads.add(threading.current_thread())
+            return item * 2
+
+        self.assertEqual([0, 2, 4], pool.map_with_deadline(func, range(3)))
+        self.assertEqual(set([threading.current_thread()]), threads)
+
+    def testOrder(self):
+
+        """
+        results are merged back in the order of the items
+        """
+
+        def func(item):
+            time.sleep(0.01 * (5 - item))  # the first items finish last
+            return item
+
+        results = pool.map_with_deadline(func, range(5), workers=5,
+                                         deadline=5)
+        self.assertEqual(range(5), results)
+
+    def testDeadline(self):
+
+        """
+        a slow item does not stall the others
+        """
+
+        release = threading.Event()
+
+        def func(item):
+            if item == 1:
+                release.wait(5)
+            return item
+
+        start = time.time()
+        results = pool.map_with_deadline(func, range(4), workers=2,
+                                         deadline=0.2, default='timeout')
+        release.set()
+        self.assertEqual([0, 'timeout', 2, 3], results)
+        self.assertTrue(time.time() - start < 2)
+
+    def testDeadlinePerCall(self):
+
+        """
+        the deadline is counted for every call, not for the whole batch
+        """
+
+        def func(item):
+            time.sleep(0.1)
+            return item
+
+        results = pool.map_with_deadline(func, range(8), workers=2,
+                                         deadline=0.3, default='timeout')
+        self.assertEqual(range(8), results)
+
+    def testSlowCalls(self):
+
+        """
+        slow calls do not use up the time of the items after them
+        """
+
+        release = threading.Event()
+
+        def func(item):
+            if item < 2:
+                release.wait(5)
+            return item
+
+        results = pool.map_with_deadline(func, range(4), workers=2,
+                                         deadline=0.2, default='timeout')
+        release.set()
+        self.assertEqual(['timeout', 'timeout', 2, 3], results)
+
+    def testError(self):
+
+        """
+        an exception is re-raised in the calling thread
+        """
+
+        def func(item):
+            if item == 2:
+                raise RuntimeError('failed')
+            return item
+
+        self.assertRaises(RuntimeError, pool.map_with_deadline, func,
+                          range(4), workers=2)
+
+
+class ConcurrentSnapshotTestCases(unittest.TestCase):
+
+    def testSameRecords(self):
+
+        """
+        concurrent texts retrieval gives the same snapshot
+        """
+
+        serial = StubEnumerator(DESKTOP)()
+        concurrent = StubEnumerator(DESKTOP, workers=3, deadline=5)()
+        self.assertEqual(serial, concurrent)
@@ -0,0 +1,195 @@
+# unit tests for the tiered properties retrieval
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import unittest
+
+import prop_tiers
+
+
+PROPERTIES = {'Class': 'Button',
+              'handle': '42',
+              'Texts': ['OK'],
+              'Access names': ['OK', 'Button', 'OKButton'],
+              'Image': 'image data'}
+
+
+class PropertiesSource(object):
+
+    """
+    Serve PROPERTIES and record the requested keys.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, keys):
+        self.requests.append(keys)
+        return prop_tiers.select(PROPERTIES, keys)
+
+
+class TiersTestCases(unittest.TestCase):
+
+    tiers = (('Class', 'handle', 'Style'),
+             ('Texts',))
+
+    def testTiersOrder(self):
+
+        """
+        cheap tiers come first, the rest comes last
+        """
+
+        tiers = list(prop_tiers.iter_tiers(PropertiesSource(), self.tiers))
+        self.assertEquals([{'Class': 'Button', 'handle': '42'},
+                           {'Texts': ['OK']},
+                           {'Access names': ['OK', 'Button', 'OKButton'],
+                            'Image': 'image data'}],
+                          tiers)
+
+    def testLazy(self):
+
+        """
+        a tier is fetched only when it is needed
+        """
+
+        source = PropertiesSource()
+        tiers = prop_tiers.iter_tiers(source, self.tiers)
+        next(tiers)
+        self.assertEquals(1, len(source.requests))
+
+    def testAllBut(self):
+
+        """
+        AllBut contains all the keys except the listed
+        """
+
+        keys = prop_tiers.AllBut(['Class', 'Texts'])
+        self.assertFalse('Class' in keys)
+        self.assertTrue('Image' in keys)
+
+    def testExclude(self):
+
+        """
+        exclude removes keys from any kind of keys subset
+        """
+
+        self.assertFalse('Items' in prop_tiers.exclude(None, ['Items']))
+        self.assertTrue('Class' in prop_tiers.exclude(None, ['Items']))
+        keys = prop_tiers.exclude(prop_tiers.AllBut(['Class']), ['Items'])
+        self.assertFalse('Items' in keys)
+        self.assertFalse('Class' in keys)
+        self.assertEquals(['Class'], prop_tiers.exclude(['Class', 'Items'],
+                                                        ['Items']))
+
+    def testSelectAll(self):
+
+        """
+        select returns a copy of all the properties for None keys
+        """
+
+        selected = prop_tiers.select(PROPERTIES, None)
+        self.assertEquals(PROPERTIES, selected)
+        self.assertFalse(selected is PROPERTIES)
+
+    def testComputeTier(self):
+
+        """
+        compute calls only the getters of the requested tier
+        """
+
+        calls = []
+        def getter(key):
+            def get():
+                calls.append(key)
+                return PROPERTIES[key]
+            return get
+        getters = dict((key, getter(key)) for key in PROPERTIES)
+        tiers = prop_tiers.iter_tiers(
+            lambda keys: prop_tiers.compute(getters, keys), self.tiers)
+
+        self.assertEquals({'Class': 'Button', 'handle': '42'}, next(tiers))
+        self.assertEquals(['Class', 'handle'], sorted(calls))
+        self.assertEquals(PROPERTIES, prop_tiers.compute(getters, None))
+        self.assertEquals(2 + len(PROPERTIES), len(calls))
+
+
+class SnapshotTestCases(unittest.TestCase):
+
+    def testEmpty(self):
+
+        """
+        an empty snapshot covers nothing
+        """
+
+        snapshot = prop_tiers.Snapshot()
+        self.assertFalse(snapshot.covers(['Class']))
+        self.assertFalse(snapshot.covers(None))
+
+    def testSubset(self):
+
+        """
+        the asked keys are covered even if the control has no such property
+        """
+
+        snapshot = prop_tiers.Snapshot()
+        snapshot.update({'Class': 'Button'}, ['Class', 'Style'])
+        self.assertTrue(snapshot.covers(['Style']))
+        self.assertFalse(snapshot.covers(['Texts']))
+        self.assertFalse(snapshot.covers(None))
+        self.assertEquals({'Class': 'Button'}, snapshot.get(['Class', 'Style']))
+
+    def testCompleteByTiers(self):
+
+        """
+        all the tiers make the snapshot complete
+        """
+
+        snapshot = prop_tiers.Snapshot()
+        tiers = (('Class', 'handle'), ('Texts',))
+        for keys in list(tiers) + [prop_tiers.AllBut(['Class', 'handle',
+                                                      'Texts'])]:
+            snapshot.update(prop_tiers.select(PROPERTIES, keys), keys)
+        self.assertTrue(snapshot.complete)
+        self.assertTrue(snapshot.covers(None))
+        self.assertEquals(PROPERTIES, snapshot.get())
+
+    def testRestWithoutTiers(self):
+
+        """
+        the rest of properties does not complete the snapshot alone
+        """
+
+        snapshot = prop_tiers.Snapshot()
+        keys = prop_tiers.AllBut(['Class'])
+        snapshot.update(prop_tiers.select(PROPERTIES, keys), keys)
+        self.assertFalse(snapshot.complete)
+        self.assertFalse(snapshot.covers(['Class']))
+
+    def testComplete(self):
+
+        """
+        all the properties fetched at once make the snapshot complete
+        """
+
+        snapshot = prop_tiers.Snapshot()
+        snapshot.update(dict(PROPERTIES), None)
+        self.assertTrue(snapshot.covers(['Class']))
+        self.assertTrue(snapshot.covers(prop_tiers.AllBut([])))
+        self.assertEquals({'handle': '42'}, snapshot.get(['handle']))
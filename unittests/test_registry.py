@@ -0,0 +1,97 @@
+# unit tests for the wrappers registry
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import unittest
+
+import registry
+
+
+class Base(object):
+    pass
+
+
+class Derived(Base):
+    pass
+
+
+class Other(object):
+    pass
+
+
+def wrapper(name):
+    return lambda pwa_obj, parent: (name, pwa_obj, parent)
+
+
+class WrapperRegistryTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = registry.WrapperRegistry(default=wrapper('default'))
+
+    def testExactType(self):
+
+        """
+        Registered type is wrapped by its factory
+        """
+
+        self.registry.register(Base, wrapper('base'))
+        obj = Base()
+        self.assertEquals(self.registry.wrap(obj, 'parent'),
+                          ('base', obj, 'parent'))
+
+    def testDefault(self):
+
+        """
+        Unknown type is wrapped by the default factory
+        """
+
+        self.registry.register(Base, wrapper('base'))
+        obj = Other()
+        self.assertEquals(self.registry.wrap(obj, None),
+                          ('default', obj, None))
+
+    def testSubclass(self):
+
+        """
+        Subclass is wrapped by the nearest registered base factory
+        """
+
+        self.registry.register(Base, wrapper('base'))
+        self.assertEquals(self.registry.wrap(Derived(), None)[0], 'base')
+
+        self.registry.register(Derived, wrapper('derived'))
+        self.assertEquals(self.registry.wrap(Derived(), None)[0], 'derived')
+        self.assertEquals(self.registry.wrap(Base(), None)[0], 'base')
+
+    def testCache(self):
+
+        """
+        Resolved types are cached, the cache is reset by register
+        """
+
+        self.registry.register(Base, wrapper('base'))
+        self.registry.lookup(Derived)
+        self.registry.lookup(Other)
+        self.assertEquals(set(self.registry.resolved), set([Derived, Other]))
+
+        self.registry.register(Other, wrapper('other'))
+        self.assertEquals(self.registry.resolved, {})
+        self.assertEquals(self.registry.wrap(Other(), None)[0], 'other')
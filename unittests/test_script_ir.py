@@ -0,0 +1,237 @@
+# unit tests for script_ir module
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import unittest
+
+from code_manager import CodeSnippet
+import script_ir
+
+
+def optimize(code, *passes):
+    script = script_ir.Script()
+    script.add_code(code)
+    return "\n".join(statement.render() for statement in
+                     script_ir.optimize(script, passes).body)
+
+
+class StatementTestCases(unittest.TestCase):
+
+    def testKinds(self):
+
+        """
+        lines are classified
+        """
+
+        kinds = [script_ir.Statement.parse(text).kind for text in
+                 ["window = app.Window", "window.Wait('ready')",
+                  "button1.Click()", ""]]
+        self.assertEquals([script_ir.BIND, script_ir.WAIT, script_ir.ACTION,
+                           script_ir.BLANK], kinds)
+
+    def testLookup(self):
+
+        """
+        only the lookups without side effects may be dropped
+        """
+
+        for expr, is_lookup in [("window.OK", True),
+                                ("window[u'OK (x)']", True),
+                                ("listview1.GetItem(u'Green')", True),
+                                ("treeview1.GetItem([u'a', u'b'])", True),
+                                ("Application().Start(cmd_line=u'x')",
+                                 False),
+                                ("button1.Click()", False)]:
+            statement = script_ir.Statement.parse("var = " + expr)
+            self.assertEquals(is_lookup, statement.is_lookup, expr)
+
+    def testRename(self):
+
+        """
+        attributes and strings keep the name
+        """
+
+        self.assertEquals("b.a(u'a', b.a)",
+                          script_ir.rename("a.a(u'a', a.a)", 'a', 'b'))
+
+
+class ScriptTestCases(unittest.TestCase):
+
+    def testRender(self):
+
+        """
+        the script renders to the code of the snippets
+        """
+
+        snippets = [CodeSnippet(None, "\napp = Application().Start()\n"
+                                      "window = app.Window\n"
+                                      "window.Wait('ready')",
+                                close_code="app.Kill_()"),
+                    CodeSnippet(None, "with window:", close_code="pass",
+                                indent=True),
+                    CodeSnippet(None, "button1 = window.OK",
+                                "button1.Click()", "del button1")]
+        self.assertEquals("\n"
+                          "app = Application().Start()\n"
+                          "window = app.Window\n"
+                          "window.Wait('ready')\n"
+                          "with window:\n"
+                          "    button1 = window.OK\n"
+                          "    button1.Click()\n"
+                          "\n"
+                          "    del button1\n"
+                          "    pass\n"
+                          "app.Kill_()",
+                          script_ir.Script.from_snippets(snippets).render())
+        self.assertEquals("", script_ir.Script.from_snippets([]).render())
+
+    def testUnknownPass(self):
+
+        """
+        unknown optimization raises
+        """
+
+        self.assertRaises(RuntimeError, script_ir.optimize,
+                          script_ir.Script(), ['unknown'])
+
+
+class PassesTestCases(unittest.TestCase):
+
+    def testDeadBindings(self):
+
+        """
+        unused lookups are dropped, the rest is kept
+        """
+
+        self.assertEquals("app = Application().Start()\n"
+                          "window = app.Window\n"
+                          "window.Wait('ready')",
+                          optimize("app = Application().Start()\n"
+                                   "window = app.Window\n"
+                                   "window.Wait('ready')\n"
+                                   "listview1 = window.ListView\n"
+                                   "item1 = listview1.GetItem(0)",
+                                   'dead_bindings'))
+
+    def testDeadBindingRebound(self):
+
+        """
+        a binding is dead if the variable is bound again before a use
+        """
+
+        self.assertEquals("button1 = window.Cancel\n"
+                          "button1.Click()",
+                          optimize("button1 = window.OK\n"
+                                   "button1 = window.Cancel\n"
+                                   "button1.Click()",
+                                   'dead_bindings'))
+
+    def testDuplicateLookups(self):
+
+        """
+        the same control is bound once
+        """
+
+        self.assertEquals("button1 = window.OK\n"
+                          "button1.Click()\n"
+                          "button1.Click()",
+                          optimize("button1 = window.OK\n"
+                                   "button1.Click()\n"
+                                   "button2 = window.OK\n"
+                                   "button2.Click()",
+                                   'duplicate_lookups'))
+
+    def testDuplicateLookupsRebound(self):
+
+        """
+        rebinding the shared variable or the parent stops the sharing
+        """
+
+        self.assertEquals("button1 = window.OK\n"
+                          "button2 = button1\n"
+                          "button1 = window.Cancel\n"
+                          "button2.Click()\n"
+                          "window = app.Dialog\n"
+                          "button3 = window.OK",
+                          optimize("button1 = window.OK\n"
+                                   "button2 = window.OK\n"
+                                   "button1 = window.Cancel\n"
+                                   "button2.Click()\n"
+                                   "window = app.Dialog\n"
+                                   "button3 = window.OK",
+                                   'duplicate_lookups'))
+
+    def testLoops(self):
+
+        """
+        runs of the same or number stepping actions become loops
+        """
+
+        self.assertEquals("button1 = window.OK\n"
+                          "for _ in range(3):\n"
+                          "    button1.Click()\n"
+                          "for index in range(0, 6, 2):\n"
+                          "    list1.Select(index)\n"
+                          "list1.Select(u'1')\n"
+                          "list1.Select(u'2')\n"
+                          "list1.Select(u'3')",
+                          optimize("button1 = window.OK\n"
+                                   "button1.Click()\n"
+                                   "button1.Click()\n"
+                                   "button1.Click()\n"
+                                   "list1.Select(0)\n"
+                                   "list1.Select(2)\n"
+                                   "list1.Select(4)\n"
+                                   "list1.Select(u'1')\n"
+                                   "list1.Select(u'2')\n"
+                                   "list1.Select(u'3')",
+                                   'loops'))
+
+    def testShortRuns(self):
+
+        """
+        short runs, leading zeros and two changed numbers are kept
+        """
+
+        code = "button1.Click()\n" \
+               "button1.Click()\n" \
+               "list1.Select(07)\n" \
+               "list1.Select(08)\n" \
+               "list1.Select(09)\n" \
+               "list1.GetItem(1, 1)\n" \
+               "list1.GetItem(2, 2)\n" \
+               "list1.GetItem(3, 3)"
+        self.assertEquals(code, optimize(code, 'loops'))
+
+    def testLoopVariable(self):
+
+        """
+        the loop variable does not hide a script variable
+        """
+
+        self.assertEquals("index = 1\n"
+                          "for index1 in range(1, 4):\n"
+                          "    list1.Select(index1)",
+                          optimize("index = 1\n"
+                                   "list1.Select(1)\n"
+                                   "list1.Select(2)\n"
+                                   "list1.Select(3)",
+                                   'loops'))
@@ -0,0 +1,239 @@
+# unit tests for the desktop snapshot
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+import threading
+import unittest
+
+import snapshot
+
+
+class StubEnumerator(snapshot.WindowEnumerator):
+
+    """
+    Fake desktop. `windows` is {handle: (text, class_name, pid, visible)}
+    """
+
+    def __init__(self, windows, *args, **kwargs):
+        super(StubEnumerator, self).__init__(*args, **kwargs)
+        self.windows = windows
+        self.text_calls = []
+
+    def handles(self):
+        return sorted(self.windows)
+
+    def window_info(self, handle):
+        text, class_name, pid, visible = self.windows[handle]
+        return class_name, pid, visible, True, 0
+
+    def window_text(self, handle):
+        self.text_calls.append(handle)
+        return self.windows[handle][0]
+
+
+class HungStubEnumerator(StubEnumerator):
+
+    """
+    Fake desktop with not responding windows.
+    `hung` windows are detected by is_hung, `slow` windows are not
+    detected in advance, but do not answer in time.
+    """
+
+    def __init__(self, windows, hung=(), slow=(), *args, **kwargs):
+        super(HungStubEnumerator, self).__init__(windows, *args, **kwargs)
+        self.hung = hung
+        self.slow = slow
+
+    def window_text(self, handle):
+        if handle in self.hung:
+            raise AssertionError("A message is sent to the hung window")
+        if handle in self.slow:
+            raise snapshot.NotResponding(handle)
+        return super(HungStubEnumerator, self).window_text(handle)
+
+    def is_hung(self, handle):
+        return handle in self.hung
+
+    def window_caption(self, handle):
+        return self.windows[handle][0]
+
+
+DESKTOP = {10: (u'Notepad', 'Notepad', 100, True),
+           20: (u'', '#32770', 200, True),
+           30: (u'', 'Shell_TrayWnd', 300, True),
+           40: (u'hidden', 'Hidden', 400, False),
+           50: (u'calculator', 'CalcFrame', 500, True),
+           }
+
+
+class SnapshotTestCases(unittest.TestCase):
+
+    def testOneSweep(self):
+
+        """
+        every visible window is read once, hidden windows are skipped
+        """
+
+        enumerator = StubEnumerator(DESKTOP)
+        records = enumerator()
+
+        self.assertEqual([10, 20, 30, 50], [r.handle for r in records])
+        self.assertEqual([10, 20, 30, 50], enumerator.text_calls)
+        self.assertEqual(snapshot.WindowRecord(handle=10,
+                                               title=u'Notepad',
+                                               class_name='Notepad',
+                                               pid=100,
+                                               visible=True,
+                                               enabled=True,
+                                               owner=0,
+                                               hung=False),
+                         records[0])
+
+    def testAllWindows(self):
+
+        """
+        hidden windows are collected when visible_only is off
+        """
+
+        records = StubEnumerator(DESKTOP, visible_only=False)()
+        self.assertEqual([10, 20, 30, 40, 50], [r.handle for r in records])
+
+    def testListWindows(self):
+
+        """
+        titles composed and sorted the same way as the object browser does
+        """
+
+        windows = snapshot.list_windows(StubEnumerator(DESKTOP)())
+        self.assertEqual([u'calculator', u'Notepad', 'TaskBar', 'Window#20'],
+                         [title for title, record in windows])
+
+
+
+class DiffTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.old_windows = snapshot.list_windows(StubEnumerator(DESKTOP)())
+
+    def testNoChanges(self):
+
+        """
+        the same desktop gives an empty delta
+        """
+
+        new_windows = snapshot.list_windows(StubEnumerator(DESKTOP)())
+        delta = snapshot.diff_windows(self.old_windows, new_windows)
+        self.assertEqual(([], [], []), delta)
+
+    def testDelta(self):
+
+        """
+        added, removed and retitled windows are reported
+        """
+
+        desktop = dict(DESKTOP)
+        del desktop[20]
+        desktop[10] = (u'Untitled - Notepad', 'Notepad', 100, True)
+        desktop[60] = (u'New window', 'Frame', 600, True)
+
+        new_windows = snapshot.list_windows(StubEnumerator(desktop)())
+        delta = snapshot.diff_windows(self.old_windows, new_windows)
+
+        self.assertEqual([(u'New window', 60)],
+                         [(t, r.handle) for t, r in delta.added])
+        self.assertEqual([20], delta.removed)
+        self.assertEqual([(u'Untitled - Notepad', 10)],
+                         [(t, r.handle) for t, r in delta.retitled])
+
+    def testFirstSnapshot(self):
+
+        """
+        everything is added if there is no previous snapshot
+        """
+
+        delta = snapshot.diff_windows([], self.old_windows)
+        self.assertEqual(self.old_windows, delta.added)
+        self.assertEqual([], delta.removed)
+
+
+class HungWindowsTestCases(unittest.TestCase):
+
+    def testHungWindow(self):
+
+        """
+        hung window is detected up front and shown with its caption
+        """
+
+        enumerator = HungStubEnumerator(DESKTOP, hung=[10], hung_safe=True)
+        windows = snapshot.list_windows(enumerator())
+
+        self.assertTrue(10 not in enumerator.text_calls)
+        self.assertEqual([u'calculator', u'Notepad (Not responding)',
+                          'TaskBar', 'Window#20'],
+                         [title for title, record in windows])
+        self.assertEqual([False, True, False, False],
+                         [record.hung for title, record in windows])
+
+    def testPlaceholder(self):
+
+        """
+        placeholder fallback does not read the caption
+        """
+
+        enumerator = HungStubEnumerator(
+            DESKTOP, hung=[10], hung_safe=True,
+            hung_fallback=snapshot.HUNG_FALLBACK_PLACEHOLDER)
+        titles = [title for title, record
+                  in snapshot.list_windows(enumerator())]
+        self.assertTrue('Window#10 (Not responding)' in titles)
+
+    def testMessageTimeout(self):
+
+        """
+        window that does not answer in time is treated as hung
+        """
+
+        enumerator = HungStubEnumerator(DESKTOP, slow=[50], hung_safe=True)
+        titles = [title for title, record
+                  in snapshot.list_windows(enumerator())]
+        self.assertTrue(u'calculator (Not responding)' in titles)
+
+    def testDeadline(self):
+
+        """
+        window text not read before the deadline is a placeholder
+        """
+
+        release = threading.Event()
+
+        class BlockingEnumerator(StubEnumerator):
+            def window_text(self, handle):
+                if handle == 50:
+                    release.wait(5)
+                return super(BlockingEnumerator, self).window_text(handle)
+
+        enumerator = BlockingEnumerator(DESKTOP, workers=2, deadline=0.2)
+        records = enumerator()
+        release.set()
+        self.assertEqual([False, False, False, True],
+                         [record.hung for record in records])
+
+    def testUnknownFallback(self):
+        self.assertRaises(RuntimeError, snapshot.WindowEnumerator,
+                          hung_fallback='unknown')
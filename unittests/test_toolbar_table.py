@@ -0,0 +1,84 @@
+# unit tests for the toolbar buttons table
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import unittest
+
+import toolbar_table
+
+
+def record(index=0, command_id=100, text=u'Line', style=0, state=0):
+    return toolbar_table.ButtonRecord(index=index,
+                                      command_id=command_id,
+                                      text=text,
+                                      style=style,
+                                      state=state,
+                                      rect=(0, 0, 10, 10),
+                                      info=None)
+
+
+class ButtonPropertiesTestCases(unittest.TestCase):
+
+    def testPlainButton(self):
+
+        """
+        an enabled push button
+        """
+
+        properties = toolbar_table.button_properties(
+            record(state=toolbar_table.TBSTATE_ENABLED))
+        self.assertTrue(properties['IsEnabled'])
+        self.assertTrue(properties['IsPressable'])
+        self.assertFalse(properties['IsCheckable'])
+        self.assertFalse(properties['IsChecked'])
+        self.assertFalse(properties['IsPressed'])
+        self.assertEquals(u'Line', properties['text'])
+
+    def testCheckedButton(self):
+
+        """
+        a checked check button
+        """
+
+        state = toolbar_table.TBSTATE_ENABLED | toolbar_table.TBSTATE_CHECKED
+        properties = toolbar_table.button_properties(
+            record(style=toolbar_table.TBSTYLE_CHECK, state=state))
+        self.assertTrue(properties['IsCheckable'])
+        self.assertTrue(properties['IsChecked'])
+
+    def testNoCommand(self):
+
+        """
+        a button without a command id is disabled
+        """
+
+        properties = toolbar_table.button_properties(
+            record(command_id=0, state=toolbar_table.TBSTATE_ENABLED))
+        self.assertFalse(properties['IsEnabled'])
+
+    def testTitle(self):
+
+        """
+        a button without a text is titled by its index
+        """
+
+        self.assertEquals(u'Line', toolbar_table.button_title(record()))
+        self.assertEquals('button #9',
+                          toolbar_table.button_title(record(index=9, text=u'')))
@@ -0,0 +1,59 @@
+# unit tests for the TreeView items paths
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import unittest
+
+import tree_path
+
+
+class TreePathTestCases(unittest.TestCase):
+
+    def testRoot(self):
+
+        """
+        a root item path has the only text
+        """
+
+        self.assertEquals([u'Birds'], tree_path.texts(tree_path.child(None,
+                                                                      u'Birds')))
+
+    def testShared(self):
+
+        """
+        children share the parent's path
+        """
+
+        parent = tree_path.child(tree_path.child(None, u'Birds'), u'Eagle')
+        first = tree_path.child(parent, u'Bald')
+        second = tree_path.child(parent, u'Golden')
+        self.assertTrue(first[0] is second[0])
+        self.assertEquals([u'Birds', u'Eagle', u'Bald'],
+                          tree_path.texts(first))
+        self.assertEquals([u'Birds', u'Eagle', u'Golden'],
+                          tree_path.texts(second))
+
+    def testEmpty(self):
+
+        """
+        no path has no texts
+        """
+
+        self.assertEquals([], tree_path.texts(None))
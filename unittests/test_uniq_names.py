@@ -0,0 +1,230 @@
+# unit tests for the access names
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+import random
+import unittest
+
+import uniq_names
+
+try:
+    from pywinauto import findbestmatch
+except ImportError:  # pywinauto is not available out of Windows
+    findbestmatch = None
+
+
+class FakeRect(object):
+    def __init__(self, left, top, right, bottom):
+        self.left, self.top, self.right, self.bottom = left, top, right, bottom
+
+
+class FakeControl(object):
+
+    """
+    Just enough of HwndWrapper for findbestmatch.build_unique_dict
+    """
+
+    def __init__(self, info):
+        self.info = info
+        self.has_title = info.has_title
+        self.can_be_label = info.can_be_label
+
+    def FriendlyClassName(self):
+        return self.info.friendly_class
+
+    def WindowText(self):
+        return self.info.text
+
+    def Texts(self):
+        return self.info.texts
+
+    def IsVisible(self):
+        return self.info.visible
+
+    def Rectangle(self):
+        return FakeRect(*self.info.rect)
+
+
+def synthetic_controls(count, seed):
+    rand = random.Random(seed)
+    controls = []
+    for key in range(count):
+        friendly_class = rand.choice(['Button', 'Button', 'Static', 'Edit',
+                                      'UpDown', 'TreeView', 'ListBox'])
+        text = rand.choice([u'', u'', u'OK', u'Cancel', u'Name', u'Button',
+                            u'Button2', u'Name:'])
+        left, top = rand.randint(0, 400), rand.randint(0, 400)
+        controls.append(uniq_names.ControlInfo(
+            key=key,
+            friendly_class=friendly_class,
+            text=text,
+            texts=[text] + rand.choice([[], [u'item'], [u'a', u'b']]),
+            has_title=rand.random() > 0.2,
+            can_be_label=friendly_class == 'Static',
+            visible=rand.random() > 0.1,
+            rect=(left, top, left + rand.randint(10, 100),
+                  top + rand.randint(10, 40))))
+    return controls
+
+
+class NameTableCacheTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = uniq_names.NameTableCache()
+        self.builds = []
+
+    def build(self, handles):
+        self.builds.append(list(handles))
+        return [(u'Button%s' % handle, handle) for handle in handles] + \
+            [(u'OK', handles[0])]
+
+    def testLazyBuild(self):
+
+        """
+        the table is built on the first use only
+        """
+
+        self.assertEqual(0, len(self.cache))
+        table = self.cache.get(1, [11, 12], self.build)
+        self.assertEqual([[11, 12]], self.builds)
+        self.assertEqual([(u'OK', 11), (u'Button11', 11), (u'Button12', 12)],
+                         table.names)
+
+        self.assertTrue(table is self.cache.get(1, [12, 11], self.build))
+        self.assertEqual(1, len(self.builds))
+
+    def testHandlesChanged(self):
+
+        """
+        the table is rebuilt when the descendants change
+        """
+
+        self.cache.get(1, [11, 12], self.build)
+        table = self.cache.get(1, [11, 13], self.build)
+        self.assertEqual([[11, 12], [11, 13]], self.builds)
+        self.assertEqual(frozenset([11, 13]), table.handles)
+
+    def testPerTopWindow(self):
+
+        """
+        every top level window has its own table
+        """
+
+        self.cache.get(1, [11], self.build)
+        self.cache.get(2, [21], self.build)
+        self.cache.get(1, [11], self.build)
+        self.assertEqual([[11], [21]], self.builds)
+
+        self.cache.invalidate(1)
+        self.cache.get(1, [11], self.build)
+        self.cache.get(2, [21], self.build)
+        self.assertEqual([[11], [21], [11]], self.builds)
+
+    def testInvalidateHandle(self):
+
+        """
+        the tables the changed control belongs to are rebuilt
+        """
+
+        self.cache.get(1, [11], self.build)
+        self.cache.get(2, [21], self.build)
+
+        self.cache.invalidate_handle(21)
+        self.cache.get(1, [11], self.build)
+        self.cache.get(2, [21], self.build)
+        self.assertEqual([[11], [21], [21]], self.builds)
+
+
+class NameTableTestCases(unittest.TestCase):
+
+    def testReverseIndex(self):
+
+        """
+        names of a control are found by its handle, the shortest first
+        """
+
+        table = uniq_names.NameTable([11, 12], [(u'OKButton', 11),
+                                                (u'Button2', 12),
+                                                (u'OK', 11),
+                                                (u'Button1', 11)])
+        self.assertEqual([u'OK', u'Button1', u'OKButton'], table.names_of(11))
+        self.assertEqual([u'Button2'], table.names_of(12))
+        self.assertEqual([], table.names_of(13))
+
+
+class UniqueNamesTestCases(unittest.TestCase):
+
+    def testSuffixes(self):
+
+        """
+        duplicated names get numeric suffixes, the first one is also 0 and 1
+        """
+
+        names = uniq_names.UniqueNames()
+        for key in range(3):
+            names.add([u'Button'], key)
+        self.assertEqual({u'Button': 0, u'Button0': 0, u'Button1': 0,
+                          u'Button2': 1, u'Button3': 2}, names)
+
+    def testNaturalSuffix(self):
+
+        """
+        a generated name does not overwrite an existing one
+        """
+
+        names = uniq_names.UniqueNames()
+        names.add([u'Button'], 0)
+        names.add([u'Button2'], 1)
+        names.add([u'Button'], 2)
+        self.assertEqual(1, names[u'Button2'])
+        self.assertEqual(2, names[u'Button3'])
+
+    def testRemove(self):
+
+        """
+        removal gives the same names as the build without the control
+        """
+
+        controls = synthetic_controls(30, seed=1)
+        names = uniq_names.UniqueNames()
+        for ctrl in controls:
+            names.add([ctrl.friendly_class, ctrl.text], ctrl.key)
+        names.remove(5)
+
+        expected = uniq_names.UniqueNames()
+        for ctrl in controls:
+            if ctrl.key != 5:
+                expected.add([ctrl.friendly_class, ctrl.text], ctrl.key)
+        self.assertEqual(expected, names)
+
+    @unittest.skipIf(findbestmatch is None, "pywinauto is not available")
+    def testGolden(self):
+
+        """
+        the names are the same as pywinauto's build_unique_dict gives
+        """
+
+        for seed in range(20):
+            controls = synthetic_controls(60, seed)
+            fake_controls = [FakeControl(info) for info in controls]
+            expected = dict(
+                (name, ctrl.info.key) for name, ctrl
+                in findbestmatch.build_unique_dict(fake_controls).items())
+            self.assertEqual(expected, uniq_names.build_unique_dict(controls))
@@ -0,0 +1,106 @@
+# unit tests for the wrappers cache
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import unittest
+
+import wrapper_cache
+
+
+class Wrapper(object):
+    pass
+
+
+class WrapperCacheTestCases(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = wrapper_cache.WrapperCache(capacity=2)
+
+    def testGet(self):
+
+        """
+        wrapper is returned for the same identity
+        """
+
+        wrapper = Wrapper()
+        self.cache.add(1, (1, 'Notepad'), wrapper)
+        self.assertTrue(self.cache.get(1, (1, 'Notepad')) is wrapper)
+        self.assertEquals(None, self.cache.get(2, (2, 'Notepad')))
+
+    def testReusedKey(self):
+
+        """
+        key with another identity is a miss, the entry is dropped
+        """
+
+        wrapper = Wrapper()
+        self.cache.add(1, (1, 'Notepad'), wrapper)
+        self.assertEquals(None, self.cache.get(1, (1, 'Calculator')))
+        self.assertEquals(1, self.cache.reused)
+        self.assertEquals(0, len(self.cache))
+
+    def testCollected(self):
+
+        """
+        entries of not used wrappers are dropped
+        """
+
+        wrapper = Wrapper()
+        self.cache.add(1, 1, wrapper)
+        self.assertEquals(1, len(self.cache))
+        del wrapper
+        self.assertEquals(0, len(self.cache))
+        self.assertEquals(1, self.cache.collected)
+
+    def testCapacity(self):
+
+        """
+        least recently used entry is evicted
+        """
+
+        wrappers = [Wrapper() for i in range(3)]
+        self.cache.add(1, 1, wrappers[0])
+        self.cache.add(2, 2, wrappers[1])
+        self.cache.get(1, 1)
+        self.cache.add(3, 3, wrappers[2])
+
+        self.assertTrue(1 in self.cache)
+        self.assertFalse(2 in self.cache)
+        self.assertTrue(3 in self.cache)
+        self.assertEquals(1, self.cache.evicted)
+
+    def testRemove(self):
+
+        """
+        removed entry returns its wrapper
+        """
+
+        wrapper = Wrapper()
+        self.cache.add(1, 1, wrapper)
+        self.assertTrue(self.cache.remove(1) is wrapper)
+        self.assertEquals(None, self.cache.remove(1))
+        self.assertEquals({'size': 0,
+                           'capacity': 2,
+                           'evicted': 0,
+                           'collected': 0,
+                           'destroyed': 1,
+                           'reused': 0},
+                          self.cache.stats())
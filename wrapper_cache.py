@@ -0,0 +1,125 @@
+# GUI object/properties browser.
+# Copyright (C) 2015 Matiychuk D.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+
+import collections
+import weakref
+
+
+class WrapperCache(object):
+
+    """
+    Bounded registry of wrappers, keyed by a handle or a pid.
+    Wrappers are weak-referenced, a wrapper nobody uses is dropped.
+    Every entry keeps the identity of the wrapped object, e.g.
+    (handle, pid, class, creation), a key reused by another object
+    gets a fresh wrapper.
+    Not thread safe, callers guard it.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()  # key -> (identity, ref)
+        # eviction counters, for diagnostics
+        self.evicted = 0  # least recently used, dropped by the capacity
+        self.collected = 0  # the wrapper was not used any more
+        self.destroyed = 0  # removed, the object has gone
+        self.reused = 0  # the key got another identity
+
+    def __len__(self):
+        self.purge()
+        return len(self.entries)
+
+    def __contains__(self, key):
+        entry = self.entries.get(key)
+        return entry is not None and entry[1]() is not None
+
+    def get(self, key, identity):
+
+        """
+        Return the wrapper of the key, None if there is no valid one.
+        """
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        cached_identity, ref = entry
+        wrapper = ref()
+        if wrapper is None:
+            del self.entries[key]
+            self.collected += 1
+            return None
+        if cached_identity != identity:
+            del self.entries[key]
+            self.reused += 1
+            return None
+
+        # move to the end, the most recently used
+        del self.entries[key]
+        self.entries[key] = entry
+        return wrapper
+
+    def add(self, key, identity, wrapper):
+        self.entries.pop(key, None)
+        self.entries[key] = (identity, weakref.ref(wrapper))
+        if len(self.entries) > self.capacity:
+            self.purge()
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    def remove(self, key):
+
+        """
+        Drop the entry of a destroyed object.
+        Return the wrapper if it is still used, None otherwise.
+        """
+
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.destroyed += 1
+        return entry[1]()
+
+    def purge(self):
+
+        """
+        Drop the entries of the collected wrappers.
+        """
+
+        for key, (identity, ref) in self.entries.items():
+            if ref() is None:
+                del self.entries[key]
+                self.collected += 1
+
+    def stats(self):
+
+        """
+        Return the cache size and the eviction counters.
+        """
+
+        return {'size': len(self),
+                'capacity': self.capacity,
+                'evicted': self.evicted,
+                'collected': self.collected,
+                'destroyed': self.destroyed,
+                'reused': self.reused}